@@ -1 +1,5 @@
 # Aumovio Simulator Backend
+from dotenv import load_dotenv
+
+# Loaded once for every entry point (API, Celery worker, commands, migrations)
+load_dotenv()
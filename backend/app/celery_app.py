@@ -1,16 +1,29 @@
 from celery import Celery
+from kombu import Exchange, Queue
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# ============ QUEUES ============
+# Each queue has its own workers (see docker-compose.yml), so short tasks
+# never wait behind minutes-long simulations.
+SIMULATION_QUEUE = "simulation"  # Real-time simulation runs (long, CPU)
+ANALYTICS_QUEUE = "analytics"  # Safety reanalysis and other short DB/CPU work
+LLM_QUEUE = "llm"  # LLM calls: wait on the network, run on thread-pool workers
+INGEST_QUEUE = "ingest"  # Bulk data imports; served by the analytics workers
+
+# Priorities within a queue; with the Redis broker lower numbers are served first
+# (Celery ignores a task-level priority of 0, so 1 is the highest used)
+PRIORITY_HIGH = 1  # A user is waiting on the result
+PRIORITY_DEFAULT = 5
+PRIORITY_LOW = 9  # Bulk/background batches
+PRIORITY_STEPS = list(range(10))
+
 celery_app = Celery(
     "aumovio_tasks",
     broker=REDIS_URL,
     backend=REDIS_URL.replace("/0", "/1"),  # Use different DB for results
-    include=["app.tasks.simulation_tasks"]
+    include=["app.tasks.simulation_tasks", "app.tasks.analytics_tasks", "app.tasks.insight_tasks", "app.tasks.assistant_tasks", "app.tasks.feedback_tasks"]
 )
 
 celery_app.conf.update(
@@ -22,4 +35,28 @@ celery_app.conf.update(
     result_expires=3600,  # Results expire after 1 hour
     task_track_started=True,
     task_time_limit=600,  # 10 minute timeout
+    task_queues=[
+        Queue(name, Exchange(name), routing_key=name)
+        for name in (SIMULATION_QUEUE, ANALYTICS_QUEUE, LLM_QUEUE, INGEST_QUEUE)
+    ],
+    task_queue_max_priority=len(PRIORITY_STEPS),
+    task_default_queue=ANALYTICS_QUEUE,
+    task_default_priority=PRIORITY_DEFAULT,
+    task_routes={
+        "app.tasks.simulation_tasks.*": {"queue": SIMULATION_QUEUE},
+        "app.tasks.analytics_tasks.*": {"queue": ANALYTICS_QUEUE},
+        "app.tasks.insight_tasks.*": {"queue": LLM_QUEUE},
+        "app.tasks.assistant_tasks.*": {"queue": LLM_QUEUE},
+        "app.tasks.feedback_tasks.*": {"queue": LLM_QUEUE},
+    },
+    # Reserve one message per process: a worker busy with a long task must not
+    # hold others back (workers for short tasks raise this with --prefetch-multiplier)
+    worker_prefetch_multiplier=1,
+    broker_transport_options={
+        "priority_steps": PRIORITY_STEPS,
+        "sep": ":",
+        "queue_order_strategy": "priority",
+        # Unacked (acks_late) messages are redelivered after this; must exceed every task time limit
+        "visibility_timeout": 3600,
+    },
 )
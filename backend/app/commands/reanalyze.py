@@ -0,0 +1,55 @@
+"""
+Recompute stale SafetyRisk rows from stored telemetry.
+
+    python -m app.commands.reanalyze [--scenario ID] [--job ID ...] [--force] [--workers N]
+
+Jobs analyzed by an older SafetyAnalyzer.VERSION are streamed through the
+vectorized analyzer in a process pool; results are bulk-upserted in batches.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from app.database import SessionLocal, get_engine
+from app.services.reanalysis import select_stale_jobs, compute_safety_risk, store_safety_risks
+from app.services.vectorized_safety_analyzer import VectorizedSafetyAnalyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-analyze stale SafetyRisk rows")
+    parser.add_argument("--scenario", help="Only jobs of this scenario")
+    parser.add_argument("--job", action="append", help="Only these jobs (repeatable)")
+    parser.add_argument("--force", action="store_true", help="Recompute even up-to-date rows")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Analyzer processes")
+    parser.add_argument("--batch-size", type=int, default=50, help="Rows per bulk upsert")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        stale = [str(job_id) for job_id in select_stale_jobs(
+            db, job_ids=args.job, scenario_id=args.scenario, force=args.force
+        )]
+        print(f"{len(stale)} job(s) to re-analyze with analyzer v{VectorizedSafetyAnalyzer.VERSION}")
+        if not stale:
+            return
+
+        # Don't share pooled connections with forked workers
+        get_engine().dispose()
+
+        done = 0
+        batch = []
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for result in pool.map(compute_safety_risk, stale, chunksize=4):
+                batch.append(result)
+                if len(batch) >= args.batch_size:
+                    done += store_safety_risks(db, batch)
+                    batch = []
+                    print(f"  {done}/{len(stale)} stored")
+        done += store_safety_risks(db, batch)
+        print(f"✅ Re-analyzed {done} job(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
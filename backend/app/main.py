@@ -1,15 +1,23 @@
-from fastapi import FastAPI
+import time
+
+_process_started = time.perf_counter()  # Cold-start timer, reported on startup and by /health/ready
+
+from fastapi import FastAPI, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+import asyncio
 import os
-from dotenv import load_dotenv
 
-from app.database import Base, engine
+from app.database import get_async_engine
+from app.redis_client import get_redis
 from app.routers import scenarios, jobs, metrics, assistant, auth
+from app.services.llm_providers import LLM_PROVIDER
 
-load_dotenv()
+# The schema is managed by Alembic (`alembic upgrade head`), not created at import
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+READINESS_TIMEOUT_SECONDS = 2
+_startup_seconds = None
 
 app = FastAPI(
     title="Aumovio Simulator API",
@@ -19,17 +27,24 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     """Log environment variables on startup for debugging"""
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    if api_key and len(api_key) > 20:
-        masked = f"{api_key[:10]}...{api_key[-10:]}"
-        print(f"✅ OpenAI API Key loaded: {masked}")
+    if LLM_PROVIDER == "stub":
+        print(f"⚠️  LLM provider: stub (canned replies, no OpenAI calls)")
     else:
-        print(f"⚠️  OpenAI API Key NOT SET or invalid")
+        api_key = os.getenv("OPENAI_API_KEY", "")
+        if api_key and len(api_key) > 20:
+            masked = f"{api_key[:10]}...{api_key[-10:]}"
+            print(f"✅ OpenAI API Key loaded: {masked}")
+        else:
+            print(f"⚠️  OpenAI API Key NOT SET or invalid")
 
     db_url = os.getenv("DATABASE_URL", "")
     print(f"✅ Database URL: {db_url[:30]}...")
     print(f"✅ Redis URL: {os.getenv('REDIS_URL', 'NOT SET')}")
     print(f"✅ CORS Origins: {os.getenv('CORS_ORIGINS', 'NOT SET')}")
+    
+    global _startup_seconds
+    _startup_seconds = round(time.perf_counter() - _process_started, 3)
+    print(f"✅ Started in {_startup_seconds}s")
 
 # CORS configuration
 origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
@@ -39,6 +54,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -57,5 +73,32 @@ def root():
     }
 
 @app.get("/health")
+@app.get("/health/live")
 def health_check():
+    """Liveness: the process is serving requests (no dependency checks)"""
     return {"status": "healthy"}
+
+async def _check_database() -> dict:
+    engine = get_async_engine()
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+    return {"status": "ok", "pool": engine.pool.status()}
+
+async def _check_redis() -> dict:
+    await run_in_threadpool(get_redis().ping)
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def readiness_check(response: Response):
+    """Readiness: database and Redis answer within READINESS_TIMEOUT_SECONDS (503 otherwise)"""
+    checks = {}
+    for name, check in (("database", _check_database), ("redis", _check_redis)):
+        try:
+            checks[name] = await asyncio.wait_for(check(), READINESS_TIMEOUT_SECONDS)
+        except Exception as e:
+            checks[name] = {"status": "error", "detail": str(e) or type(e).__name__}
+    
+    ready = all(check["status"] == "ok" for check in checks.values())
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ready" if ready else "unavailable", "startup_seconds": _startup_seconds, "checks": checks}
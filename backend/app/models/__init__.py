@@ -1,8 +1,15 @@
 from .scenario import Scenario
+from .scenario_revision import ScenarioRevision
+from .scenario_snapshot import ScenarioSnapshot
 from .job import Job
+from .job_status_count import JobStatusCount
 from .telemetry import Telemetry
 from .safety_risk import SafetyRisk
-from .assistant import AssistantMessage
+from .safety_event import SafetyEvent
+from .scenario_analytics import ScenarioAnalytics
+from .assistant import AssistantMessage, Conversation
 from .driving_stats import DrivingStats
+from .driving_leaderboard import DrivingLeaderboard
+from .user import User
 
-__all__ = ["Scenario", "Job", "Telemetry", "SafetyRisk", "AssistantMessage", "DrivingStats"]
+__all__ = ["Scenario", "ScenarioRevision", "ScenarioSnapshot", "Job", "JobStatusCount", "Telemetry", "SafetyRisk", "SafetyEvent", "ScenarioAnalytics", "AssistantMessage", "Conversation", "DrivingStats", "DrivingLeaderboard", "User"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, DateTime, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -15,11 +15,35 @@ class ContextType(str, enum.Enum):
     TELEMETRY_ANALYSIS = "telemetry_analysis"
     SAFETY_COACHING = "safety_coaching"
 
+class Conversation(Base):
+    """One chat thread, with a rolling summary of the turns that left the prompt window"""
+    __tablename__ = "conversations"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), nullable=True, index=True)
+    
+    # Summary of every message up to and including summarized_until
+    summary = Column(Text, nullable=True)
+    summarized_until = Column(DateTime(timezone=True), nullable=True)
+    summarized_count = Column(Integer, default=0)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    job = relationship("Job", backref="conversations")
+
 class AssistantMessage(Base):
     __tablename__ = "assistant_messages"
+    __table_args__ = (
+        # Prompt window: newest messages of one conversation
+        Index("ix_assistant_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), nullable=True)
+    # NULL for messages outside a chat (e.g. generated insights)
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id"), nullable=True)
     
     role = Column(SQLEnum(MessageRole), nullable=False)
     content = Column(Text, nullable=False)
@@ -29,3 +53,4 @@ class AssistantMessage(Base):
     
     # Relationships
     job = relationship("Job", backref="assistant_messages")
+    conversation = relationship("Conversation", backref="messages")
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+class DrivingLeaderboard(Base):
+    """
+    Per-scenario Manual Driving aggregate. session_count is incremented
+    atomically to number sessions; the ranking itself lives in a Redis
+    sorted set (app/services/driving_leaderboard.py).
+    """
+    __tablename__ = "driving_leaderboards"
+
+    scenario_id = Column(UUID(as_uuid=True), ForeignKey("scenarios.id"), primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -9,6 +9,10 @@ from app.database import Base
 class DrivingStats(Base):
     """Stores driving performance metrics for Manual Driving sessions."""
     __tablename__ = "driving_stats"
+    __table_args__ = (
+        # Leaderboard fallback when Redis is unavailable
+        Index("ix_driving_stats_scenario_id_score", "scenario_id", "score"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), unique=True, nullable=False)
@@ -29,6 +33,9 @@ class DrivingStats(Base):
     avg_speed = Column(Float, default=0.0)  # km/h
     distance_traveled = Column(Float, default=0.0)  # meters
     
+    # Leaderboard score, 0-100 (app/services/driving_leaderboard.driving_score)
+    score = Column(Float, nullable=True)
+    
     # Cached AI feedback (generated via OpenAI)
     ai_feedback = Column(Text, nullable=True)
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -22,6 +22,10 @@ class Job(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     scenario_id = Column(UUID(as_uuid=True), ForeignKey("scenarios.id"), nullable=False)
     
+    # Exact map the job ran on (immutable snapshot) and the scenario version it was taken from
+    snapshot_hash = Column(String(64), ForeignKey("scenario_snapshots.content_hash"), nullable=True)
+    scenario_version = Column(Integer, nullable=True)
+    
     simulation_type = Column(SQLEnum(SimulationType), nullable=False)
     status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING)
     
@@ -36,8 +40,19 @@ class Job(Base):
     # Cost estimation
     compute_cost_estimate = Column(Float, default=0.0)
     
+    # Set when a telemetry sample could not be fed to the streaming safety
+    # analytics; reanalysis recomputes the job from stored telemetry and clears it
+    safety_stream_incomplete = Column(Boolean, nullable=False, default=False, server_default="false")
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     scenario = relationship("Scenario", backref="jobs")
+    
+    # Keyset pagination: newest first, id breaks created_at ties
+    __table_args__ = (
+        Index("ix_jobs_status_created_at", "status", "created_at", "id"),
+        Index("ix_jobs_scenario_id_created_at", "scenario_id", "created_at", "id"),
+        Index("ix_jobs_created_at", "created_at", "id"),
+    )
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, Enum as SQLEnum
+from app.database import Base
+from app.models.job import JobStatus
+
+class JobStatusCount(Base):
+    """Number of jobs per status, kept in step with every status change (app/services/job_counters.py)"""
+    __tablename__ = "job_status_counts"
+
+    status = Column(SQLEnum(JobStatus), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, Float, Enum as SQLEnum, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+import uuid
+import enum
+from app.database import Base
+
+class SafetyEventType(str, enum.Enum):
+    NEAR_MISS = "near_miss"
+    COLLISION = "collision"
+
+class ActorType(str, enum.Enum):
+    VEHICLE = "vehicle"
+    PEDESTRIAN = "pedestrian"
+    HAZARD = "hazard"
+
+class SafetyEvent(Base):
+    """One geometric near-miss/collision encounter between a vehicle and another actor"""
+    __tablename__ = "safety_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), nullable=False, index=True)
+    
+    # Milliseconds from simulation start when the encounter began
+    timestamp = Column(Integer, nullable=False)
+    event_type = Column(SQLEnum(SafetyEventType), nullable=False)
+    
+    # Actors involved
+    vehicle_id = Column(Integer, nullable=False)
+    other_type = Column(SQLEnum(ActorType), nullable=False)
+    other_id = Column(Integer, nullable=False)  # vehicle id or pedestrian/hazard index
+    
+    # Location of the closest approach
+    position_x = Column(Float, nullable=False)
+    position_y = Column(Float, nullable=False)
+    
+    # Severity
+    min_distance = Column(Float, nullable=False)  # meters between bodies (<= 0 means contact)
+    time_to_collision = Column(Float, nullable=True)  # seconds, lowest observed
+    relative_speed = Column(Float, default=0.0)  # m/s at closest approach
+    
+    # Relationships
+    job = relationship("Job", backref="safety_events")
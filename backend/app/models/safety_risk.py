@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -11,15 +11,24 @@ class SafetyRisk(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), unique=True, nullable=False)
     
-    # Collision heatmap: grid-based density map of collision events
-    # Format: {grid_size: number, cells: [[{x, y, count}]]}
+    # Collision heatmap: sparse quadtree pyramid of event counts over the scenario extent
+    # Format: {format: 'quadtree', origin_x, origin_y, size, base_cell_size, max_level,
+    #          tile_cells, total, levels: {"<z>": {"<tx>,<ty>": [[cx, cy, count]]}}}
+    # Level z has 2^z x 2^z cells; see app/services/heatmap_pyramid.py
     collision_heatmap = Column(JSONB, default=dict)
     
     # Safety metrics
     near_miss_count = Column(Integer, default=0)
+    collision_count = Column(Integer, default=0)  # Geometric contacts (AI simulation)
     hazard_exposure_score = Column(Float, default=0.0)  # Time spent near hazards
     overall_safety_score = Column(Float, default=100.0)  # 0-100 scale
     
+    # SafetyAnalyzer.VERSION that produced this row (NULL = before versioning)
+    analyzer_version = Column(Integer, nullable=True)
+    
+    # Whether this result is currently merged into ScenarioAnalytics
+    aggregated = Column(Boolean, default=False)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
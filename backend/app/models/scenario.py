@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Text, DateTime, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 import uuid
@@ -38,5 +38,23 @@ class Scenario(Base):
     weather = Column(SQLEnum(WeatherType), default=WeatherType.CLEAR)
     weather_intensity = Column(Float, default=0.5)  # 0-1 scale
     
+    # Incremented on every edit; PATCH requires the version it was based on
+    # (optimistic concurrency). Edits are logged in scenario_revisions.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    # Listing summary, recomputed from the geometry on every write so the
+    # scenario picker never reads the JSONB columns (app/services/scenario_summary.py)
+    road_count = Column(Integer, nullable=True)
+    traffic_light_count = Column(Integer, nullable=True)
+    stop_sign_count = Column(Integer, nullable=True)
+    crosswalk_count = Column(Integer, nullable=True)
+    hazard_count = Column(Integer, nullable=True)
+    bbox_min_x = Column(Float, nullable=True)
+    bbox_min_y = Column(Float, nullable=True)
+    bbox_max_x = Column(Float, nullable=True)
+    bbox_max_y = Column(Float, nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)  # sha256 of geometry + weather
+    thumbnail = Column(Text, nullable=True)  # SVG path data of the roads in a 100x100 viewBox
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
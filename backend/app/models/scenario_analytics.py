@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import uuid
+from app.database import Base
+
+class ScenarioAnalytics(Base):
+    """Safety statistics merged across every completed job of a scenario"""
+    __tablename__ = "scenario_analytics"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    scenario_id = Column(UUID(as_uuid=True), ForeignKey("scenarios.id"), unique=True, nullable=False)
+    
+    # Additive counters (a job's contribution can be added or removed exactly)
+    job_count = Column(Integer, default=0)
+    total_duration_seconds = Column(Float, default=0.0)
+    near_miss_total = Column(Integer, default=0)
+    collision_total = Column(Integer, default=0)
+    score_sum = Column(Float, default=0.0)
+    score_sq_sum = Column(Float, default=0.0)
+    hazard_exposure_sum = Column(Float, default=0.0)
+    
+    # Safety score histogram: 20 bins of 5 points each
+    score_histogram = Column(JSONB, default=list)
+    
+    # Mergeable quantile sketches: {safety_score, hazard_exposure, near_misses, collisions}
+    sketches = Column(JSONB, default=dict)
+    
+    # Merged heatmap pyramid; its finest level holds the per-cell counts jobs are added to
+    collision_heatmap = Column(JSONB, default=dict)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    scenario = relationship("Scenario", backref="analytics", uselist=False)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+class ScenarioRevision(Base):
+    """One edit of a scenario, stored as the JSON-Patch operations that produced `version`"""
+    __tablename__ = "scenario_revisions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    scenario_id = Column(UUID(as_uuid=True), ForeignKey("scenarios.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    
+    # RFC 6902 operations: [{op, path, value?, from?}]
+    operations = Column(JSONB, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("scenario_id", "version", name="uq_scenario_revisions_scenario_version"),
+    )
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ScenarioSnapshot(Base):
+    """
+    Immutable, content-addressed copy of a scenario's geometry and weather.
+    Jobs reference the snapshot they ran on; identical maps share one row.
+    """
+    __tablename__ = "scenario_snapshots"
+
+    # sha256 of the data (app/services/scenario_summary.content_hash)
+    content_hash = Column(String(64), primary_key=True)
+    
+    # {roads, traffic_lights, stop_signs, crosswalks, hazards, weather, weather_intensity}
+    data = Column(JSONB, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
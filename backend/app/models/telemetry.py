@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -6,6 +6,10 @@ from app.database import Base
 
 class Telemetry(Base):
     __tablename__ = "telemetry"
+    __table_args__ = (
+        # Per-job scans in sample order (reanalysis, job summaries)
+        Index("ix_telemetry_job_id_timestamp", "job_id", "timestamp"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), nullable=False)
@@ -13,6 +17,9 @@ class Telemetry(Base):
     # Timestamp in milliseconds from simulation start
     timestamp = Column(Integer, nullable=False)
     
+    # AI vehicle the sample belongs to (None for manual driving)
+    vehicle_id = Column(Integer, nullable=True)
+    
     # Vehicle metrics
     speed = Column(Float, nullable=False)  # m/s
     acceleration = Column(Float, default=0.0)  # m/s²
@@ -0,0 +1,13 @@
+import redis
+import os
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+_client = None
+
+def get_redis() -> redis.Redis:
+    """Shared Redis client (connection-pooled, created on first use)"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    return _client
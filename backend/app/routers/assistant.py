@@ -1,56 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
-import os
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
 
-from app.database import get_db
-from app.models.assistant import AssistantMessage, MessageRole, ContextType
-from app.models.job import Job
-from app.models.telemetry import Telemetry
+import anyio
+
+from app.database import AsyncSessionLocal, get_db
+from app.models.assistant import AssistantMessage, Conversation, MessageRole, ContextType
 from app.schemas.assistant import ChatRequest, ChatResponse
+from app.services.conversations import open_conversation, recent_messages
+from app.services.job_context import (
+    cached_job_context, format_context, job_context, load_job_context, store_job_context
+)
+from app.services.llm_gateway import LLMUnavailable, complete, stream_complete
+from app.tasks.assistant_tasks import summarize_conversation
 
 router = APIRouter(prefix="/assistant", tags=["assistant"])
+logger = logging.getLogger(__name__)
 
-def get_openai_client():
-    """Get OpenAI client (lazy import to avoid errors if API key not set)"""
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    try:
-        from openai import OpenAI
-        api_key = os.getenv("OPENAI_API_KEY")
-        
-        if not api_key:
-            logger.warning("OpenAI API key not found in environment")
-            return None
-        
-        if api_key == "your_openai_api_key_here":
-            logger.warning("OpenAI API key is still set to default placeholder value")
-            return None
-            
-        logger.info(f"Initializing OpenAI client with key: {api_key[:10]}...")
-        client = OpenAI(api_key=api_key)
-        logger.info("OpenAI client initialized successfully")
-        return client
-        
-    except Exception as e:
-        logger.error(f"Failed to initialize OpenAI client: {str(e)}")
-        return None
+UNAVAILABLE_REPLY = "AI assistant is currently unavailable (OpenAI API key not configured)"
 
-@router.post("/chat", response_model=ChatResponse)
-def chat_with_assistant(request: ChatRequest, db: Session = Depends(get_db)):
-    """Chat with the AI assistant"""
-    
-    # Store user message
-    user_message = AssistantMessage(
-        job_id=request.job_id,
-        role=MessageRole.USER,
-        content=request.message,
-        context_type=request.context_type
-    )
-    db.add(user_message)
+def _start_turn(db: Session, request: ChatRequest) -> Conversation:
+    """Open (or start) the conversation and store the user message"""
+    conversation = open_conversation(db, request.conversation_id, request.job_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    if conversation.job_id != request.job_id:
+        raise HTTPException(status_code=400, detail="Conversation belongs to a different job")
+    db.add(_message(request, conversation, MessageRole.USER, request.message))
     db.commit()
-    
+    return conversation
+
+def _context_messages(
+    db: Session, request: ChatRequest, conversation: Conversation, job_summary: Optional[Dict]
+) -> Tuple[List[Dict[str, str]], bool]:
+    """
+    Prompt for one chat turn (the user message must already be stored), and
+    whether the conversation has enough old turns to be summarized.
+    job_summary is the job's context summary, fetched by the caller.
+    """
     # Build context
     system_prompt = """You are an automotive AI assistant for the Aumovio Simulator platform.
 You help users understand vehicle mechanics, driving techniques, simulation outcomes, and autonomous system behavior.
@@ -59,72 +50,134 @@ Be concise, technical, and helpful."""
     
     context_messages = [{"role": "system", "content": system_prompt}]
     
-    # Add telemetry context if job_id provided
-    if request.job_id:
-        job = db.query(Job).filter(Job.id == request.job_id).first()
-        if job:
-            # Get telemetry summary
-            telemetry = db.query(Telemetry).filter(
-                Telemetry.job_id == request.job_id
-            ).all()
-            
-            if telemetry:
-                avg_speed = sum(t.speed for t in telemetry) / len(telemetry)
-                max_speed = max(t.speed for t in telemetry)
-                avg_brake = sum(t.brake_intensity for t in telemetry) / len(telemetry)
-                
-                context_messages.append({
-                    "role": "system",
-                    "content": f"""Telemetry Context:
-- Simulation Type: {job.simulation_type}
-- Vehicle Count: {job.vehicle_count}
-- Weather: {job.weather}
-- Average Speed: {avg_speed:.1f} m/s
-- Max Speed: {max_speed:.1f} m/s
-- Average Brake Intensity: {avg_brake:.1f}/10"""
-                })
+    # Add telemetry context if job_id provided (summarized once per job, then cached)
+    if job_summary:
+        context_messages.append({
+            "role": "system",
+            "content": f"Telemetry Context:\n{format_context(job_summary)}"
+        })
     
-    # Get conversation history (last 10 messages)
-    history = db.query(AssistantMessage).filter(
-        AssistantMessage.job_id == request.job_id
-    ).order_by(AssistantMessage.created_at.desc()).limit(10).all()
+    # Older turns arrive as a rolling summary, recent ones verbatim
+    if conversation.summary:
+        context_messages.append({
+            "role": "system",
+            "content": f"Summary of the earlier conversation:\n{conversation.summary}"
+        })
+    history, summary_due = recent_messages(db, conversation)
     
-    for msg in reversed(history[1:]):  # Skip the just-added user message
+    for msg in history[:-1]:  # Skip the just-added user message
         context_messages.append({
             "role": msg.role.value,
             "content": msg.content
         })
     
     context_messages.append({"role": "user", "content": request.message})
-    
-    # Call OpenAI API
-    client = get_openai_client()
-    if not client:
-        reply_content = "AI assistant is currently unavailable (OpenAI API key not configured)"
-    else:
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=context_messages,
-                max_tokens=500,
-                temperature=0.7
-            )
-            reply_content = response.choices[0].message.content
-        except Exception as e:
-            reply_content = f"Error communicating with AI assistant: {str(e)}"
-    
-    # Store assistant response
-    assistant_message = AssistantMessage(
+    return context_messages, summary_due
+
+def _message(request: ChatRequest, conversation: Conversation, role: MessageRole, content: str) -> AssistantMessage:
+    return AssistantMessage(
         job_id=request.job_id,
-        role=MessageRole.ASSISTANT,
-        content=reply_content,
+        conversation_id=conversation.id,
+        role=role,
+        content=content,
         context_type=request.context_type
     )
+
+def _summarize_later(conversation_id) -> None:
+    try:
+        summarize_conversation.delay(str(conversation_id))
+    except Exception as e:
+        logger.warning(f"Failed to dispatch conversation summary for {conversation_id}: {e}")
+
+@router.post("/chat", response_model=ChatResponse)
+def chat_with_assistant(request: ChatRequest, db: Session = Depends(get_db)):
+    """Chat with the AI assistant"""
+    
+    # Store user message
+    conversation = _start_turn(db, request)
+    
+    job_summary = job_context(db, request.job_id) if request.job_id else None
+    context_messages, summary_due = _context_messages(db, request, conversation, job_summary)
+    
+    # Call OpenAI API (conversations are not cached: each turn should get a fresh reply)
+    try:
+        reply_content = complete(context_messages, max_tokens=500, temperature=0.7, cache=False)
+    except LLMUnavailable:
+        reply_content = UNAVAILABLE_REPLY
+    except Exception as e:
+        reply_content = f"Error communicating with AI assistant: {str(e)}"
+    
+    # Store assistant response
+    assistant_message = _message(request, conversation, MessageRole.ASSISTANT, reply_content)
     db.add(assistant_message)
     db.commit()
     db.refresh(assistant_message)
+    if summary_due:
+        _summarize_later(conversation.id)
     
     return ChatResponse(
         reply=reply_content,
-        message_id=assistant_message.id
+        message_id=assistant_message.id,
+        conversation_id=conversation.id
+    )
+
+async def _job_context_async(db, job_id) -> Optional[Dict]:
+    """job_context() for the async session: Redis calls go to the threadpool, queries to run_sync"""
+    summary, generation = await run_in_threadpool(cached_job_context, job_id)
+    if summary is not None:
+        return summary
+    summary, final = await db.run_sync(load_job_context, job_id)
+    if final:
+        await run_in_threadpool(store_job_context, job_id, summary, generation)
+    return summary
+
+def _sse(event: Dict) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+@router.post("/chat/stream")
+async def stream_chat_with_assistant(request: ChatRequest):
+    """
+    Chat with the AI assistant, streamed as server-sent events:
+    {"type": "token", "content": ...} per chunk, an {"type": "error", "detail": ...}
+    if generation fails, then {"type": "done", "message_id": ..., "conversation_id": ...}.
+    The reply is stored once, when generation ends.
+    """
+    # Before the stream starts, so an unknown conversation is still a 404
+    async with AsyncSessionLocal() as db:
+        conversation = await db.run_sync(_start_turn, request)
+    
+    async def events():
+        # The stream outlives request dependencies, so it owns its session
+        async with AsyncSessionLocal() as db:
+            job_summary = await _job_context_async(db, request.job_id) if request.job_id else None
+            context_messages, summary_due = await db.run_sync(_context_messages, request, conversation, job_summary)
+            
+            chunks: List[str] = []
+            error: Optional[str] = None
+            try:
+                async for chunk in stream_complete(context_messages, max_tokens=500, temperature=0.7):
+                    chunks.append(chunk)
+                    yield _sse({"type": "token", "content": chunk})
+            except LLMUnavailable:
+                error = UNAVAILABLE_REPLY
+            except Exception as e:
+                logger.warning(f"Assistant stream failed: {e}")
+                error = f"Error communicating with AI assistant: {str(e)}"
+            finally:
+                # Also runs when the client disconnects: keep what was generated
+                with anyio.CancelScope(shield=True):
+                    assistant_message = _message(request, conversation, MessageRole.ASSISTANT, "".join(chunks) or error or "")
+                    db.add(assistant_message)
+                    await db.commit()
+                    if summary_due:
+                        await run_in_threadpool(_summarize_later, conversation.id)
+            
+            if error:
+                yield _sse({"type": "error", "detail": error})
+            yield _sse({"type": "done", "message_id": str(assistant_message.id), "conversation_id": str(conversation.id)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
@@ -1,27 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
+import asyncio
+import base64
+import logging
+import redis
 
-from app.database import get_db
+from app.database import get_async_db
+from app.redis_client import get_redis
 from app.models.job import Job, JobStatus, SimulationType
-from app.models.scenario import Scenario
 from app.models.telemetry import Telemetry
 from app.models.safety_risk import SafetyRisk
-from app.models.assistant import AssistantMessage
+from app.models.safety_event import SafetyEvent
+from app.models.assistant import AssistantMessage, Conversation
 from app.models.driving_stats import DrivingStats
+from app.models.job_status_count import JobStatusCount
 from app.schemas.job import JobCreate, JobResponse
+from app.services.streaming_safety_analyzer import pop_job_stream
+from app.services.scenario_analytics import AnalyticsDelta, apply_analytics_delta, apply_safety_risk, safety_risk_fields
+from app.services.response_cache import context_key, invalidate, job_keys, safety_key, telemetry_key
+from app.services.job_counters import record_status_change_async, seed_status_counts, status_counts
+from app.services.job_events import job_deleted_event, job_event, job_event_broadcaster, publish_job_event
+from app.services.scenario_snapshots import ensure_snapshot
+from app.services.driving_leaderboard import remove_sessions
 from app.tasks.simulation_tasks import run_ai_simulation
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
+logger = logging.getLogger(__name__)
 
 @router.post("/", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
-def create_job(job: JobCreate, db: Session = Depends(get_db)):
+async def create_job(job: JobCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new simulation job"""
-    # Verify scenario exists
-    scenario = db.query(Scenario).filter(Scenario.id == job.scenario_id).first()
-    if not scenario:
+    # Verify scenario exists and pin the exact map the job runs on
+    snapshot = await ensure_snapshot(db, job.scenario_id)
+    if not snapshot:
         raise HTTPException(status_code=404, detail="Scenario not found")
     
     # Estimate compute cost (simple formula)
@@ -33,88 +51,187 @@ def create_job(job: JobCreate, db: Session = Depends(get_db)):
         simulation_type=job.simulation_type,
         duration_seconds=job.duration_seconds,
         vehicle_count=job.vehicle_count,
-        weather=scenario.weather,
+        weather=snapshot.weather,
+        snapshot_hash=snapshot.content_hash,
+        scenario_version=snapshot.scenario_version,
         compute_cost_estimate=round(cost_estimate, 2),
         status=JobStatus.PENDING
     )
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await record_status_change_async(db, None, JobStatus.PENDING)
+    await db.commit()
+    await db.refresh(db_job)
+    # Announce before dispatching so "created" reaches dashboards ahead of the worker's "running"
+    await run_in_threadpool(publish_job_event, job_event(db_job))
     
-    # Dispatch Celery task for AI simulations
+    # Dispatch Celery task for AI simulations (the worker loads the snapshot by hash)
     if job.simulation_type == "ai_simulation":
-        from app.tasks.simulation_tasks import run_ai_simulation
-        task = run_ai_simulation.delay(
-            str(db_job.id), 
-            {
-                "roads": scenario.roads,
-                "traffic_lights": scenario.traffic_lights,
-                "stop_signs": scenario.stop_signs,
-                "crosswalks": scenario.crosswalks,
-                "hazards": scenario.hazards,
-                "weather": scenario.weather,
-                "weather_intensity": scenario.weather_intensity
-            }
-        )
+        task = await run_in_threadpool(run_ai_simulation.delay, str(db_job.id), snapshot.content_hash)
         db_job.celery_task_id = task.id
-        db.commit()
+        await db.commit()
     
     return db_job
 
+def _encode_cursor(job: Job) -> str:
+    raw = f"{job.created_at.isoformat()}|{job.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        created_at, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/", response_model=List[JobResponse])
-def list_jobs(
-    status_filter: str = None, 
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db)
+async def list_jobs(
+    response: Response,
+    status_filter: Optional[JobStatus] = None, 
+    scenario_id: Optional[UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500), 
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List all jobs with optional status filter"""
-    query = db.query(Job)
+    """
+    List jobs newest first with optional status/scenario filters
+    Keyset-paginated: pass the X-Next-Cursor response header back as `cursor`
+    """
+    query = select(Job)
     
     if status_filter:
-        query = query.filter(Job.status == status_filter)
+        query = query.where(Job.status == status_filter)
+    if scenario_id:
+        query = query.where(Job.scenario_id == scenario_id)
+    if cursor:
+        query = query.where(tuple_(Job.created_at, Job.id) < tuple_(*_decode_cursor(cursor)))
     
-    jobs = query.order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
+    # One extra row tells whether another page exists
+    result = await db.execute(query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1))
+    jobs = result.scalars().all()
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(jobs[-1])
     return jobs
 
+@router.get("/counts", response_model=Dict[str, int])
+async def get_job_counts(db: AsyncSession = Depends(get_async_db)):
+    """Number of jobs per status, read from maintained counters"""
+    rows = (await db.execute(select(JobStatusCount))).scalars().all()
+    if not rows:
+        await db.run_sync(seed_status_counts)
+        rows = (await db.execute(select(JobStatusCount))).scalars().all()
+    return status_counts(rows)
+
+SSE_KEEPALIVE_SECONDS = 15
+
+@router.get("/events")
+async def stream_job_events(request: Request):
+    """
+    Server-sent events for job creation, status/progress changes and deletion
+    Clients load the list once (and on "resync"), then apply events
+    """
+    async def events():
+        async with job_event_broadcaster.subscribe() as queue:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    data = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {data}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{job_id}", response_model=JobResponse)
-def get_job(job_id: UUID, db: Session = Depends(get_db)):
+async def get_job(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get a specific job by ID"""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
 @router.patch("/{job_id}/status")
-def update_job_status(
+async def update_job_status(
     job_id: UUID, 
-    new_status: str,
-    db: Session = Depends(get_db)
+    new_status: JobStatus,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update job status (internal endpoint for workers)"""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    previous_status = job.status
     job.status = new_status
     if new_status == JobStatus.COMPLETED:
         job.completed_at = datetime.utcnow()
+        try:
+            analyzer = await run_in_threadpool(pop_job_stream, get_redis(), str(job.id))
+        except redis.RedisError as e:
+            logger.warning(f"Could not read safety stream for job {job.id}: {e}")
+            analyzer = None
+        if analyzer is not None:
+            await db.run_sync(_store_streamed_safety_risk, job, analyzer.result())
     
-    db.commit()
+    # Every status change updates these rows: lock them last so they're held only until the commit
+    await record_status_change_async(db, previous_status, new_status)
+    await db.commit()
+    if new_status == JobStatus.COMPLETED:
+        await run_in_threadpool(invalidate, [safety_key(job_id), telemetry_key(job_id), context_key(job_id)])
+    await run_in_threadpool(publish_job_event, job_event(job, previous_status))
     return {"status": "updated"}
 
 
+def _store_streamed_safety_risk(db: Session, job: Job, analytics: dict):
+    """Persist safety analytics accumulated while telemetry was ingested (runs via AsyncSession.run_sync)"""
+    safety_risk = db.query(SafetyRisk).filter(SafetyRisk.job_id == job.id).first()
+    # Old and new contributions in one update of the scenario aggregates
+    delta = AnalyticsDelta()
+    if safety_risk:
+        if safety_risk.aggregated:
+            delta.add(safety_risk_fields(safety_risk), job.duration_seconds, weight=-1)
+        for field, value in analytics.items():
+            setattr(safety_risk, field, value)
+    else:
+        safety_risk = SafetyRisk(job_id=job.id, **analytics)
+        db.add(safety_risk)
+    delta.add(safety_risk_fields(safety_risk), job.duration_seconds)
+    apply_analytics_delta(db, job.scenario_id, delta)
+    safety_risk.aggregated = True
+
+
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_job(job_id: UUID, db: Session = Depends(get_db)):
-    """Delete a job and its related telemetry, safety_risks, assistant_messages, and driving_stats"""
-    job = db.query(Job).filter(Job.id == job_id).first()
+async def delete_job(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """Delete a job and its related telemetry, safety_risks, safety_events, assistant_messages, conversations, and driving_stats"""
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    # Remove the job's contribution from the scenario aggregates
+    safety_risk = (await db.execute(
+        select(SafetyRisk).where(SafetyRisk.job_id == job_id)
+    )).scalar_one_or_none()
+    if safety_risk:
+        await db.run_sync(
+            lambda session: apply_safety_risk(session, job.scenario_id, safety_risk, job.duration_seconds, weight=-1)
+        )
+    
+    event = job_deleted_event(job)
+    
     # Delete related records first (foreign key constraints)
-    db.query(Telemetry).filter(Telemetry.job_id == job_id).delete()
-    db.query(SafetyRisk).filter(SafetyRisk.job_id == job_id).delete()
-    db.query(AssistantMessage).filter(AssistantMessage.job_id == job_id).delete()
-    db.query(DrivingStats).filter(DrivingStats.job_id == job_id).delete()
-    db.delete(job)
-    db.commit()
+    for model in (Telemetry, SafetyRisk, SafetyEvent, AssistantMessage, Conversation, DrivingStats):
+        await db.execute(delete(model).where(model.job_id == job_id))
+    await db.delete(job)
+    await record_status_change_async(db, job.status, None)
+    await db.commit()
+    await run_in_threadpool(invalidate, job_keys(job_id))
+    await run_in_threadpool(publish_job_event, event)
+    try:
+        await run_in_threadpool(remove_sessions, get_redis(), job.scenario_id, [job_id])
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard update failed for job {job_id}: {e}")
     return None
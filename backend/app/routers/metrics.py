@@ -1,46 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.dialects.postgresql import JSONB
+from typing import Dict, List, Optional
 from uuid import UUID
+import logging
+import redis
 
-from app.database import get_db
+from app.database import get_db, get_async_db
+from app.redis_client import get_redis
 from app.models.telemetry import Telemetry
 from app.models.safety_risk import SafetyRisk
-from app.models.job import Job
+from app.models.safety_event import SafetyEvent
+from app.models.job import Job, JobStatus
+from app.models.scenario import Scenario
+from app.models.scenario_snapshot import ScenarioSnapshot
 from app.schemas.telemetry import TelemetryCreate, TelemetryResponse
+from app.schemas.safety_event import SafetyEventResponse
+from app.services.streaming_safety_analyzer import StreamingSafetyAnalyzer, feed_job_stream, job_stream_exists
+from app.services.response_cache import (
+    cached_json_response, context_key, invalidate, insights_key, safety_key, telemetry_key
+)
+from app.services.scenario_summary import scenario_data
+from app.services.fast_response import fast_response
+from app.services.heatmap_pyramid import HEATMAP_FORMAT, heatmap_overview, scenario_extent, select_tiles
 
 router = APIRouter(prefix="/metrics", tags=["metrics"])
+logger = logging.getLogger(__name__)
 
 @router.post("/telemetry", response_model=TelemetryResponse, status_code=status.HTTP_201_CREATED)
-def create_telemetry(telemetry: TelemetryCreate, db: Session = Depends(get_db)):
+async def create_telemetry(telemetry: TelemetryCreate, db: AsyncSession = Depends(get_async_db)):
     """Store telemetry data point"""
     # Verify job exists
-    job = db.query(Job).filter(Job.id == telemetry.job_id).first()
+    job = await db.get(Job, telemetry.job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     db_telemetry = Telemetry(**telemetry.model_dump())
     db.add(db_telemetry)
-    db.commit()
-    db.refresh(db_telemetry)
+    await db.commit()
+    if job.status == JobStatus.COMPLETED:
+        await run_in_threadpool(invalidate, [telemetry_key(job.id), context_key(job.id)])
+    
+    # Feed the job's streaming safety analytics (finalized when the job completes)
+    try:
+        redis_client = get_redis()
+        new_stream = StreamingSafetyAnalyzer
+        if not await run_in_threadpool(job_stream_exists, redis_client, str(job.id)):
+            geometry = await _job_scenario_data(db, job)
+            new_stream = lambda: _new_safety_stream(geometry)
+        await run_in_threadpool(
+            feed_job_stream,
+            redis_client,
+            str(job.id),
+            telemetry.model_dump(),
+            new_stream
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Safety stream update failed for job {job.id}, flagging it for reanalysis: {e}")
+        # The streamed analytics miss this sample; reanalysis recomputes them from the stored rows
+        await db.execute(update(Job).where(Job.id == job.id).values(safety_stream_incomplete=True))
+        await db.commit()
+    
     return db_telemetry
 
+async def _job_scenario_data(db: AsyncSession, job: Job) -> Optional[dict]:
+    """Geometry the job runs on: its snapshot, or the live scenario for older jobs"""
+    if job.snapshot_hash:
+        data = await db.scalar(
+            select(ScenarioSnapshot.data).where(ScenarioSnapshot.content_hash == job.snapshot_hash)
+        )
+        if data is not None:
+            return data
+    scenario = await db.get(Scenario, job.scenario_id)
+    return scenario_data(scenario) if scenario else None
+
+def _new_safety_stream(data: Optional[dict]) -> StreamingSafetyAnalyzer:
+    """Analyzer for the first ingested sample of a job (scenario geometry is loaded once)"""
+    if not data:
+        return StreamingSafetyAnalyzer()
+    return StreamingSafetyAnalyzer(data.get("hazards"), extent=scenario_extent(data))
+
 @router.get("/telemetry/{job_id}", response_model=List[TelemetryResponse])
-def get_job_telemetry(job_id: UUID, db: Session = Depends(get_db)):
-    """Get all telemetry data for a job"""
-    telemetry = db.query(Telemetry).filter(
-        Telemetry.job_id == job_id
-    ).order_by(Telemetry.timestamp).all()
+async def get_job_telemetry(job_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get all telemetry data for a job (cached once the job has completed)"""
+    return await cached_json_response(request, telemetry_key(job_id), lambda: _telemetry_payload(job_id, db))
+
+async def _telemetry_payload(job_id: UUID, db: AsyncSession):
+    job_status = await db.scalar(select(Job.status).where(Job.id == job_id))
+    # Plain column rows: no ORM objects or per-row response models for large jobs
+    result = await db.execute(
+        select(*[getattr(Telemetry, field) for field in TelemetryResponse.model_fields])
+        .where(Telemetry.job_id == job_id)
+        .order_by(Telemetry.timestamp, Telemetry.vehicle_id, Telemetry.id)
+    )
+    telemetry = [dict(row._mapping) for row in result]
     
     if not telemetry:
         raise HTTPException(status_code=404, detail="No telemetry data found")
     
-    return telemetry
+    # A running job may still receive samples
+    return telemetry, job_status == JobStatus.COMPLETED
 
 @router.get("/safety/{job_id}")
-def get_safety_risk(job_id: UUID, db: Session = Depends(get_db)):
-    """Get safety risk analysis for a job"""
-    safety_risk = db.query(SafetyRisk).filter(SafetyRisk.job_id == job_id).first()
+async def get_safety_risk(job_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get safety risk analysis for a job (cached; rewritten only by completion or re-analysis)"""
+    return await cached_json_response(request, safety_key(job_id), lambda: _safety_risk_payload(job_id, db))
+
+async def _safety_risk_payload(job_id: UUID, db: AsyncSession):
+    safety_risk = (await db.execute(
+        select(SafetyRisk).where(SafetyRisk.job_id == job_id)
+    )).scalar_one_or_none()
     
     if not safety_risk:
         raise HTTPException(status_code=404, detail="Safety risk data not found")
@@ -48,148 +120,362 @@ def get_safety_risk(job_id: UUID, db: Session = Depends(get_db)):
     return {
         "id": safety_risk.id,
         "job_id": safety_risk.job_id,
-        "collision_heatmap": safety_risk.collision_heatmap,
+        "collision_heatmap": heatmap_overview(safety_risk.collision_heatmap or {}),
         "near_miss_count": safety_risk.near_miss_count,
+        "collision_count": safety_risk.collision_count,
         "hazard_exposure_score": safety_risk.hazard_exposure_score,
         "overall_safety_score": safety_risk.overall_safety_score,
         "created_at": safety_risk.created_at
+    }, True
+
+def _heatmap_tiles(
+    db: Session,
+    heatmap_column,
+    row_filter,
+    zoom: int,
+    viewport: Optional[tuple]
+) -> Optional[Dict]:
+    """
+    Serve one pyramid level from a JSONB heatmap column without loading other levels
+    Sync; async handlers call it through AsyncSession.run_sync
+    """
+    row = db.query(
+        heatmap_column.op("-", return_type=JSONB)("levels")
+    ).filter(row_filter).first()
+    if not row:
+        return None
+    
+    metadata = row[0] or {}
+    if metadata.get("format") != HEATMAP_FORMAT:
+        raise HTTPException(status_code=409, detail="Heatmap was stored in the legacy dense format")
+    
+    # Fetch only the requested level from JSONB
+    zoom = min(zoom, metadata["max_level"])
+    level_tiles = db.query(heatmap_column["levels"][str(zoom)]).filter(row_filter).scalar()
+    
+    return {
+        **metadata,
+        "zoom": zoom,
+        "cell_size": metadata["size"] / (1 << zoom),
+        "tiles": select_tiles(metadata, level_tiles, zoom, viewport)
     }
 
+def _viewport(min_x, min_y, max_x, max_y) -> Optional[tuple]:
+    if None in (min_x, min_y, max_x, max_y):
+        return None
+    return (min_x, min_y, max_x, max_y)
+
+@router.get("/safety/{job_id}/heatmap")
+async def get_heatmap_tiles(
+    job_id: UUID,
+    request: Request,
+    zoom: int = Query(0, ge=0, description="Pyramid level; clamped to the finest level"),
+    min_x: Optional[float] = None,
+    min_y: Optional[float] = None,
+    max_x: Optional[float] = None,
+    max_y: Optional[float] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the non-empty collision heatmap tiles of one zoom level inside a viewport"""
+    tiles = await db.run_sync(
+        _heatmap_tiles, SafetyRisk.collision_heatmap, SafetyRisk.job_id == job_id,
+        zoom, _viewport(min_x, min_y, max_x, max_y)
+    )
+    if tiles is None:
+        raise HTTPException(status_code=404, detail="Safety risk data not found")
+    return fast_response(request, tiles)
+
+@router.post("/safety/reanalyze", status_code=status.HTTP_202_ACCEPTED)
+def reanalyze_safety(
+    scenario_id: Optional[UUID] = None,
+    job_ids: Optional[List[UUID]] = Query(None),
+    force: bool = False
+):
+    """Recompute SafetyRisk rows produced by an older analyzer version (async)"""
+    from app.tasks.analytics_tasks import reanalyze_safety_risks
+    
+    task = reanalyze_safety_risks.delay(
+        [str(job_id) for job_id in job_ids] if job_ids else None,
+        str(scenario_id) if scenario_id else None,
+        force
+    )
+    return {"status": "dispatched", "task_id": task.id}
+
+@router.get("/safety/{job_id}/events", response_model=List[SafetyEventResponse])
+async def get_safety_events(
+    job_id: UUID,
+    request: Request,
+    event_type: str = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get geometric near-miss/collision events for a job"""
+    query = select(
+        *[getattr(SafetyEvent, field) for field in SafetyEventResponse.model_fields]
+    ).where(SafetyEvent.job_id == job_id)
+    
+    if event_type:
+        query = query.where(SafetyEvent.event_type == event_type)
+    
+    result = await db.execute(query.order_by(SafetyEvent.timestamp))
+    return fast_response(request, [dict(row._mapping) for row in result])
+
 @router.get("/insights/{job_id}")
-def get_ai_insights(job_id: UUID, db: Session = Depends(get_db)):
-    """Get AI-generated insights for a job"""
+async def get_ai_insights(job_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get AI-generated insights for a job (cached once generated)"""
+    return await cached_json_response(request, insights_key(job_id), lambda: _insights_payload(job_id, db))
+
+async def _insights_payload(job_id: UUID, db: AsyncSession):
     from app.models.assistant import AssistantMessage, ContextType
     
-    insights = db.query(AssistantMessage).filter(
-        AssistantMessage.job_id == job_id,
-        AssistantMessage.context_type == ContextType.TELEMETRY_ANALYSIS
-    ).order_by(AssistantMessage.created_at.desc()).first()
+    insights = (await db.execute(
+        select(AssistantMessage).where(
+            AssistantMessage.job_id == job_id,
+            AssistantMessage.context_type == ContextType.TELEMETRY_ANALYSIS
+        ).order_by(AssistantMessage.created_at.desc()).limit(1)
+    )).scalar_one_or_none()
     
     if not insights:
-        return {"insights": "No AI insights generated yet"}
+        return {"insights": "No AI insights generated yet"}, False
     
     return {
         "id": insights.id,
         "content": insights.content,
         "created_at": insights.created_at
-    }
+    }, True
+
+
+# ============ SCENARIO ANALYTICS ENDPOINTS ============
+
+from sqlalchemy.orm import defer
+from app.models.scenario_analytics import ScenarioAnalytics
+from app.services.scenario_analytics import summarize_scenario_analytics
+
+
+@router.get("/scenarios/{scenario_id}/analytics")
+async def get_scenario_analytics(scenario_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """Get safety statistics merged across all completed jobs of a scenario"""
+    row = (await db.execute(
+        select(
+            ScenarioAnalytics,
+            ScenarioAnalytics.collision_heatmap.op("-", return_type=JSONB)("levels")
+        ).options(
+            defer(ScenarioAnalytics.collision_heatmap)
+        ).where(ScenarioAnalytics.scenario_id == scenario_id)
+    )).first()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="No analytics for this scenario yet")
+    
+    analytics, heatmap_metadata = row
+    return summarize_scenario_analytics(analytics, heatmap_metadata)
+
+
+@router.get("/scenarios/{scenario_id}/analytics/heatmap")
+async def get_scenario_heatmap_tiles(
+    scenario_id: UUID,
+    request: Request,
+    zoom: int = Query(0, ge=0, description="Pyramid level; clamped to the finest level"),
+    min_x: Optional[float] = None,
+    min_y: Optional[float] = None,
+    max_x: Optional[float] = None,
+    max_y: Optional[float] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get merged heatmap tiles across all jobs of a scenario"""
+    tiles = await db.run_sync(
+        _heatmap_tiles, ScenarioAnalytics.collision_heatmap, ScenarioAnalytics.scenario_id == scenario_id,
+        zoom, _viewport(min_x, min_y, max_x, max_y)
+    )
+    if tiles is None:
+        raise HTTPException(status_code=404, detail="No analytics for this scenario yet")
+    return fast_response(request, tiles)
 
 
 # ============ DRIVING STATS ENDPOINTS ============
 
 from app.models.driving_stats import DrivingStats
-from app.models.scenario import Scenario
-from app.schemas.driving_stats import DrivingStatsCreate, DrivingStatsResponse, DrivingStatsSummary
+from app.schemas.driving_stats import (
+    DrivingStatsCreate, DrivingStatsResponse, DrivingStatsSummary, DrivingRank, LeaderboardEntry,
+    FeedbackBatchRequest, FeedbackBatchStatus
+)
+from app.services.driving_feedback import FEEDBACK_MAX_TOKENS, FEEDBACK_TEMPERATURE, feedback_messages
+from app.services.driving_leaderboard import (
+    driving_score, next_session_number, ensure_leaderboard, record_session, score_rank,
+    top_sessions, score_rank_from_db, top_sessions_from_db
+)
 
 
 @router.post("/driving-stats", response_model=DrivingStatsResponse, status_code=status.HTTP_201_CREATED)
-def create_driving_stats(stats: DrivingStatsCreate, db: Session = Depends(get_db)):
+async def create_driving_stats(stats: DrivingStatsCreate, db: AsyncSession = Depends(get_async_db)):
     """Store driving performance stats after a Manual Driving session."""
     # Verify job exists
-    job = db.query(Job).filter(Job.id == stats.job_id).first()
+    job = await db.get(Job, stats.job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Calculate session number for this scenario
-    existing_count = db.query(DrivingStats).filter(
-        DrivingStats.scenario_id == stats.scenario_id
-    ).count()
-    session_number = existing_count + 1
+    # Atomic per-scenario counter: concurrent submissions never share a number
+    session_number = await next_session_number(db, stats.scenario_id)
     
     db_stats = DrivingStats(
         **stats.model_dump(),
-        session_number=session_number
+        session_number=session_number,
+        score=driving_score(stats)
     )
     db.add(db_stats)
-    db.commit()
-    db.refresh(db_stats)
+    await db.commit()
+    await db.refresh(db_stats)
+    await run_in_threadpool(invalidate, [context_key(db_stats.job_id)])
+    
+    try:
+        await run_in_threadpool(record_session, get_redis(), db_stats.scenario_id, db_stats.job_id, db_stats.score)
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard update failed for job {db_stats.job_id}: {e}")
     return db_stats
 
 
 @router.get("/driving-stats/{job_id}", response_model=DrivingStatsResponse)
-def get_driving_stats(job_id: UUID, db: Session = Depends(get_db)):
+async def get_driving_stats(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get driving stats for a specific job."""
-    stats = db.query(DrivingStats).filter(DrivingStats.job_id == job_id).first()
+    stats = (await db.execute(
+        select(DrivingStats).where(DrivingStats.job_id == job_id)
+    )).scalar_one_or_none()
     if not stats:
         raise HTTPException(status_code=404, detail="Driving stats not found")
     return stats
 
 
+@router.get("/driving-stats/{job_id}/rank", response_model=DrivingRank)
+async def get_driving_rank(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """Rank and percentile of a session among all sessions of its scenario (O(log n) in Redis)."""
+    stats = (await db.execute(
+        select(DrivingStats).where(DrivingStats.job_id == job_id)
+    )).scalar_one_or_none()
+    if not stats:
+        raise HTTPException(status_code=404, detail="Driving stats not found")
+    score = stats.score if stats.score is not None else driving_score(stats)
+    
+    try:
+        redis_client = get_redis()
+        await ensure_leaderboard(db, redis_client, stats.scenario_id)
+        rank, lower, total = await run_in_threadpool(score_rank, redis_client, stats.scenario_id, score)
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard unavailable, ranking from the database: {e}")
+        rank, lower, total = await db.run_sync(score_rank_from_db, stats.scenario_id, score)
+    
+    return DrivingRank(
+        job_id=stats.job_id,
+        scenario_id=stats.scenario_id,
+        score=score,
+        rank=rank,
+        total_sessions=total,
+        percentile=round(100.0 * lower / total, 1) if total else 0.0
+    )
+
+
+@router.get("/driving-stats/scenario/{scenario_id}/leaderboard", response_model=List[LeaderboardEntry])
+async def get_scenario_leaderboard(
+    scenario_id: UUID,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Best-scoring driving sessions of a scenario (rank 1 first; ties share a rank)."""
+    try:
+        redis_client = get_redis()
+        await ensure_leaderboard(db, redis_client, scenario_id)
+        ranked = await run_in_threadpool(top_sessions, redis_client, scenario_id, offset, limit)
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard unavailable, reading it from the database: {e}")
+        ranked = await db.run_sync(top_sessions_from_db, scenario_id, offset, limit)
+    if not ranked:
+        return []
+    
+    result = await db.execute(
+        select(DrivingStats).where(DrivingStats.job_id.in_([UUID(job_id) for job_id, _, _ in ranked]))
+    )
+    sessions = {str(stats.job_id): stats for stats in result.scalars()}
+    return [
+        LeaderboardEntry(**DrivingStatsSummary.model_validate(sessions[job_id]).model_dump(), rank=rank)
+        for job_id, _, rank in ranked
+        if job_id in sessions
+    ]
+
+
 @router.get("/driving-stats/scenario/{scenario_id}", response_model=List[DrivingStatsSummary])
-def get_scenario_sessions(scenario_id: UUID, db: Session = Depends(get_db)):
+async def get_scenario_sessions(scenario_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """List all driving sessions for a scenario."""
-    sessions = db.query(DrivingStats).filter(
-        DrivingStats.scenario_id == scenario_id
-    ).order_by(DrivingStats.session_number.desc()).all()
-    return sessions
+    result = await db.execute(
+        select(DrivingStats).where(
+            DrivingStats.scenario_id == scenario_id
+        ).order_by(DrivingStats.session_number.desc())
+    )
+    return result.scalars().all()
 
 
 @router.post("/driving-stats/{job_id}/generate-feedback")
-def generate_driving_feedback(job_id: UUID, db: Session = Depends(get_db)):
-    """Generate AI feedback for driving stats using OpenAI."""
-    import os
-    from openai import OpenAI
+def generate_driving_feedback(job_id: UUID, regenerate: bool = False, db: Session = Depends(get_db)):
+    """
+    Generate AI feedback for driving stats using OpenAI (sync: the OpenAI call blocks, so it runs in the threadpool).
+    Feedback already stored on the session is returned as is unless regenerate=true.
+    """
+    from app.services.llm_gateway import LLMUnavailable, complete
     
     stats = db.query(DrivingStats).filter(DrivingStats.job_id == job_id).first()
     if not stats:
         raise HTTPException(status_code=404, detail="Driving stats not found")
+    if stats.ai_feedback and not regenerate:
+        return {"feedback": stats.ai_feedback}
     
     # Get scenario name
     scenario = db.query(Scenario).filter(Scenario.id == stats.scenario_id).first()
     scenario_name = scenario.name if scenario else "Unknown Scenario"
     
-    # Build prompt for AI analysis
-    prompt = f"""Analyze this driving session and provide constructive feedback:
-
-Scenario: {scenario_name}
-Session #{stats.session_number}
-
-
-**DRIVING METRICS:**
-- Off-road events: {stats.off_road_count} times
-- Red light violations: {stats.red_light_violations}
-- Yellow light violations: {stats.yellow_light_violations}
-- Duration: {stats.duration_seconds:.1f} seconds
-- Max speed: {stats.max_speed:.1f} km/h
-- Average speed: {stats.avg_speed:.1f} km/h
-- Distance traveled: {stats.distance_traveled:.1f} meters
-- Turn smoothness score: {stats.turn_smoothness_score:.1f}/100
-
-Please provide:
-1. An overall driving grade (A-F)
-2. Specific strengths observed
-3. Areas for improvement
-4. 2-3 actionable tips to become a better driver
-
-IMPORTANT GUIDELINES:
-- **Prioritize safety**: Off-road events and red light violations should heavily impact the grade.
-- **Turn smoothness**: This metric is often high, so please **do not weigh it heavily** in your evaluation. Only mention it briefly at the end as a minor point. Do not let good turn smoothness mask poor safety behavior.
-
-Keep the feedback encouraging but honest. Format nicely with emojis."""
-
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        return {"feedback": "⚠️ OpenAI API key not configured. Cannot generate AI feedback."}
-    
+    messages = feedback_messages(stats, scenario_name)
     try:
-        client = OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a friendly driving instructor analyzing simulation driving data. Be encouraging but give honest feedback."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7
+        # Identical prompts are served from the LLM cache; a forced regeneration bypasses it
+        feedback = complete(
+            messages, max_tokens=FEEDBACK_MAX_TOKENS, temperature=FEEDBACK_TEMPERATURE, cache=not regenerate
         )
         
-        feedback = response.choices[0].message.content
-        
         # Cache the feedback in the database
         stats.ai_feedback = feedback
         db.commit()
         
         return {"feedback": feedback}
     
+    except LLMUnavailable:
+        return {"feedback": "⚠️ OpenAI API key not configured. Cannot generate AI feedback."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
+
+
+@router.post("/driving-stats/feedback-batches", status_code=status.HTTP_202_ACCEPTED)
+def generate_feedback_batch(request: FeedbackBatchRequest):
+    """
+    Generate missing AI feedback for many sessions at once (async, on the llm queue).
+    Poll GET /driving-stats/feedback-batches/{task_id} for progress.
+    """
+    from app.tasks.feedback_tasks import generate_feedback_batch as feedback_batch_task
+    
+    task = feedback_batch_task.delay(
+        str(request.scenario_id) if request.scenario_id else None,
+        [str(job_id) for job_id in request.job_ids] if request.job_ids else None,
+        request.regenerate
+    )
+    return {"status": "dispatched", "task_id": task.id}
+
+
+@router.get("/driving-stats/feedback-batches/{task_id}", response_model=FeedbackBatchStatus)
+def get_feedback_batch(task_id: str):
+    """Progress of a batch feedback task (sync: reads the Celery result backend)"""
+    from app.celery_app import celery_app
+    
+    result = celery_app.AsyncResult(task_id)
+    info = result.info if isinstance(result.info, dict) else {}
+    return FeedbackBatchStatus(
+        task_id=task_id,
+        state=result.state,
+        total=info.get("total"),
+        completed=info.get("completed", 0),
+        failed=info.get("failed", 0)
+    )
@@ -1,17 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List
 from uuid import UUID
+import logging
+import redis
 
-from app.database import get_db
+from app.database import get_db, get_async_db
+from app.redis_client import get_redis
 from app.models.scenario import Scenario
+from app.models.scenario_revision import ScenarioRevision
+from app.models.scenario_snapshot import ScenarioSnapshot
 from app.models.job import Job
 from app.models.telemetry import Telemetry
 from app.models.safety_risk import SafetyRisk
-from app.models.assistant import AssistantMessage
-from app.schemas.scenario import ScenarioCreate, ScenarioUpdate, ScenarioResponse
+from app.models.safety_event import SafetyEvent
+from app.models.assistant import AssistantMessage, Conversation
+from app.models.scenario_analytics import ScenarioAnalytics
+from app.models.driving_stats import DrivingStats
+from app.models.driving_leaderboard import DrivingLeaderboard
+from pydantic import ValidationError
+from app.schemas.scenario import (
+    ScenarioCreate, ScenarioUpdate, ScenarioResponse, ScenarioSummary,
+    ScenarioPatch, ScenarioPatchResult, ScenarioRevisionResponse
+)
+from app.services.scenario_summary import apply_summary, scenario_data
+from app.services.scenario_patch import PatchError, apply_patch
+from app.services.job_counters import record_status_change
+from app.services.job_events import job_deleted_event, publish_job_event
+from app.services.fast_response import fast_response
+from app.services.driving_leaderboard import drop_leaderboard
+from app.services.response_cache import cached_json_response, invalidate, job_keys, scenario_key, snapshot_key
 
 router = APIRouter(prefix="/scenarios", tags=["scenarios"])
+logger = logging.getLogger(__name__)
 
 @router.post("/", response_model=ScenarioResponse, status_code=status.HTTP_201_CREATED)
 def create_scenario(scenario: ScenarioCreate, db: Session = Depends(get_db)):
@@ -26,40 +49,159 @@ def create_scenario(scenario: ScenarioCreate, db: Session = Depends(get_db)):
         weather=scenario.weather,
         weather_intensity=scenario.weather_intensity
     )
+    apply_summary(db_scenario)
     db.add(db_scenario)
     db.commit()
     db.refresh(db_scenario)
     return db_scenario
 
 @router.get("/", response_model=List[ScenarioResponse])
-def list_scenarios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all scenarios"""
-    scenarios = db.query(Scenario).offset(skip).limit(limit).all()
-    return scenarios
+async def list_scenarios(request: Request, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    """List all scenarios (full geometry; prefer /summary for listings)"""
+    result = await db.execute(
+        select(*[getattr(Scenario, field) for field in ScenarioResponse.model_fields]).offset(skip).limit(limit)
+    )
+    return fast_response(request, [dict(row._mapping) for row in result])
+
+@router.get("/summary", response_model=List[ScenarioSummary])
+async def list_scenario_summaries(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List scenarios without geometry (ids, names, counts, bounding box, thumbnail)"""
+    columns = [
+        Scenario.id, Scenario.name, Scenario.weather, Scenario.weather_intensity,
+        Scenario.road_count, Scenario.traffic_light_count, Scenario.stop_sign_count,
+        Scenario.crosswalk_count, Scenario.hazard_count,
+        Scenario.bbox_min_x, Scenario.bbox_min_y, Scenario.bbox_max_x, Scenario.bbox_max_y,
+        Scenario.content_hash, Scenario.thumbnail, Scenario.created_at, Scenario.updated_at
+    ]
+    result = await db.execute(
+        select(*columns).order_by(Scenario.created_at.desc()).offset(skip).limit(limit)
+    )
+    rows = [dict(row._mapping) for row in result]
+    
+    # Scenarios stored before summaries existed: compute once and persist
+    missing = {row["id"]: row for row in rows if row["content_hash"] is None}
+    if missing:
+        backfilled = await db.execute(select(Scenario).where(Scenario.id.in_(list(missing))))
+        for scenario in backfilled.scalars():
+            apply_summary(scenario)
+            missing[scenario.id].update({column.key: getattr(scenario, column.key) for column in columns})
+        await db.commit()
+    
+    return [_summary(row) for row in rows]
+
+def _summary(row: dict) -> ScenarioSummary:
+    bbox = [row.pop(key) for key in ("bbox_min_x", "bbox_min_y", "bbox_max_x", "bbox_max_y")]
+    return ScenarioSummary(**row, bbox=None if None in bbox else bbox)
 
 @router.get("/{scenario_id}", response_model=ScenarioResponse)
-def get_scenario(scenario_id: UUID, db: Session = Depends(get_db)):
-    """Get a specific scenario by ID"""
-    scenario = db.query(Scenario).filter(Scenario.id == scenario_id).first()
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-    return scenario
+async def get_scenario(scenario_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific scenario by ID (cached until updated or deleted)"""
+    async def build():
+        scenario = await db.get(Scenario, scenario_id)
+        if not scenario:
+            raise HTTPException(status_code=404, detail="Scenario not found")
+        return ScenarioResponse.model_validate(scenario), True
+    
+    return await cached_json_response(request, scenario_key(scenario_id), build)
+
+@router.get("/snapshots/{content_hash}")
+async def get_scenario_snapshot(content_hash: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get the immutable map a job ran on (Job.snapshot_hash)"""
+    async def build():
+        snapshot = await db.get(ScenarioSnapshot, content_hash)
+        if not snapshot:
+            raise HTTPException(status_code=404, detail="Snapshot not found")
+        return snapshot.data, True
+    
+    return await cached_json_response(request, snapshot_key(content_hash), build)
 
 @router.put("/{scenario_id}", response_model=ScenarioResponse)
 def update_scenario(scenario_id: UUID, scenario_update: ScenarioUpdate, db: Session = Depends(get_db)):
-    """Update an existing scenario"""
-    db_scenario = db.query(Scenario).filter(Scenario.id == scenario_id).first()
+    """Update an existing scenario (replaces whole fields; prefer PATCH for small edits)"""
+    db_scenario = db.query(Scenario).filter(Scenario.id == scenario_id).with_for_update().first()
     if not db_scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
     
     update_data = scenario_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_scenario, field, value)
+    if set(update_data) - {"name"}:
+        apply_summary(db_scenario)
+    _record_revision(db, db_scenario, [
+        {"op": "replace", "path": f"/{field}", "value": value} for field, value in update_data.items()
+    ])
     
     db.commit()
     db.refresh(db_scenario)
+    invalidate([scenario_key(scenario_id)])
     return db_scenario
 
+@router.patch("/{scenario_id}", response_model=ScenarioPatchResult)
+def patch_scenario(scenario_id: UUID, patch: ScenarioPatch, db: Session = Depends(get_db)):
+    """
+    Apply JSON-Patch operations (RFC 6902) to a scenario, e.g. move one hazard:
+    {"version": 7, "operations": [{"op": "replace", "path": "/hazards/3/x", "value": 120}]}
+    Fails with 409 if the scenario changed since `version`
+    """
+    db_scenario = db.query(Scenario).filter(Scenario.id == scenario_id).with_for_update().first()
+    if not db_scenario:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    if db_scenario.version != patch.version:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Scenario was modified", "current_version": db_scenario.version}
+        )
+    
+    operations = [op.model_dump(by_alias=True, exclude_unset=True) for op in patch.operations]
+    try:
+        changes = apply_patch({**scenario_data(db_scenario), "name": db_scenario.name}, operations)
+        # Same field validation as a full update
+        ScenarioUpdate(**changes)
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    
+    for field, value in changes.items():
+        setattr(db_scenario, field, value)
+    if set(changes) - {"name"}:
+        apply_summary(db_scenario)
+    _record_revision(db, db_scenario, operations)
+    
+    db.commit()
+    invalidate([scenario_key(scenario_id)])
+    return ScenarioPatchResult(
+        id=db_scenario.id,
+        version=db_scenario.version,
+        content_hash=db_scenario.content_hash,
+        updated_at=db_scenario.updated_at
+    )
+
+def _record_revision(db: Session, scenario: Scenario, operations: List[Dict]):
+    """Bump the scenario version and log the operations that produced it"""
+    scenario.version = (scenario.version or 1) + 1
+    db.add(ScenarioRevision(scenario_id=scenario.id, version=scenario.version, operations=operations))
+
+@router.get("/{scenario_id}/revisions", response_model=List[ScenarioRevisionResponse])
+async def list_scenario_revisions(
+    scenario_id: UUID,
+    since_version: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Edits after `since_version`, oldest first (replay them to catch up without refetching the map)"""
+    result = await db.execute(
+        select(ScenarioRevision).where(
+            ScenarioRevision.scenario_id == scenario_id,
+            ScenarioRevision.version > since_version
+        ).order_by(ScenarioRevision.version).limit(limit)
+    )
+    return result.scalars().all()
+
 @router.delete("/{scenario_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_scenario(scenario_id: UUID, db: Session = Depends(get_db)):
     """Delete a scenario and all jobs (and their related data) that reference it"""
@@ -69,12 +211,29 @@ def delete_scenario(scenario_id: UUID, db: Session = Depends(get_db)):
 
     # Delete all jobs for this scenario and their related records (foreign key order)
     jobs = db.query(Job).filter(Job.scenario_id == scenario_id).all()
+    events = [job_deleted_event(job) for job in jobs]
     for job in jobs:
         db.query(Telemetry).filter(Telemetry.job_id == job.id).delete()
         db.query(SafetyRisk).filter(SafetyRisk.job_id == job.id).delete()
+        db.query(SafetyEvent).filter(SafetyEvent.job_id == job.id).delete()
         db.query(AssistantMessage).filter(AssistantMessage.job_id == job.id).delete()
+        db.query(Conversation).filter(Conversation.job_id == job.id).delete()
+        db.query(DrivingStats).filter(DrivingStats.job_id == job.id).delete()
         db.delete(job)
 
+    db.query(ScenarioAnalytics).filter(ScenarioAnalytics.scenario_id == scenario_id).delete()
+    db.query(ScenarioRevision).filter(ScenarioRevision.scenario_id == scenario_id).delete()
+    db.query(DrivingLeaderboard).filter(DrivingLeaderboard.scenario_id == scenario_id).delete()
     db.delete(db_scenario)
+    # Shared counter rows are locked last, just before the commit
+    for job in jobs:
+        record_status_change(db, job.status, None)
     db.commit()
+    invalidate([scenario_key(scenario_id), *(key for job in jobs for key in job_keys(job.id))])
+    for event in events:
+        publish_job_event(event)
+    try:
+        drop_leaderboard(get_redis(), scenario_id)
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard cleanup failed for scenario {scenario_id}: {e}")
     return None
@@ -5,11 +5,13 @@ from uuid import UUID
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1)
     job_id: Optional[UUID] = None
+    conversation_id: Optional[UUID] = None  # Omit to start a new conversation
     context_type: str = Field(default="general", pattern="^(general|telemetry_analysis|safety_coaching)$")
 
 class ChatResponse(BaseModel):
     reply: str
     message_id: UUID
+    conversation_id: UUID
 
     class Config:
         from_attributes = True
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, model_validator
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -38,6 +38,7 @@ class DrivingStatsResponse(BaseModel):
     max_speed: float
     avg_speed: float
     distance_traveled: float
+    score: Optional[float] = None
     
     ai_feedback: Optional[str] = None
     created_at: datetime
@@ -56,7 +57,45 @@ class DrivingStatsSummary(BaseModel):
     yellow_light_violations: int
     turn_smoothness_score: float
     duration_seconds: float
+    score: Optional[float] = None
     created_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class LeaderboardEntry(DrivingStatsSummary):
+    """A session on a scenario's leaderboard (rank 1 = best score)."""
+    rank: int
+
+
+class DrivingRank(BaseModel):
+    """Where one session stands among all sessions of its scenario."""
+    job_id: UUID
+    scenario_id: UUID
+    score: float
+    rank: int
+    total_sessions: int
+    percentile: float  # Share of sessions scoring lower, 0-100
+
+
+class FeedbackBatchRequest(BaseModel):
+    """Sessions to generate AI feedback for: a scenario's, a list of jobs', or both combined."""
+    scenario_id: Optional[UUID] = None
+    job_ids: Optional[List[UUID]] = None
+    regenerate: bool = False  # Also replace feedback that already exists
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if self.scenario_id is None and not self.job_ids:
+            raise ValueError("scenario_id or job_ids is required")
+        return self
+
+
+class FeedbackBatchStatus(BaseModel):
+    """Progress of a batch feedback task."""
+    task_id: str
+    state: str  # Celery state: PENDING, STARTED, PROGRESS, SUCCESS, FAILURE
+    total: Optional[int] = None
+    completed: int = 0
+    failed: int = 0
@@ -12,6 +12,8 @@ class JobCreate(BaseModel):
 class JobResponse(BaseModel):
     id: UUID
     scenario_id: UUID
+    snapshot_hash: Optional[str] = None
+    scenario_version: Optional[int] = None
     simulation_type: str
     status: str
     celery_task_id: Optional[str] = None
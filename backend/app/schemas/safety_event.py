@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+
+class SafetyEventResponse(BaseModel):
+    id: UUID
+    job_id: UUID
+    timestamp: int
+    event_type: str
+    vehicle_id: int
+    other_type: str
+    other_id: int
+    position_x: float
+    position_y: float
+    min_distance: float
+    time_to_collision: Optional[float] = None
+    relative_speed: float
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Literal, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -33,8 +33,51 @@ class ScenarioResponse(BaseModel):
     hazards: List[Dict[str, Any]]
     weather: str
     weather_intensity: float
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+class PatchOperation(BaseModel):
+    """RFC 6902 operation, e.g. {"op": "replace", "path": "/hazards/3/x", "value": 120}"""
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(None, alias="from")
+
+class ScenarioPatch(BaseModel):
+    version: int  # Version the operations were computed against
+    operations: List[PatchOperation] = Field(..., min_length=1)
+
+class ScenarioPatchResult(BaseModel):
+    id: UUID
+    version: int
+    content_hash: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+class ScenarioRevisionResponse(BaseModel):
+    version: int
+    operations: List[Dict[str, Any]]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ScenarioSummary(BaseModel):
+    """Listing projection: no geometry, only what a scenario picker shows"""
+    id: UUID
+    name: str
+    weather: str
+    weather_intensity: float
+    road_count: int = 0
+    traffic_light_count: int = 0
+    stop_sign_count: int = 0
+    crosswalk_count: int = 0
+    hazard_count: int = 0
+    bbox: Optional[List[float]] = None  # [min_x, min_y, max_x, max_y]
+    content_hash: Optional[str] = None
+    thumbnail: Optional[str] = None  # SVG path data, 100x100 viewBox
+    created_at: datetime
+    updated_at: Optional[datetime] = None
@@ -17,6 +17,7 @@ class TelemetryResponse(BaseModel):
     id: UUID
     job_id: UUID
     timestamp: int
+    vehicle_id: Optional[int] = None
     speed: float
     acceleration: float
     brake_intensity: float
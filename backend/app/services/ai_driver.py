@@ -1,11 +1,15 @@
 import math
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 class AIDriver:
     """AI vehicle behavior for autonomous simulation"""
     
-    def __init__(self, vehicle_id: int, scenario_data: Dict):
+    VEHICLE_LENGTH = 4.0  # meters, bumper to bumper (matches CollisionDetector.VEHICLE_RADIUS)
+    MIN_FOLLOWING_GAP = 4.0  # meters kept to a stopped vehicle ahead
+    FOLLOWING_TIME = 1.5  # seconds of headway at speed
+    
+    def __init__(self, vehicle_id: int, scenario_data: Dict, vehicle_count: int = 1):
         self.vehicle_id = vehicle_id
         self.scenario_data = scenario_data
         
@@ -18,6 +22,8 @@ class AIDriver:
         # Waypoint following
         self.current_waypoint_index = 0
         self.waypoints = self._generate_waypoints()
+        # Vehicles share the path, so spread them evenly along it instead of stacking them
+        self._place_on_path(vehicle_id / max(vehicle_count, 1))
         
         # Behavior parameters
         self.target_speed = 15.0  # m/s (~54 km/h)
@@ -46,9 +52,39 @@ class AIDriver:
         
         return waypoints
     
-    def update(self, dt: float, traffic_lights: List[Dict], pedestrians: List[Dict]) -> Dict:
+    def _place_on_path(self, fraction: float) -> None:
+        """Start at the given fraction of the (closed) waypoint loop, heading along it"""
+        if len(self.waypoints) < 2:
+            if self.waypoints:
+                self.position_x, self.position_y = self.waypoints[0]
+            return
+        
+        segments = []
+        for i, start in enumerate(self.waypoints):
+            end = self.waypoints[(i + 1) % len(self.waypoints)]
+            segments.append((start, end, math.hypot(end[0] - start[0], end[1] - start[1])))
+        
+        remaining = fraction * sum(length for _, _, length in segments)
+        for i, (start, end, length) in enumerate(segments):
+            if remaining <= length or i == len(segments) - 1:
+                t = remaining / length if length else 0.0
+                self.position_x = start[0] + (end[0] - start[0]) * t
+                self.position_y = start[1] + (end[1] - start[1]) * t
+                self.heading = math.atan2(end[1] - start[1], end[0] - start[0])
+                self.current_waypoint_index = (i + 1) % len(self.waypoints)
+                return
+            remaining -= length
+    
+    def update(
+        self,
+        dt: float,
+        traffic_lights: List[Dict],
+        pedestrians: List[Dict],
+        vehicles: Optional[List[Dict]] = None
+    ) -> Dict:
         """
         Update AI vehicle state
+        vehicles: other vehicles' states from the previous tick (to keep a following gap)
         Returns: Updated state dict
         """
         if not self.waypoints:
@@ -82,8 +118,11 @@ class AIDriver:
         # Check for pedestrians
         pedestrian_ahead = self._check_pedestrians(pedestrians)
         
+        # Check for vehicles ahead (e.g. queued at a light)
+        vehicle_ahead = self._check_vehicles(vehicles or [])
+        
         # Speed control
-        if should_stop or pedestrian_ahead:
+        if should_stop or pedestrian_ahead or vehicle_ahead:
             # Brake
             self.speed = max(0, self.speed - self.max_braking * dt)
         else:
@@ -133,6 +172,25 @@ class AIDriver:
         
         return False
     
+    def _check_vehicles(self, vehicles: List[Dict]) -> bool:
+        """Check if another vehicle ahead is within the following distance"""
+        following_distance = self.VEHICLE_LENGTH + self.MIN_FOLLOWING_GAP + self.speed * self.FOLLOWING_TIME
+        
+        for other in vehicles:
+            if other["vehicle_id"] == self.vehicle_id:
+                continue
+            dx = other["x"] - self.position_x
+            dy = other["y"] - self.position_y
+            distance = math.sqrt(dx * dx + dy * dy)
+            
+            if distance < following_distance:
+                angle_diff = math.atan2(dy, dx) - self.heading
+                angle_diff = math.atan2(math.sin(angle_diff), math.cos(angle_diff))
+                if abs(angle_diff) < math.pi / 6:  # 30 degree cone in front
+                    return True
+        
+        return False
+    
     def _get_state(self) -> Dict:
         """Get current vehicle state"""
         return {
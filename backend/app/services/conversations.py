@@ -0,0 +1,67 @@
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.assistant import AssistantMessage, Conversation
+
+HISTORY_WINDOW = 10  # Newest messages always sent verbatim
+SUMMARY_BATCH = 10  # Older messages folded into the summary at a time
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a chat between a user and an automotive AI assistant.
+Keep the facts, numbers, questions asked and advice given that later turns may refer to.
+Answer with the updated summary only, in under 200 words."""
+
+
+def open_conversation(db: Session, conversation_id: Optional[UUID], job_id: Optional[UUID]) -> Optional[Conversation]:
+    """The requested conversation, or a new one if no id is given. None if the id is unknown."""
+    if conversation_id is None:
+        conversation = Conversation(job_id=job_id)
+        db.add(conversation)
+        db.flush()
+        return conversation
+    return db.query(Conversation).filter(Conversation.id == conversation_id).first()
+
+
+def _unsummarized(db: Session, conversation: Conversation):
+    query = db.query(AssistantMessage).filter(AssistantMessage.conversation_id == conversation.id)
+    if conversation.summarized_until is not None:
+        query = query.filter(AssistantMessage.created_at > conversation.summarized_until)
+    return query
+
+
+def recent_messages(db: Session, conversation: Conversation) -> Tuple[List[AssistantMessage], bool]:
+    """
+    The newest HISTORY_WINDOW messages not yet covered by the summary, oldest
+    first, and whether enough have piled up to summarize. At most
+    HISTORY_WINDOW + SUMMARY_BATCH rows are read (newest first on the
+    conversation index); the extra rows only decide whether a summary is
+    due, so the query and the prompt stay the same size however long the
+    conversation gets.
+    """
+    limit = HISTORY_WINDOW + SUMMARY_BATCH
+    messages = _unsummarized(db, conversation).order_by(AssistantMessage.created_at.desc()).limit(limit).all()
+    return list(reversed(messages[:HISTORY_WINDOW])), len(messages) >= limit
+
+
+def summary_prompt(summary: Optional[str], messages: List[AssistantMessage]) -> List[dict]:
+    transcript = "\n".join(f"{msg.role.value}: {msg.content}" for msg in messages)
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Summary so far:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"}
+    ]
+
+
+def messages_to_summarize(db: Session, conversation: Conversation) -> List[AssistantMessage]:
+    """
+    The oldest unsummarized messages, oldest first: up to SUMMARY_BATCH of
+    them, never reaching into the newest HISTORY_WINDOW. Taking them from the
+    oldest end means a backlog (e.g. after the LLM was down) drains in order
+    instead of its older part being skipped.
+    """
+    pending = _unsummarized(db, conversation).count()
+    if pending <= HISTORY_WINDOW:
+        return []
+    return _unsummarized(db, conversation).order_by(
+        AssistantMessage.created_at.asc()
+    ).limit(min(SUMMARY_BATCH, pending - HISTORY_WINDOW)).all()
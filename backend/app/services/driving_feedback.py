@@ -0,0 +1,93 @@
+from typing import Dict, List
+import os
+import threading
+import time
+
+FEEDBACK_MAX_TOKENS = 500
+FEEDBACK_TEMPERATURE = 0.7
+
+# Batch generation (app/tasks/feedback_tasks.py)
+FEEDBACK_BATCH_CONCURRENCY = int(os.getenv("FEEDBACK_BATCH_CONCURRENCY", "4"))  # Sessions in flight per batch
+FEEDBACK_WRITE_BATCH = 50  # Feedback rows per bulk update (and progress report)
+FEEDBACK_MAX_ATTEMPTS = 4  # Per session, counting rate-limited attempts
+RATE_LIMIT_BACKOFF_SECONDS = 5.0  # First pause after a 429 without Retry-After; doubles per attempt
+FEEDBACK_BATCH_TIME_LIMIT_SECONDS = int(os.getenv("FEEDBACK_BATCH_TIME_LIMIT_SECONDS", "3000"))  # Per task run
+
+SYSTEM_PROMPT = "You are a friendly driving instructor analyzing simulation driving data. Be encouraging but give honest feedback."
+
+
+def feedback_messages(stats, scenario_name: str) -> List[Dict[str, str]]:
+    """Prompt for one session (a DrivingStats row or a row with the same columns)"""
+    prompt = f"""Analyze this driving session and provide constructive feedback:
+
+Scenario: {scenario_name}
+Session #{stats.session_number}
+
+
+**DRIVING METRICS:**
+- Off-road events: {stats.off_road_count} times
+- Red light violations: {stats.red_light_violations}
+- Yellow light violations: {stats.yellow_light_violations}
+- Duration: {stats.duration_seconds:.1f} seconds
+- Max speed: {stats.max_speed:.1f} km/h
+- Average speed: {stats.avg_speed:.1f} km/h
+- Distance traveled: {stats.distance_traveled:.1f} meters
+- Turn smoothness score: {stats.turn_smoothness_score:.1f}/100
+
+Please provide:
+1. An overall driving grade (A-F)
+2. Specific strengths observed
+3. Areas for improvement
+4. 2-3 actionable tips to become a better driver
+
+IMPORTANT GUIDELINES:
+- **Prioritize safety**: Off-road events and red light violations should heavily impact the grade.
+- **Turn smoothness**: This metric is often high, so please **do not weigh it heavily** in your evaluation. Only mention it briefly at the end as a minor point. Do not let good turn smoothness mask poor safety behavior.
+
+Keep the feedback encouraging but honest. Format nicely with emojis."""
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+# ============ RATE LIMITS ============
+
+def rate_limit_delay(error: Exception, attempt: int) -> float:
+    """
+    Seconds to wait if error is a provider rate limit (HTTP 429), else 0.
+    Honors Retry-After when the provider sends one.
+    """
+    if getattr(error, "status_code", None) != 429:
+        return 0.0
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(float(retry_after), 0.1)
+    except (TypeError, ValueError):
+        return RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt
+
+
+class RateLimitGate:
+    """
+    Shared pause for a batch's worker threads: once one of them is rate
+    limited, none sends another request until the pause is over, instead of
+    every thread discovering the limit on its own.
+    """
+
+    def __init__(self):
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def wait(self) -> None:
+        while True:
+            with self._lock:
+                remaining = self._resume_at - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
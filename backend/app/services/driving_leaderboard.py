@@ -0,0 +1,158 @@
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+
+import redis
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.driving_leaderboard import DrivingLeaderboard
+from app.models.driving_stats import DrivingStats
+
+LEADERBOARD_PREFIX = "driving_leaderboard:"
+
+# Safety violations dominate the score; turn smoothness only nudges it
+OFF_ROAD_PENALTY = 15.0
+RED_LIGHT_PENALTY = 20.0
+YELLOW_LIGHT_PENALTY = 5.0
+SMOOTHNESS_WEIGHT = 0.1
+
+
+def driving_score(stats) -> float:
+    """0-100 leaderboard score of a session (DrivingStats or DrivingStatsCreate)"""
+    score = (
+        100.0
+        - OFF_ROAD_PENALTY * (stats.off_road_count or 0)
+        - RED_LIGHT_PENALTY * (stats.red_light_violations or 0)
+        - YELLOW_LIGHT_PENALTY * (stats.yellow_light_violations or 0)
+        - SMOOTHNESS_WEIGHT * (100.0 - (stats.turn_smoothness_score or 0.0))
+    )
+    return round(max(0.0, min(100.0, score)), 2)
+
+
+async def next_session_number(db: AsyncSession, scenario_id: UUID) -> int:
+    """
+    Atomically number a new session of a scenario. The upsert row lock
+    serializes concurrent submissions until the caller commits; the first
+    session after an upgrade starts from the existing row count.
+    """
+    existing = select(func.count()).select_from(DrivingStats).where(
+        DrivingStats.scenario_id == scenario_id
+    ).scalar_subquery()
+    return await db.scalar(
+        insert(DrivingLeaderboard)
+        .values(scenario_id=scenario_id, session_count=existing + 1)
+        .on_conflict_do_update(
+            index_elements=["scenario_id"],
+            set_={"session_count": DrivingLeaderboard.session_count + 1, "updated_at": func.now()}
+        )
+        .returning(DrivingLeaderboard.session_count)
+    )
+
+
+# ============ REDIS SORTED SET ============
+# Members are job ids scored by driving_score; ranks and counts are O(log n).
+# The ":ready" marker says the set holds every session, not just new ones.
+
+def _key(scenario_id) -> str:
+    return f"{LEADERBOARD_PREFIX}{scenario_id}"
+
+
+def _ready_key(scenario_id) -> str:
+    return f"{LEADERBOARD_PREFIX}{scenario_id}:ready"
+
+
+def record_session(redis_client: redis.Redis, scenario_id, job_id, score: float) -> None:
+    redis_client.zadd(_key(scenario_id), {str(job_id): score})
+
+
+def remove_sessions(redis_client: redis.Redis, scenario_id, job_ids: Iterable) -> None:
+    members = [str(job_id) for job_id in job_ids]
+    if members:
+        redis_client.zrem(_key(scenario_id), *members)
+
+
+def drop_leaderboard(redis_client: redis.Redis, scenario_id) -> None:
+    redis_client.delete(_key(scenario_id), _ready_key(scenario_id))
+
+
+def _load(redis_client: redis.Redis, scenario_id, sessions: Dict[str, float]) -> None:
+    pipe = redis_client.pipeline()
+    if sessions:
+        # ZADD is idempotent, so sessions recorded meanwhile are kept
+        pipe.zadd(_key(scenario_id), sessions)
+    pipe.set(_ready_key(scenario_id), 1)
+    pipe.execute()
+
+
+def _scored_sessions(db: Session, scenario_id) -> Dict[str, float]:
+    """job_id -> score for every session, scoring sessions stored before scores existed"""
+    unscored = db.query(DrivingStats).filter(
+        DrivingStats.scenario_id == scenario_id, DrivingStats.score.is_(None)
+    ).all()
+    for stats in unscored:
+        stats.score = driving_score(stats)
+    if unscored:
+        db.commit()
+    rows = db.query(DrivingStats.job_id, DrivingStats.score).filter(DrivingStats.scenario_id == scenario_id)
+    return {str(job_id): score for job_id, score in rows}
+
+
+async def ensure_leaderboard(db: AsyncSession, redis_client: redis.Redis, scenario_id) -> None:
+    """Build a scenario's sorted set from the database on first use"""
+    if await run_in_threadpool(redis_client.exists, _ready_key(scenario_id)):
+        return
+    sessions = await db.run_sync(_scored_sessions, scenario_id)
+    await run_in_threadpool(_load, redis_client, scenario_id, sessions)
+
+
+def score_rank(redis_client: redis.Redis, scenario_id, score: float) -> Tuple[int, int, int]:
+    """(rank, sessions scoring lower, total sessions); equal scores share a rank"""
+    pipe = redis_client.pipeline()
+    pipe.zcount(_key(scenario_id), f"({score}", "+inf")
+    pipe.zcount(_key(scenario_id), "-inf", f"({score}")
+    pipe.zcard(_key(scenario_id))
+    higher, lower, total = pipe.execute()
+    return higher + 1, lower, total
+
+
+def top_sessions(redis_client: redis.Redis, scenario_id, offset: int, limit: int) -> List[Tuple[str, float, int]]:
+    """(job_id, score, rank) of the best sessions, best first"""
+    entries = redis_client.zrevrange(_key(scenario_id), offset, offset + limit - 1, withscores=True)
+    if not entries:
+        return []
+    first_rank = redis_client.zcount(_key(scenario_id), f"({entries[0][1]}", "+inf") + 1
+    return _ranked(entries, offset, first_rank)
+
+
+def _ranked(entries: List[Tuple[str, float]], offset: int, first_rank: int) -> List[Tuple[str, float, int]]:
+    """Competition ranking of a page sorted best first (the first entry may tie with the previous page)"""
+    ranked = []
+    rank = first_rank
+    for position, (job_id, score) in enumerate(entries):
+        if position and score != entries[position - 1][1]:
+            rank = offset + position + 1
+        ranked.append((str(job_id), score, rank))
+    return ranked
+
+
+# ============ DATABASE FALLBACK (Redis unavailable) ============
+
+def score_rank_from_db(db: Session, scenario_id, score: float) -> Tuple[int, int, int]:
+    in_scenario = db.query(DrivingStats).filter(
+        DrivingStats.scenario_id == scenario_id, DrivingStats.score.isnot(None)
+    )
+    higher = in_scenario.filter(DrivingStats.score > score).count()
+    lower = in_scenario.filter(DrivingStats.score < score).count()
+    return higher + 1, lower, in_scenario.count()
+
+
+def top_sessions_from_db(db: Session, scenario_id, offset: int, limit: int) -> List[Tuple[str, float, int]]:
+    rows = db.query(DrivingStats.job_id, DrivingStats.score).filter(
+        DrivingStats.scenario_id == scenario_id, DrivingStats.score.isnot(None)
+    ).order_by(DrivingStats.score.desc()).offset(offset).limit(limit).all()
+    if not rows:
+        return []
+    return _ranked(rows, offset, score_rank_from_db(db, scenario_id, rows[0][1])[0])
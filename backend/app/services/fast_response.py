@@ -0,0 +1,117 @@
+from typing import Any, Dict, Optional
+import gzip
+
+import brotli
+import msgpack
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+COMPRESS_MIN_BYTES = 1024  # Smaller bodies aren't worth the CPU
+BROTLI_QUALITY = 4  # Close to gzip's speed at a noticeably better ratio
+GZIP_LEVEL = 5
+
+
+# ============ ENCODING ============
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if hasattr(value, "value"):  # str enums stored by SQLAlchemy
+        return value.value
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    JSON-encode plain data with orjson (UUIDs, datetimes and Pydantic models
+    included), skipping jsonable_encoder's per-value walk
+    """
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+# ============ NEGOTIATION ============
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Header values -> q weights, e.g. "br;q=0.9, gzip" -> {"br": 0.9, "gzip": 1.0}"""
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def wants_msgpack(request: Request) -> bool:
+    """Only explicit Accept entries count, so browsers sending */* keep getting JSON"""
+    accepted = _accepted(request.headers.get("accept", ""))
+    return any(accepted.get(media_type, 0) > 0 for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def _content_encoding(request: Request) -> Optional[str]:
+    accepted = _accepted(request.headers.get("accept-encoding", ""))
+    for encoding in ("br", "gzip"):
+        if accepted.get(encoding, 0) > 0:
+            return encoding
+    return None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """RFC 7232 weak comparison against an If-None-Match header"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+# ============ RESPONSES ============
+
+def encoded_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Response for an already JSON-encoded body: re-packed as msgpack if the
+    client asks for it, 304 if its ETag matches, and brotli/gzip compressed
+    when the body is large and the client accepts it.
+    """
+    headers = {**(headers or {}), "Vary": "Accept, Accept-Encoding"}
+    media_type = JSON_MEDIA_TYPE
+    if wants_msgpack(request):
+        body = msgpack.packb(orjson.loads(body))
+        media_type = MSGPACK_MEDIA_TYPES[0]
+        if etag:
+            etag = f'{etag[:-1]}-msgpack"'
+
+    if etag:
+        headers["ETag"] = etag
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+    encoding = _content_encoding(request) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding == "br":
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def fast_response(request: Request, payload: Any) -> Response:
+    """Fast path for read-only bulk endpoints: return plain dicts/rows, not per-row models"""
+    return encoded_response(request, dumps(payload))
@@ -0,0 +1,198 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+
+HEATMAP_FORMAT = "quadtree"
+BASE_CELL_SIZE = 2.0  # meters per cell at the finest level
+TILE_CELLS = 16  # cells per tile side (power of two)
+TILE_SHIFT = 4  # log2(TILE_CELLS)
+OVERVIEW_LEVEL = 5  # level inlined in GET /metrics/safety/{job_id}
+
+Extent = Tuple[float, float, float, float]  # (min_x, min_y, max_x, max_y)
+
+
+def base_cell(x: float, y: float) -> Tuple[int, int]:
+    """Finest-level cell containing a world position"""
+    return math.floor(x / BASE_CELL_SIZE), math.floor(y / BASE_CELL_SIZE)
+
+
+def scenario_extent(scenario_data: Dict) -> Optional[Extent]:
+    """Bounding box of all scenario geometry, or None for an empty map"""
+    xs: List[float] = []
+    ys: List[float] = []
+    for road in scenario_data.get("roads") or []:
+        for point in road.get("points", []):
+            xs.append(point["x"])
+            ys.append(point["y"])
+    for key in ("traffic_lights", "stop_signs", "hazards"):
+        for item in scenario_data.get(key) or []:
+            if "x" in item and "y" in item:
+                xs.append(item["x"])
+                ys.append(item["y"])
+    for cw in scenario_data.get("crosswalks") or []:
+        for x_key, y_key in (("x1", "y1"), ("x2", "y2")):
+            if x_key in cw and y_key in cw:
+                xs.append(cw[x_key])
+                ys.append(cw[y_key])
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def build_heatmap_pyramid(
+    base_counts: Dict[Tuple[int, int], int],
+    extent: Optional[Extent] = None
+) -> Dict:
+    """Build the sparse quadtree pyramid from finest-level cell counts"""
+    cells_x = [bx for bx, _ in base_counts]
+    cells_y = [by for _, by in base_counts]
+    if extent is not None:
+        min_cell = base_cell(extent[0], extent[1])
+        max_cell = base_cell(extent[2], extent[3])
+        cells_x += [min_cell[0], max_cell[0]]
+        cells_y += [min_cell[1], max_cell[1]]
+    if not cells_x:
+        cells_x, cells_y = [0], [0]
+
+    origin_x, origin_y = min(cells_x), min(cells_y)
+    span = max(max(cells_x) - origin_x, max(cells_y) - origin_y) + 1
+    max_level = max(0, math.ceil(math.log2(span)))
+
+    levels = {}
+    for level in range(max_level + 1):
+        shift = max_level - level
+        aggregated: Dict[Tuple[int, int], int] = {}
+        for (bx, by), count in base_counts.items():
+            key = ((bx - origin_x) >> shift, (by - origin_y) >> shift)
+            aggregated[key] = aggregated.get(key, 0) + count
+
+        tiles: Dict[str, List[List[int]]] = {}
+        for (cx, cy), count in aggregated.items():
+            tiles.setdefault(f"{cx >> TILE_SHIFT},{cy >> TILE_SHIFT}", []).append([cx, cy, count])
+        levels[str(level)] = tiles
+
+    return {
+        "format": HEATMAP_FORMAT,
+        "origin_x": origin_x * BASE_CELL_SIZE,
+        "origin_y": origin_y * BASE_CELL_SIZE,
+        "size": (1 << max_level) * BASE_CELL_SIZE,
+        "base_cell_size": BASE_CELL_SIZE,
+        "max_level": max_level,
+        "tile_cells": TILE_CELLS,
+        "total": sum(base_counts.values()),
+        "levels": levels
+    }
+
+
+def update_heatmap_pyramid(heatmap: Dict, deltas: Dict[Tuple[int, int], int]) -> bool:
+    """
+    Apply finest-level count changes (absolute cell indices) to a stored
+    pyramid in place, rewriting only the tiles holding the changed cells and
+    their ancestors. Returns False, leaving the pyramid untouched, if a cell
+    lies outside the pyramid's square; rebuild it then.
+    """
+    if heatmap.get("format") != HEATMAP_FORMAT:
+        return False
+    max_level = heatmap["max_level"]
+    origin_x = round(heatmap["origin_x"] / BASE_CELL_SIZE)
+    origin_y = round(heatmap["origin_y"] / BASE_CELL_SIZE)
+    side = 1 << max_level
+
+    relative: Dict[Tuple[int, int], int] = {}
+    for (bx, by), delta in deltas.items():
+        cx, cy = bx - origin_x, by - origin_y
+        if not (0 <= cx < side and 0 <= cy < side):
+            return False
+        if delta:
+            relative[(cx, cy)] = delta
+
+    for level in range(max_level + 1):
+        shift = max_level - level
+        tile_deltas: Dict[str, Dict[Tuple[int, int], int]] = {}
+        for (cx, cy), delta in relative.items():
+            key = (cx >> shift, cy >> shift)
+            cells = tile_deltas.setdefault(f"{key[0] >> TILE_SHIFT},{key[1] >> TILE_SHIFT}", {})
+            cells[key] = cells.get(key, 0) + delta
+
+        tiles = heatmap["levels"].setdefault(str(level), {})
+        for tile_key, changes in tile_deltas.items():
+            cells = {(cx, cy): count for cx, cy, count in tiles.get(tile_key, [])}
+            for cell, delta in changes.items():
+                count = cells.get(cell, 0) + delta
+                if count:
+                    cells[cell] = count
+                else:
+                    cells.pop(cell, None)
+            if cells:
+                tiles[tile_key] = [[cx, cy, count] for (cx, cy), count in cells.items()]
+            else:
+                tiles.pop(tile_key, None)
+
+    heatmap["total"] += sum(relative.values())
+    return True
+
+
+def pyramid_base_counts(heatmap: Dict) -> Dict[Tuple[int, int], int]:
+    """Recover finest-level cell counts (absolute cell indices) from a stored pyramid"""
+    if heatmap.get("format") != HEATMAP_FORMAT:
+        return {}
+    origin_x = round(heatmap["origin_x"] / BASE_CELL_SIZE)
+    origin_y = round(heatmap["origin_y"] / BASE_CELL_SIZE)
+    counts: Dict[Tuple[int, int], int] = {}
+    for cells in heatmap["levels"].get(str(heatmap["max_level"]), {}).values():
+        for cx, cy, count in cells:
+            counts[(origin_x + cx, origin_y + cy)] = count
+    return counts
+
+
+def heatmap_metadata(heatmap: Dict) -> Dict:
+    """Pyramid description without any cell data"""
+    return {key: value for key, value in heatmap.items() if key != "levels"}
+
+
+def heatmap_overview(heatmap: Dict) -> Dict:
+    """Metadata plus the non-empty cells of one coarse level"""
+    if heatmap.get("format") != HEATMAP_FORMAT:
+        return heatmap  # Legacy dense grid, returned unchanged
+    level = min(OVERVIEW_LEVEL, heatmap["max_level"])
+    tiles = heatmap["levels"].get(str(level), {})
+    overview = heatmap_metadata(heatmap)
+    overview["level"] = level
+    overview["cells"] = [cell for cells in tiles.values() for cell in cells]
+    return overview
+
+
+def select_tiles(
+    metadata: Dict,
+    level_tiles: Optional[Dict[str, List]],
+    zoom: int,
+    viewport: Optional[Extent] = None
+) -> List[Dict]:
+    """Non-empty tiles of one level that intersect a world-space viewport"""
+    if not level_tiles:
+        return []
+
+    if viewport is None:
+        return [{"tx": int(key.split(",")[0]), "ty": int(key.split(",")[1]), "cells": cells}
+                for key, cells in level_tiles.items()]
+
+    tile_world_size = metadata["size"] / (1 << zoom) * TILE_CELLS
+    tx_min = math.floor((viewport[0] - metadata["origin_x"]) / tile_world_size)
+    ty_min = math.floor((viewport[1] - metadata["origin_y"]) / tile_world_size)
+    tx_max = math.floor((viewport[2] - metadata["origin_x"]) / tile_world_size)
+    ty_max = math.floor((viewport[3] - metadata["origin_y"]) / tile_world_size)
+
+    selected = []
+    for key, cells in level_tiles.items():
+        tx, ty = (int(v) for v in key.split(","))
+        if tx_min <= tx <= tx_max and ty_min <= ty <= ty_max:
+            selected.append({"tx": tx, "ty": ty, "cells": cells})
+    return selected
+
+
+def count_base_cells(points: Iterable[Tuple[float, float]]) -> Dict[Tuple[int, int], int]:
+    """Finest-level counts for a sequence of (x, y) positions"""
+    counts: Dict[Tuple[int, int], int] = {}
+    for x, y in points:
+        key = base_cell(x, y)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
@@ -0,0 +1,222 @@
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+
+import redis
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.driving_stats import DrivingStats
+from app.models.job import Job, JobStatus
+from app.models.safety_event import SafetyEvent
+from app.models.safety_risk import SafetyRisk
+from app.models.telemetry import Telemetry
+from app.redis_client import get_redis
+from app.services.response_cache import DEFAULT_TTL_SECONDS, context_key, generation_key, store_if_generation
+
+logger = logging.getLogger(__name__)
+
+HARD_BRAKE_INTENSITY = 7.0  # 0-10 scale
+SHARP_STEERING_DEGREES = 30.0
+NOTABLE_EVENT_LIMIT = 3  # Closest encounters quoted to the model
+
+
+# ============ SUMMARY ============
+
+def _round(value, digits: int = 2) -> Optional[float]:
+    return round(float(value), digits) if value is not None else None
+
+
+def _telemetry_stats(db: Session, job_id) -> Optional[Dict]:
+    """Speed/brake/steering statistics in one aggregate query (rows are never loaded)"""
+    row = db.query(
+        func.count(Telemetry.id).label("samples"),
+        func.max(Telemetry.timestamp).label("last_ms"),
+        func.avg(Telemetry.speed).label("avg_speed"),
+        func.max(Telemetry.speed).label("max_speed"),
+        func.min(Telemetry.speed).label("min_speed"),
+        func.stddev_pop(Telemetry.speed).label("speed_stddev"),
+        func.min(Telemetry.acceleration).label("min_acceleration"),
+        func.max(Telemetry.acceleration).label("max_acceleration"),
+        func.avg(Telemetry.brake_intensity).label("avg_brake"),
+        func.max(Telemetry.brake_intensity).label("max_brake"),
+        func.sum(case((Telemetry.brake_intensity >= HARD_BRAKE_INTENSITY, 1), else_=0)).label("hard_brakes"),
+        func.avg(func.abs(Telemetry.steering_angle)).label("avg_steering"),
+        func.max(func.abs(Telemetry.steering_angle)).label("max_steering"),
+        func.sum(case((func.abs(Telemetry.steering_angle) >= SHARP_STEERING_DEGREES, 1), else_=0)).label("sharp_turns"),
+    ).filter(Telemetry.job_id == job_id).one()
+    if not row.samples:
+        return None
+    return {
+        "samples": row.samples,
+        "seconds": _round((row.last_ms or 0) / 1000, 1),
+        "speed": {
+            "avg": _round(row.avg_speed), "max": _round(row.max_speed),
+            "min": _round(row.min_speed), "stddev": _round(row.speed_stddev)
+        },
+        "acceleration": {"min": _round(row.min_acceleration), "max": _round(row.max_acceleration)},
+        "brake": {"avg": _round(row.avg_brake), "max": _round(row.max_brake), "hard_samples": int(row.hard_brakes or 0)},
+        "steering": {"avg_abs": _round(row.avg_steering), "max_abs": _round(row.max_steering), "sharp_samples": int(row.sharp_turns or 0)},
+    }
+
+
+def _notable_events(db: Session, job_id) -> List[Dict]:
+    events = db.query(SafetyEvent).filter(SafetyEvent.job_id == job_id).order_by(
+        SafetyEvent.min_distance, SafetyEvent.timestamp
+    ).limit(NOTABLE_EVENT_LIMIT).all()
+    return [
+        {
+            "seconds": _round(event.timestamp / 1000, 1),
+            "type": event.event_type.value,
+            "vehicle_id": event.vehicle_id,
+            "other": f"{event.other_type.value} {event.other_id}",
+            "min_distance": _round(event.min_distance),
+            "time_to_collision": _round(event.time_to_collision),
+            "relative_speed": _round(event.relative_speed),
+        }
+        for event in events
+    ]
+
+
+def summarize_job(db: Session, job: Job) -> Dict:
+    """Everything the assistant should know about a job, small enough to prompt with"""
+    summary = {
+        "job_id": str(job.id),
+        "status": job.status.value if job.status else None,
+        "simulation_type": job.simulation_type.value,
+        "vehicle_count": job.vehicle_count,
+        "weather": job.weather,
+        "duration_seconds": job.duration_seconds,
+        "telemetry": _telemetry_stats(db, job.id),
+        "safety": None,
+        "notable_events": _notable_events(db, job.id),
+        "driving": None,
+    }
+
+    risk = db.query(SafetyRisk).filter(SafetyRisk.job_id == job.id).first()
+    if risk:
+        summary["safety"] = {
+            "score": _round(risk.overall_safety_score, 1),
+            "near_misses": risk.near_miss_count,
+            "collisions": risk.collision_count,
+            "hazard_exposure": _round(risk.hazard_exposure_score),
+        }
+
+    stats = db.query(DrivingStats).filter(DrivingStats.job_id == job.id).first()
+    if stats:
+        summary["driving"] = {
+            "session_number": stats.session_number,
+            "score": stats.score,
+            "off_road": stats.off_road_count,
+            "red_light_violations": stats.red_light_violations,
+            "yellow_light_violations": stats.yellow_light_violations,
+            "turn_smoothness": _round(stats.turn_smoothness_score, 1),
+            "distance_m": _round(stats.distance_traveled, 1),
+        }
+    return summary
+
+
+def format_context(summary: Dict) -> str:
+    """Prompt text for a job summary"""
+    lines = [
+        f"- Simulation Type: {summary['simulation_type']}",
+        f"- Vehicle Count: {summary['vehicle_count']}",
+        f"- Weather: {summary['weather']}",
+        f"- Duration: {summary['duration_seconds']} seconds",
+    ]
+
+    telemetry = summary.get("telemetry")
+    if telemetry:
+        speed, brake, steering = telemetry["speed"], telemetry["brake"], telemetry["steering"]
+        lines += [
+            f"- Telemetry: {telemetry['samples']} samples over {telemetry['seconds']} s",
+            f"- Speed: avg {speed['avg']:.1f} m/s, max {speed['max']:.1f}, min {speed['min']:.1f}, std dev {speed['stddev'] or 0:.1f}",
+            f"- Acceleration: {telemetry['acceleration']['min'] or 0:.1f} to {telemetry['acceleration']['max'] or 0:.1f} m/s²",
+            f"- Brake Intensity: avg {brake['avg']:.1f}/10, max {brake['max']:.1f}, hard braking in {brake['hard_samples']} samples",
+            f"- Steering: avg |angle| {steering['avg_abs']:.1f}°, max {steering['max_abs']:.1f}°, sharp turns in {steering['sharp_samples']} samples",
+        ]
+
+    safety = summary.get("safety")
+    if safety:
+        lines.append(
+            f"- Safety: score {safety['score']:.1f}/100, {safety['near_misses']} near misses, "
+            f"{safety['collisions']} collisions, hazard exposure {safety['hazard_exposure'] or 0:.2f}"
+        )
+    for event in summary.get("notable_events") or []:
+        ttc = f", TTC {event['time_to_collision']:.2f} s" if event["time_to_collision"] is not None else ""
+        lines.append(
+            f"- {event['type'].replace('_', ' ').title()} at {event['seconds']} s: vehicle {event['vehicle_id']} "
+            f"and {event['other']}, {event['min_distance']:.2f} m apart{ttc}, relative speed {event['relative_speed'] or 0:.1f} m/s"
+        )
+
+    driving = summary.get("driving")
+    if driving:
+        lines.append(
+            f"- Manual Session #{driving['session_number']}: score {driving['score']}, "
+            f"{driving['off_road']} off-road, {driving['red_light_violations']} red / "
+            f"{driving['yellow_light_violations']} yellow light violations, "
+            f"turn smoothness {driving['turn_smoothness']}/100, {driving['distance_m']} m driven"
+        )
+    return "\n".join(lines)
+
+
+# ============ CACHE ============
+# Stored under the job's response-cache keys, so deleting or reanalyzing
+# the job drops it with the other derived data. Writes are guarded by the
+# key's invalidation generation (see response_cache.store_if_generation):
+# read it with cached_job_context() before summarizing.
+
+def cached_job_context(job_id) -> Tuple[Optional[Dict], Optional[int]]:
+    """Cached summary (None on a miss) and the generation to store a new one under"""
+    key = context_key(job_id)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.get(key)
+        pipe.get(generation_key(key))
+        cached, generation = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Job context cache read failed for {job_id}: {e}")
+        return None, None
+    return (json.loads(cached) if cached is not None else None), int(generation or 0)
+
+
+def store_job_context(job_id, summary: Dict, generation: Optional[int]) -> None:
+    """Store a summary unless the job was invalidated since `generation` was read"""
+    if generation is None:
+        return
+    key = context_key(job_id)
+    try:
+        store_if_generation(
+            get_redis(), key, generation,
+            lambda pipe: pipe.set(key, json.dumps(summary), ex=DEFAULT_TTL_SECONDS)
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Job context cache write failed for {job_id}: {e}")
+
+
+def load_job_context(db: Session, job_id) -> Tuple[Optional[Dict], bool]:
+    """
+    Summary computed from the database (no Redis calls, so it can run on the
+    event loop via run_sync), and whether it is final enough to cache.
+    Returns (None, False) if the job doesn't exist.
+    """
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        return None, False
+    return summarize_job(db, job), job.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+def job_context(db: Session, job_id) -> Optional[Dict]:
+    """
+    Cached summary of a job, computed on first use. Summaries of jobs that
+    are still running are recomputed on each call and not stored.
+    Returns None if the job doesn't exist.
+    """
+    summary, generation = cached_job_context(job_id)
+    if summary is not None:
+        return summary
+
+    summary, final = load_job_context(db, job_id)
+    if final:
+        store_job_context(job_id, summary, generation)
+    return summary
@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.job import Job, JobStatus
+from app.models.job_status_count import JobStatusCount
+
+
+def _status(value) -> Optional[JobStatus]:
+    return JobStatus(value) if value else None
+
+
+def status_count_updates(old_status, new_status) -> List:
+    """
+    UPDATE statements moving one job between status counters
+    (old_status=None for a new job, new_status=None for a deleted one).
+    Run them in the same transaction as the job change.
+    """
+    old, new = _status(old_status), _status(new_status)
+    if old == new:
+        return []
+    return [
+        update(JobStatusCount)
+        .where(JobStatusCount.status == status)
+        .values(count=JobStatusCount.count + delta)
+        for status, delta in ((old, -1), (new, 1))
+        if status is not None
+    ]
+
+
+def record_status_change(db: Session, old_status, new_status) -> None:
+    for statement in status_count_updates(old_status, new_status):
+        db.execute(statement)
+
+
+async def record_status_change_async(db: AsyncSession, old_status, new_status) -> None:
+    for statement in status_count_updates(old_status, new_status):
+        await db.execute(statement)
+
+
+def seed_status_counts(db: Session) -> None:
+    """
+    Initialize the counters from the jobs table (first use on an existing database).
+    SHARE mode blocks job writes until the counts are stored: writers that
+    committed earlier are in the count, later ones update the seeded rows.
+    """
+    db.execute(text("LOCK TABLE jobs IN SHARE MODE"))
+    counts = dict(db.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+    db.execute(
+        insert(JobStatusCount)
+        .values([{"status": status, "count": counts.get(status, 0)} for status in JobStatus])
+        .on_conflict_do_nothing(index_elements=["status"])
+    )
+    db.commit()
+
+
+def status_counts(rows) -> Dict[str, int]:
+    counts = {status.value: 0 for status in JobStatus}
+    for row in rows:
+        counts[_status(row.status).value] = row.count
+    return counts
@@ -0,0 +1,114 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+import asyncio
+import json
+import logging
+
+import redis
+import redis.asyncio as aioredis
+
+from app.models.job import Job
+from app.redis_client import REDIS_URL, get_redis
+from app.schemas.job import JobResponse
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENTS_CHANNEL = "job_events"
+PROGRESS_STEP = 5  # Percent of simulated time between progress events
+CLIENT_QUEUE_SIZE = 1000  # Events buffered per slow client before it is told to resync
+RECONNECT_MIN_SECONDS = 1.0  # First retry after the subscription drops; doubles while Redis is down
+RECONNECT_MAX_SECONDS = 30.0
+
+
+# ============ PUBLISHING (API and workers) ============
+
+def _status_value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+def job_event(job: Job, previous_status=None, progress: Optional[int] = None) -> Dict:
+    """
+    Event for a created or updated job. Clients adjust their per-status
+    counts when previous_status differs from job.status (None = new job).
+    """
+    return {
+        "type": "job",
+        "job": JobResponse.model_validate(job).model_dump(mode="json"),
+        "previous_status": _status_value(previous_status),
+        "progress": progress
+    }
+
+
+def job_deleted_event(job: Job) -> Dict:
+    return {"type": "deleted", "job_id": str(job.id), "status": _status_value(job.status)}
+
+
+def publish_job_event(event: Dict) -> None:
+    """Publish to every connected dashboard (best effort; never fails the caller)"""
+    try:
+        get_redis().publish(JOB_EVENTS_CHANNEL, json.dumps(event))
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish job event: {e}")
+
+
+# ============ FAN-OUT (API process) ============
+
+class JobEventBroadcaster:
+    """
+    One Redis subscription per API process, fanned out to every connected
+    client through in-memory queues, so Redis and the database see the same
+    load whether one dashboard is open or a thousand.
+    """
+
+    def __init__(self):
+        self._queues: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _listen(self) -> None:
+        delay = RECONNECT_MIN_SECONDS
+        disconnected = False
+        while True:
+            client = aioredis.from_url(REDIS_URL, decode_responses=True)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(JOB_EVENTS_CHANNEL)
+                    if disconnected:
+                        # Events may have been missed while disconnected
+                        self._broadcast(json.dumps({"type": "resync"}))
+                        disconnected = False
+                    delay = RECONNECT_MIN_SECONDS
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._broadcast(message["data"])
+            except redis.RedisError as e:
+                logger.warning(f"Job event subscription lost, retrying in {delay:.0f}s: {e}")
+                disconnected = True
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+            finally:
+                await client.aclose()
+
+    def _broadcast(self, data: str) -> None:
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and have it reload instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(json.dumps({"type": "resync"}))
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        """Queue of raw JSON events for one client connection"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._queues.add(queue)
+        try:
+            yield queue
+        finally:
+            self._queues.discard(queue)
+
+
+job_event_broadcaster = JobEventBroadcaster()
@@ -0,0 +1,141 @@
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import redis
+
+from app.redis_client import get_redis
+from app.services.llm_providers import (
+    LLM_MAX_RETRIES, LLM_TIMEOUT_SECONDS, LLMProvider, LLMUnavailable, get_provider
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # In-flight completions per process
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+LLM_CACHE_PREFIX = "llm_cache:"
+COALESCE_POLL_SECONDS = 0.1  # How often a duplicate request checks for the leader's result
+
+# Delete the single-flight lock only if it still holds this holder's token:
+# after an expiry another request may own it, and must keep it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+# ============ PROVIDER ============
+# The backend (OpenAI, or the local stub for load tests) comes from
+# LLM_PROVIDER; see app/services/llm_providers.py
+
+_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+_async_slots: Optional[asyncio.Semaphore] = None
+
+
+class LLMBusy(TimeoutError):
+    """No completion slot freed up within LLM_TIMEOUT_SECONDS"""
+
+
+def _create(provider: LLMProvider, request: Dict) -> str:
+    # Bounded per process so a burst can't open unlimited upstream connections
+    if not _slots.acquire(timeout=LLM_TIMEOUT_SECONDS):
+        raise LLMBusy("Too many concurrent LLM requests")
+    try:
+        return provider.create(request)
+    finally:
+        _slots.release()
+
+
+# ============ CACHED COMPLETIONS ============
+
+def _cache_key(provider: LLMProvider, request: Dict) -> str:
+    raw = json.dumps({"provider": provider.name, **request}, sort_keys=True, separators=(",", ":"))
+    return f"{LLM_CACHE_PREFIX}{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+def complete(
+    messages: List[Dict[str, str]],
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+    model: str = DEFAULT_MODEL,
+    cache: bool = True
+) -> str:
+    """
+    Chat completion from the configured provider.
+    With cache=True, identical requests (same model, messages and sampling
+    parameters) are answered from Redis, and concurrent duplicates wait for
+    the first one instead of calling the API again (single flight).
+    Raises LLMUnavailable if the provider isn't configured (e.g. no API key).
+    """
+    provider = get_provider()
+    request = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+    if not cache:
+        return _create(provider, request)
+
+    key = _cache_key(provider, request)
+    lock_key = f"{key}:lock"
+    redis_client = get_redis()
+    lock_ms = int(LLM_TIMEOUT_SECONDS * (LLM_MAX_RETRIES + 1) * 1000)
+    deadline = time.monotonic() + lock_ms / 1000
+    token = uuid.uuid4().hex
+    leader = False
+    try:
+        while time.monotonic() < deadline:
+            cached = redis_client.get(key)
+            if cached is not None:
+                return cached
+            # The lock expires on its own if its holder dies mid-request
+            leader = bool(redis_client.set(lock_key, token, nx=True, px=lock_ms))
+            if leader:
+                break
+            time.sleep(COALESCE_POLL_SECONDS)
+    except redis.RedisError as e:
+        logger.warning(f"LLM cache unavailable, calling the API directly: {e}")
+        return _create(provider, request)
+
+    try:
+        content = _create(provider, request)
+        try:
+            redis_client.set(key, content, ex=LLM_CACHE_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"LLM cache write failed: {e}")
+        return content
+    finally:
+        if leader:
+            try:
+                redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except redis.RedisError as e:
+                logger.warning(f"LLM request lock release failed: {e}")
+
+
+# ============ STREAMING ============
+
+async def stream_complete(
+    messages: List[Dict[str, str]],
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+    model: str = DEFAULT_MODEL
+) -> AsyncIterator[str]:
+    """
+    Yield completion text chunks as the model generates them (not cached).
+    Runs on the event loop, so concurrent streams hold no threads.
+    Raises LLMUnavailable if the provider isn't configured (e.g. no API key).
+    """
+    global _async_slots
+    if _async_slots is None:
+        _async_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+    request = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+    async with _async_slots:
+        async for chunk in get_provider().stream(request):
+            yield chunk
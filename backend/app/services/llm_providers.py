@@ -0,0 +1,168 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+# Stub provider: deterministic replies with OpenAI-like timing, for load tests
+LLM_STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "300"))  # Time to first token
+LLM_STUB_TOKENS_PER_SECOND = float(os.getenv("LLM_STUB_TOKENS_PER_SECOND", "50"))  # 0 = no generation delay
+LLM_STUB_RESPONSES_FILE = os.getenv("LLM_STUB_RESPONSES_FILE")  # JSON list of reply strings
+
+STUB_RESPONSES = [
+    "Your average speed was steady, but braking was concentrated in a few hard stops. "
+    "Anticipate traffic lights earlier and ease off the throttle instead of braking late.",
+    "The simulation shows most near misses happened at intersections. Lower approach speeds "
+    "and a larger following distance would give vehicles more time to react.",
+    "Steering inputs were smooth through most turns. Focus on keeping a consistent lane position "
+    "and check for pedestrians near crosswalks before accelerating out of a turn.",
+]
+
+
+class LLMUnavailable(RuntimeError):
+    """No LLM backend is configured (e.g. OPENAI_API_KEY missing)"""
+
+
+class LLMProvider(ABC):
+    """
+    A chat-completion backend. request holds model, messages, max_tokens and
+    temperature. Implementations must be safe to share across threads.
+    """
+    name = ""
+
+    @abstractmethod
+    def create(self, request: Dict) -> str:
+        """Complete a request, blocking until the whole reply is ready"""
+
+    @abstractmethod
+    def stream(self, request: Dict) -> AsyncIterator[str]:
+        """Async generator of reply chunks as they are produced"""
+
+
+# ============ OPENAI ============
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self):
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _api_key() -> str:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            logger.warning("OpenAI API key not found in environment")
+            raise LLMUnavailable("OpenAI API key not configured")
+        if api_key == "your_openai_api_key_here":
+            logger.warning("OpenAI API key is still set to default placeholder value")
+            raise LLMUnavailable("OpenAI API key not configured")
+        return api_key
+
+    def client(self):
+        """Shared OpenAI client (one HTTP connection pool per process)"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(
+                        api_key=self._api_key(), timeout=LLM_TIMEOUT_SECONDS, max_retries=LLM_MAX_RETRIES
+                    )
+        return self._client
+
+    def async_client(self):
+        """Shared AsyncOpenAI client for streaming from the API's event loop"""
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(
+                api_key=self._api_key(), timeout=LLM_TIMEOUT_SECONDS, max_retries=LLM_MAX_RETRIES
+            )
+        return self._async_client
+
+    def create(self, request: Dict) -> str:
+        response = self.client().chat.completions.create(**request)
+        return response.choices[0].message.content
+
+    async def stream(self, request: Dict) -> AsyncIterator[str]:
+        stream = await self.async_client().chat.completions.create(**request, stream=True)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+# ============ STUB ============
+
+class StubProvider(LLMProvider):
+    """
+    Local stand-in: picks a canned reply by hashing the request, so the same
+    prompt always gets the same answer, and paces it like a real model
+    (first-token latency, then a fixed token rate). Makes no network calls.
+    """
+    name = "stub"
+
+    def __init__(
+        self,
+        responses: Optional[List[str]] = None,
+        latency_ms: float = LLM_STUB_LATENCY_MS,
+        tokens_per_second: float = LLM_STUB_TOKENS_PER_SECOND
+    ):
+        self.responses = responses or self._load_responses()
+        self.latency = latency_ms / 1000
+        self.token_delay = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    @staticmethod
+    def _load_responses() -> List[str]:
+        if not LLM_STUB_RESPONSES_FILE:
+            return STUB_RESPONSES
+        with open(LLM_STUB_RESPONSES_FILE) as f:
+            responses = json.load(f)
+        if not responses or not all(isinstance(r, str) for r in responses):
+            raise ValueError(f"{LLM_STUB_RESPONSES_FILE} must be a non-empty JSON list of strings")
+        return responses
+
+    def _tokens(self, request: Dict) -> List[str]:
+        raw = json.dumps(request, sort_keys=True)
+        index = int(hashlib.sha256(raw.encode()).hexdigest(), 16) % len(self.responses)
+        # Words stand in for tokens; max_tokens truncates like the real API
+        return re.findall(r"\S+\s*", self.responses[index])[:request.get("max_tokens") or None]
+
+    def create(self, request: Dict) -> str:
+        tokens = self._tokens(request)
+        time.sleep(self.latency + self.token_delay * len(tokens))
+        return "".join(tokens)
+
+    async def stream(self, request: Dict) -> AsyncIterator[str]:
+        await asyncio.sleep(self.latency)
+        for token in self._tokens(request):
+            yield token
+            await asyncio.sleep(self.token_delay)
+
+
+PROVIDERS = {provider.name: provider for provider in (OpenAIProvider, StubProvider)}
+
+_provider: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> LLMProvider:
+    """The configured provider (LLM_PROVIDER), shared by the whole process"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                if LLM_PROVIDER not in PROVIDERS:
+                    raise ValueError(f"Unknown LLM_PROVIDER {LLM_PROVIDER!r}, expected one of {sorted(PROVIDERS)}")
+                _provider = PROVIDERS[LLM_PROVIDER]()
+    return _provider
@@ -0,0 +1,82 @@
+from typing import Dict, Optional
+import math
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch for non-negative values (DDSketch-style).
+
+    Values fall into logarithmic buckets, so any quantile is returned within
+    `relative_accuracy` of the true value. Buckets are plain counts: sketches
+    merge by adding counts, and a value can be removed again with weight=-1.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """Insert a value (or remove one previously inserted with weight=-1)"""
+        self.count += weight
+        if value <= 0:
+            self.zero_count += weight
+            return
+        key = self._key(value)
+        remaining = self.bins.get(key, 0) + weight
+        if remaining:
+            self.bins[key] = remaining
+        else:
+            self.bins.pop(key, None)
+
+    def merge(self, other: "QuantileSketch", weight: int = 1) -> None:
+        """Add (weight=1) or subtract (weight=-1) another sketch"""
+        self.count += weight * other.count
+        self.zero_count += weight * other.zero_count
+        for key, n in other.bins.items():
+            remaining = self.bins.get(key, 0) + weight * n
+            if remaining:
+                self.bins[key] = remaining
+            else:
+                self.bins.pop(key, None)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate value at quantile q (0-1), or None if empty"""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return self._value(key)
+        return self._value(max(self.bins)) if self.bins else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "bins": {str(key): n for key, n in self.bins.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "QuantileSketch":
+        if not data:
+            return cls()
+        sketch = cls(data["relative_accuracy"])
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.bins = {int(key): n for key, n in data["bins"].items()}
+        return sketch
@@ -0,0 +1,159 @@
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.job import Job, JobStatus, SimulationType
+from app.models.scenario import Scenario
+from app.models.telemetry import Telemetry
+from app.models.safety_risk import SafetyRisk
+from app.models.safety_event import SafetyEvent
+from app.services.heatmap_pyramid import scenario_extent
+from app.services.scenario_analytics import AGGREGATED_FIELDS, AnalyticsDelta, apply_analytics_delta
+from app.services.scenario_snapshots import load_snapshot
+from app.services.response_cache import context_key, invalidate, safety_key
+from app.services.vectorized_safety_analyzer import VectorizedSafetyAnalyzer, TELEMETRY_COLUMNS
+
+TELEMETRY_FETCH_SIZE = 50000  # rows per server-side fetch while streaming telemetry
+
+
+def select_stale_jobs(
+    db: Session,
+    job_ids: Optional[Iterable[UUID]] = None,
+    scenario_id: Optional[UUID] = None,
+    force: bool = False
+) -> List[UUID]:
+    """
+    Completed jobs whose SafetyRisk is missing, was produced by an older
+    analyzer version or from an incomplete telemetry stream (or all of them
+    with force=True), optionally narrowed to jobs/a scenario
+    """
+    query = db.query(Job.id).outerjoin(SafetyRisk, SafetyRisk.job_id == Job.id).filter(
+        Job.status == JobStatus.COMPLETED
+    )
+    if not force:
+        query = query.filter(or_(
+            SafetyRisk.id.is_(None),
+            Job.safety_stream_incomplete.is_(True),
+            SafetyRisk.analyzer_version.is_(None),
+            SafetyRisk.analyzer_version < VectorizedSafetyAnalyzer.VERSION
+        ))
+    if job_ids is not None:
+        query = query.filter(Job.id.in_(list(job_ids)))
+    if scenario_id is not None:
+        query = query.filter(Job.scenario_id == scenario_id)
+    return [row[0] for row in query.order_by(Job.created_at).all()]
+
+
+def compute_safety_risk(job_id: str) -> Optional[Dict]:
+    """
+    Recompute one job's SafetyRisk fields from stored data.
+    Opens its own session so it can run in a worker process.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(
+            Job.scenario_id, Job.simulation_type, Job.snapshot_hash
+        ).filter(Job.id == job_id).first()
+        if not job:
+            return None
+        # The map the job actually ran on; jobs predating snapshots use the current scenario
+        scenario_data = load_snapshot(db, job.snapshot_hash) if job.snapshot_hash else None
+        if scenario_data is None:
+            scenario = db.query(
+                Scenario.roads, Scenario.traffic_lights, Scenario.stop_signs,
+                Scenario.crosswalks, Scenario.hazards
+            ).filter(Scenario.id == job.scenario_id).first()
+            scenario_data = dict(scenario._mapping) if scenario else {}
+
+        analyzer = VectorizedSafetyAnalyzer()
+        rows = db.query(
+            *[getattr(Telemetry, column) for column in TELEMETRY_COLUMNS]
+        ).filter(
+            Telemetry.job_id == job_id
+        ).order_by(
+            # The order samples were fed in while the job ran: by tick, then vehicle
+            Telemetry.timestamp, Telemetry.vehicle_id, Telemetry.id
+        ).yield_per(TELEMETRY_FETCH_SIZE)
+        columns = analyzer.columns_from_rows(rows)
+
+        # AI simulations derive near misses from stored geometric events
+        events = None
+        if job.simulation_type == SimulationType.AI_SIMULATION:
+            events = db.query(
+                SafetyEvent.position_x, SafetyEvent.position_y, SafetyEvent.event_type
+            ).filter(SafetyEvent.job_id == job_id).all()
+
+        analytics = analyzer.analyze(
+            columns,
+            scenario_data.get("hazards") or [],
+            scenario_extent(scenario_data),
+            events
+        )
+        return {"job_id": job_id, **analytics}
+    finally:
+        db.close()
+
+
+def store_safety_risks(db: Session, results: List[Dict]) -> int:
+    """
+    Upsert a batch of recomputed SafetyRisk rows in one statement and move the
+    jobs' contributions in ScenarioAnalytics from the old to the new values,
+    with one aggregate update per scenario
+    """
+    results = [r for r in results if r]
+    if not results:
+        return 0
+
+    job_ids = [r["job_id"] for r in results]
+    jobs = {
+        str(job.id): job
+        for job in db.query(Job.id, Job.scenario_id, Job.duration_seconds).filter(Job.id.in_(job_ids))
+    }
+    results = sorted((r for r in results if str(r["job_id"]) in jobs), key=lambda r: str(r["job_id"]))
+    if not results:
+        return 0
+
+    # Lock the old rows (in a stable order across concurrent batches) so the
+    # contributions removed below are the ones being replaced
+    existing = {
+        str(risk.job_id): risk
+        for risk in db.query(
+            SafetyRisk.job_id, SafetyRisk.aggregated, *[getattr(SafetyRisk, f) for f in AGGREGATED_FIELDS]
+        ).filter(SafetyRisk.job_id.in_(job_ids)).order_by(SafetyRisk.job_id).with_for_update()
+    }
+
+    deltas: Dict[UUID, AnalyticsDelta] = {}
+    rows = []
+    for result in results:
+        job = jobs[str(result["job_id"])]
+        fields = {key: value for key, value in result.items() if key != "job_id"}
+        delta = deltas.setdefault(job.scenario_id, AnalyticsDelta())
+
+        old = existing.get(str(result["job_id"]))
+        if old is not None and old.aggregated:
+            delta.add(old._mapping, job.duration_seconds, weight=-1)
+        delta.add(fields, job.duration_seconds)
+        rows.append({"id": uuid4(), "job_id": result["job_id"], **fields, "aggregated": True})
+
+    statement = insert(SafetyRisk).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["job_id"],
+        set_={column: statement.excluded[column] for column in rows[0] if column not in ("id", "job_id")}
+    ))
+
+    # Lock ScenarioAnalytics rows in a stable order across concurrent batches
+    for scenario_id in sorted(deltas, key=str):
+        apply_analytics_delta(db, scenario_id, deltas[scenario_id])
+
+    # Recomputed from stored telemetry, so samples the stream missed are counted now
+    db.query(Job).filter(
+        Job.id.in_([r["job_id"] for r in results]), Job.safety_stream_incomplete.is_(True)
+    ).update({Job.safety_stream_incomplete: False}, synchronize_session=False)
+
+    db.commit()
+    invalidate(key for r in results for key in (safety_key(r["job_id"]), context_key(r["job_id"])))
+    return len(results)
@@ -0,0 +1,149 @@
+from typing import Any, Awaitable, Callable, Iterable, Tuple
+import hashlib
+import logging
+
+import redis
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from app.redis_client import get_redis
+from app.services.fast_response import dumps, encoded_response
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "response_cache:"
+DEFAULT_TTL_SECONDS = 24 * 3600  # Entries are invalidated explicitly; the TTL only bounds memory
+
+
+# ============ CACHE KEYS ============
+
+def scenario_key(scenario_id) -> str:
+    return f"{CACHE_KEY_PREFIX}scenario:{scenario_id}"
+
+
+def snapshot_key(content_hash) -> str:
+    return f"{CACHE_KEY_PREFIX}snapshot:{content_hash}"
+
+
+def safety_key(job_id) -> str:
+    return f"{CACHE_KEY_PREFIX}safety:{job_id}"
+
+
+def insights_key(job_id) -> str:
+    return f"{CACHE_KEY_PREFIX}insights:{job_id}"
+
+
+def telemetry_key(job_id) -> str:
+    return f"{CACHE_KEY_PREFIX}telemetry:{job_id}"
+
+
+def context_key(job_id) -> str:
+    """Assistant context summary of a job (app/services/job_context.py), not a response"""
+    return f"{CACHE_KEY_PREFIX}context:{job_id}"
+
+
+def job_keys(job_id) -> Tuple[str, ...]:
+    """Every cached response derived from one job"""
+    return (safety_key(job_id), insights_key(job_id), telemetry_key(job_id), context_key(job_id))
+
+
+# ============ READ / WRITE ============
+
+def _response(request: Request, body: str, etag: str) -> Response:
+    """JSON/msgpack, compressed as negotiated (see fast_response.encoded_response)"""
+    return encoded_response(request, body.encode(), etag, {"Cache-Control": "no-cache"})
+
+
+async def cached_json_response(
+    request: Request,
+    key: str,
+    build: Callable[[], Awaitable[Tuple[Any, bool]]],
+    ttl: int = DEFAULT_TTL_SECONDS
+) -> Response:
+    """
+    Serve a JSON response from Redis, building (and storing) it on a miss.
+    build() returns (payload, cacheable); payloads that can still change,
+    e.g. telemetry of a running job, are returned with cacheable=False.
+    Redis errors fall through to build() so the cache never fails a request.
+    """
+    redis_client = get_redis()
+    try:
+        cached, generation = await run_in_threadpool(_lookup, redis_client, key)
+    except redis.RedisError as e:
+        logger.warning(f"Response cache read failed for {key}: {e}")
+        cached, generation = None, None
+    if cached:
+        return _response(request, cached["body"], cached["etag"])
+
+    payload, cacheable = await build()
+    body = dumps(payload).decode()
+    etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+
+    if cacheable and generation is not None:
+        try:
+            await run_in_threadpool(_store, redis_client, key, generation, body, etag, ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache write failed for {key}: {e}")
+    return _response(request, body, etag)
+
+
+def _lookup(redis_client, key: str) -> Tuple[dict, int]:
+    """Cached entry and its generation, read together before anything is built"""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hgetall(key)
+    pipe.get(generation_key(key))
+    cached, generation = pipe.execute()
+    return cached, int(generation or 0)
+
+
+def _store(redis_client, key: str, generation: int, body: str, etag: str, ttl: int) -> None:
+    def write(pipe):
+        pipe.hset(key, mapping={"body": body, "etag": etag})
+        pipe.expire(key, ttl)
+
+    store_if_generation(redis_client, key, generation, write)
+
+
+# ============ GENERATIONS ============
+# invalidate() bumps a counter per key. A reader records it before building
+# from the database and stores its result only if the counter is unchanged,
+# so a value built from rows read before a concurrent commit is never cached
+# after that commit's invalidation.
+
+def generation_key(key: str) -> str:
+    return f"{key}:generation"
+
+
+def store_if_generation(redis_client, key: str, generation: int, write: Callable[[Any], None]) -> bool:
+    """
+    Run write(pipe) in a WATCH/MULTI transaction if the key was not
+    invalidated since `generation` was read. Returns whether it was written.
+    """
+    watched = generation_key(key)
+    written = False
+
+    def _write(pipe):
+        nonlocal written
+        written = int(pipe.get(watched) or 0) == generation
+        if written:
+            pipe.multi()
+            write(pipe)
+
+    redis_client.transaction(_write, watched)
+    return written
+
+
+def invalidate(keys: Iterable[str]) -> None:
+    """Drop cached responses (call after the change is committed)"""
+    keys = list(keys)
+    if not keys:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        for key in keys:
+            pipe.incr(generation_key(key))
+            pipe.expire(generation_key(key), DEFAULT_TTL_SECONDS)
+        pipe.delete(*keys)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Response cache invalidation failed for {keys}: {e}")
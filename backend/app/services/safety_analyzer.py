@@ -1,43 +1,37 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import math
 
+from app.services.heatmap_pyramid import Extent, build_heatmap_pyramid, count_base_cells
+
 class SafetyAnalyzer:
     """Analyze telemetry data for safety risks"""
-    
-    def __init__(self, grid_size: int = 50):
-        self.grid_size = grid_size
+
+    # Bump whenever thresholds or scoring change; stored SafetyRisk rows with an
+    # older analyzer_version are picked up by re-analysis (app/services/reanalysis.py)
+    VERSION = 2
+
+    # Detection thresholds shared by all analyzer variants
+    HARD_BRAKE_THRESHOLD = 5.0  # brake intensity counted on the heatmap
+    NEAR_MISS_BRAKE_THRESHOLD = 7.0  # brake intensity for a near miss
+    NEAR_MISS_SPEED_THRESHOLD = 10.0  # m/s before the hard brake
+    DANGER_RADIUS = 10.0  # meters around a hazard
+    COLLISION_PENALTY = 15.0  # score points per geometric collision event
     
     def compute_collision_heatmap(
         self, 
         telemetry: List[Dict],
-        canvas_width: int = 1200,
-        canvas_height: int = 800
+        extent: Optional[Extent] = None
     ) -> Dict:
         """
         Generate collision heatmap from telemetry
-        Returns grid with collision density
+        Returns sparse quadtree pyramid of hard-braking positions
         """
-        cell_width = canvas_width / self.grid_size
-        cell_height = canvas_height / self.grid_size
-        
-        # Initialize grid
-        grid = [[0 for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-        
-        # Count high-risk events (high brake intensity)
-        for t in telemetry:
-            if t.brake_intensity > 5.0:  # Threshold for hard braking
-                cell_x = int(t.position_x / cell_width)
-                cell_y = int(t.position_y / cell_height)
-                
-                if 0 <= cell_x < self.grid_size and 0 <= cell_y < self.grid_size:
-                    grid[cell_y][cell_x] += 1
-        
-        return {
-            "grid_size": self.grid_size,
-            "cells": grid,
-            "canvas_width": canvas_width,
-            "canvas_height": canvas_height
-        }
+        base_counts = count_base_cells(
+            (t.position_x, t.position_y)
+            for t in telemetry
+            if t.brake_intensity > self.HARD_BRAKE_THRESHOLD
+        )
+        return build_heatmap_pyramid(base_counts, extent)
     
     def detect_near_misses(self, telemetry: List[Dict]) -> int:
         """
@@ -50,7 +44,8 @@ class SafetyAnalyzer:
             prev = telemetry[i-1]
             
             # Near miss: sudden hard braking while at high speed
-            if curr.brake_intensity > 7.0 and prev.speed > 10.0:
+            if (curr.brake_intensity > self.NEAR_MISS_BRAKE_THRESHOLD
+                    and prev.speed > self.NEAR_MISS_SPEED_THRESHOLD):
                 near_miss_count += 1
         
         return near_miss_count
@@ -67,7 +62,7 @@ class SafetyAnalyzer:
         if not hazards or not telemetry:
             return 0.0
         
-        danger_radius = 10.0  # meters
+        danger_radius = self.DANGER_RADIUS
         exposure_count = 0
         
         for t in telemetry:
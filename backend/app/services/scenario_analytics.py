@@ -0,0 +1,196 @@
+from typing import Dict, Optional, Tuple
+from uuid import UUID, uuid4
+import math
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.models.safety_risk import SafetyRisk
+from app.models.scenario_analytics import ScenarioAnalytics
+from app.services.heatmap_pyramid import build_heatmap_pyramid, pyramid_base_counts, update_heatmap_pyramid
+from app.services.quantile_sketch import QuantileSketch
+
+SCORE_BINS = 20  # 5-point safety score bins
+PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# SafetyRisk columns that feed the scenario aggregates
+AGGREGATED_FIELDS = (
+    "overall_safety_score", "hazard_exposure_score", "near_miss_count", "collision_count", "collision_heatmap"
+)
+
+
+def _lock_scenario_analytics(db: Session, scenario_id: UUID) -> ScenarioAnalytics:
+    """Get (creating if needed) the scenario's aggregate row, locked for update"""
+    db.execute(
+        insert(ScenarioAnalytics)
+        .values(
+            id=uuid4(),
+            scenario_id=scenario_id,
+            score_histogram=[0] * SCORE_BINS,
+            sketches={},
+            collision_heatmap={}
+        )
+        .on_conflict_do_nothing(index_elements=["scenario_id"])
+    )
+    return db.query(ScenarioAnalytics).filter(
+        ScenarioAnalytics.scenario_id == scenario_id
+    ).with_for_update().one()
+
+
+class AnalyticsDelta:
+    """
+    Net change to one scenario's aggregates from adding and removing any
+    number of job results, so a batch locks and rewrites the row once.
+    Every statistic is additive, so removal is exact.
+    """
+
+    def __init__(self):
+        self.job_count = 0
+        self.total_duration_seconds = 0.0
+        self.near_miss_total = 0
+        self.collision_total = 0
+        self.score_sum = 0.0
+        self.score_sq_sum = 0.0
+        self.hazard_exposure_sum = 0.0
+        self.histogram: Dict[int, int] = {}
+        self.sketches: Dict[str, QuantileSketch] = {}
+        self.heatmap: Dict[Tuple[int, int], int] = {}
+
+    def add(self, risk: Dict, duration_seconds: float, weight: int = 1) -> None:
+        """Add (weight=1) or remove (weight=-1) one job's SafetyRisk fields"""
+        score = risk.get("overall_safety_score") or 0.0
+        exposure = risk.get("hazard_exposure_score") or 0.0
+        near_misses = risk.get("near_miss_count") or 0
+        collisions = risk.get("collision_count") or 0
+
+        self.job_count += weight
+        self.total_duration_seconds += weight * duration_seconds
+        self.near_miss_total += weight * near_misses
+        self.collision_total += weight * collisions
+        self.score_sum += weight * score
+        self.score_sq_sum += weight * score * score
+        self.hazard_exposure_sum += weight * exposure
+
+        score_bin = min(SCORE_BINS - 1, max(0, int(score // (100 / SCORE_BINS))))
+        self.histogram[score_bin] = self.histogram.get(score_bin, 0) + weight
+
+        for name, value in (
+            ("safety_score", score),
+            ("hazard_exposure", exposure),
+            ("near_misses", near_misses),
+            ("collisions", collisions)
+        ):
+            self.sketches.setdefault(name, QuantileSketch()).add(value, weight)
+
+        for cell, count in pyramid_base_counts(risk.get("collision_heatmap") or {}).items():
+            self.heatmap[cell] = self.heatmap.get(cell, 0) + weight * count
+
+
+def safety_risk_fields(safety_risk: SafetyRisk) -> Dict:
+    """The SafetyRisk columns AnalyticsDelta.add reads"""
+    return {field: getattr(safety_risk, field) for field in AGGREGATED_FIELDS}
+
+
+def apply_analytics_delta(db: Session, scenario_id: UUID, delta: AnalyticsDelta) -> None:
+    """Merge a delta into the scenario's aggregate row (locked until the caller commits)"""
+    analytics = _lock_scenario_analytics(db, scenario_id)
+
+    analytics.job_count = (analytics.job_count or 0) + delta.job_count
+    analytics.total_duration_seconds = (analytics.total_duration_seconds or 0.0) + delta.total_duration_seconds
+    analytics.near_miss_total = (analytics.near_miss_total or 0) + delta.near_miss_total
+    analytics.collision_total = (analytics.collision_total or 0) + delta.collision_total
+    analytics.score_sum = (analytics.score_sum or 0.0) + delta.score_sum
+    analytics.score_sq_sum = (analytics.score_sq_sum or 0.0) + delta.score_sq_sum
+    analytics.hazard_exposure_sum = (analytics.hazard_exposure_sum or 0.0) + delta.hazard_exposure_sum
+
+    histogram = list(analytics.score_histogram or [0] * SCORE_BINS)
+    for score_bin, count in delta.histogram.items():
+        histogram[score_bin] += count
+    analytics.score_histogram = histogram
+
+    sketches = dict(analytics.sketches or {})
+    for name, change in delta.sketches.items():
+        sketch = QuantileSketch.from_dict(sketches.get(name))
+        sketch.merge(change)
+        sketches[name] = sketch.to_dict()
+    analytics.sketches = sketches
+
+    # Only the changed cells and their ancestor tiles are rewritten; the whole
+    # pyramid is rebuilt only when cells fall outside the current one
+    deltas = {cell: count for cell, count in delta.heatmap.items() if count}
+    if deltas:
+        heatmap = analytics.collision_heatmap or {}
+        if update_heatmap_pyramid(heatmap, deltas):
+            flag_modified(analytics, "collision_heatmap")
+        else:
+            base_counts = pyramid_base_counts(heatmap)
+            for cell, count in deltas.items():
+                remaining = base_counts.get(cell, 0) + count
+                if remaining:
+                    base_counts[cell] = remaining
+                else:
+                    base_counts.pop(cell, None)
+            analytics.collision_heatmap = build_heatmap_pyramid(base_counts)
+
+
+def apply_safety_risk(
+    db: Session,
+    scenario_id: UUID,
+    safety_risk: SafetyRisk,
+    duration_seconds: float,
+    weight: int = 1
+) -> None:
+    """
+    Merge (weight=1) or remove (weight=-1) one job's SafetyRisk into the
+    scenario aggregates. Caller commits.
+    """
+    if (weight > 0) == bool(safety_risk.aggregated):
+        return  # Already in the requested state
+
+    delta = AnalyticsDelta()
+    delta.add(safety_risk_fields(safety_risk), duration_seconds, weight)
+    apply_analytics_delta(db, scenario_id, delta)
+    safety_risk.aggregated = weight > 0
+
+
+def summarize_scenario_analytics(analytics: ScenarioAnalytics, heatmap_metadata: Optional[Dict] = None) -> Dict:
+    """
+    Response payload for the scenario analytics endpoint
+    Heatmap cells are served separately as tiles; only metadata is inlined
+    """
+    n = analytics.job_count or 0
+    minutes = (analytics.total_duration_seconds or 0.0) / 60
+
+    def distribution(name: str) -> Dict[str, Optional[float]]:
+        sketch = QuantileSketch.from_dict((analytics.sketches or {}).get(name))
+        return {f"p{int(q * 100)}": sketch.quantile(q) for q in PERCENTILES}
+
+    score_mean = analytics.score_sum / n if n else None
+    score_std = None
+    if n:
+        score_std = math.sqrt(max(0.0, analytics.score_sq_sum / n - score_mean * score_mean))
+
+    return {
+        "scenario_id": analytics.scenario_id,
+        "job_count": n,
+        "near_miss_total": analytics.near_miss_total,
+        "collision_total": analytics.collision_total,
+        "near_misses_per_job": analytics.near_miss_total / n if n else None,
+        "near_misses_per_minute": analytics.near_miss_total / minutes if minutes else None,
+        "collisions_per_job": analytics.collision_total / n if n else None,
+        "safety_score": {
+            "mean": score_mean,
+            "std": score_std,
+            "histogram": analytics.score_histogram,
+            **distribution("safety_score")
+        },
+        "hazard_exposure": {
+            "mean": analytics.hazard_exposure_sum / n if n else None,
+            **distribution("hazard_exposure")
+        },
+        "near_misses": distribution("near_misses"),
+        "collisions": distribution("collisions"),
+        "collision_heatmap": heatmap_metadata or {},
+        "updated_at": analytics.updated_at
+    }
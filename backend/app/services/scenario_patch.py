@@ -0,0 +1,138 @@
+from typing import Any, Dict, List, Tuple
+import copy
+
+from app.services.scenario_summary import GEOMETRY_FIELDS
+
+PATCHABLE_FIELDS = GEOMETRY_FIELDS + ("name", "weather", "weather_intensity")
+
+
+class PatchError(ValueError):
+    """A patch operation that cannot be applied (bad path, failed test, ...)"""
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    """RFC 6901 JSON Pointer -> reference tokens"""
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid path '{pointer}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise PatchError(f"Invalid array index '{token}'")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Array index {index} out of range")
+    return index
+
+
+def _resolve(document: Dict, tokens: List[str]) -> Tuple[Any, str]:
+    """Container holding the target of a pointer, and the last token"""
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, list):
+            target = target[_index(target, token, allow_end=False)]
+        elif isinstance(target, dict) and token in target:
+            target = target[token]
+        else:
+            raise PatchError(f"Path segment '{token}' not found")
+    return target, tokens[-1]
+
+
+def _get(document: Dict, pointer: str) -> Any:
+    container, token = _resolve(document, _parse_pointer(pointer))
+    if isinstance(container, list):
+        return container[_index(container, token, allow_end=False)]
+    if isinstance(container, dict) and token in container:
+        return container[token]
+    raise PatchError(f"Path '{pointer}' not found")
+
+
+def _add(document: Dict, pointer: str, value: Any) -> None:
+    container, token = _resolve(document, _parse_pointer(pointer))
+    if isinstance(container, list):
+        container.insert(_index(container, token, allow_end=True), value)
+    elif isinstance(container, dict):
+        container[token] = value
+    else:
+        raise PatchError(f"Cannot add at '{pointer}'")
+
+
+def _remove(document: Dict, pointer: str) -> Any:
+    container, token = _resolve(document, _parse_pointer(pointer))
+    if isinstance(container, list):
+        return container.pop(_index(container, token, allow_end=False))
+    if isinstance(container, dict) and token in container:
+        return container.pop(token)
+    raise PatchError(f"Path '{pointer}' not found")
+
+
+def _replace(document: Dict, pointer: str, value: Any) -> None:
+    container, token = _resolve(document, _parse_pointer(pointer))
+    if isinstance(container, list):
+        container[_index(container, token, allow_end=False)] = value
+    elif isinstance(container, dict) and token in container:
+        container[token] = value
+    else:
+        raise PatchError(f"Path '{pointer}' not found")
+
+
+def _check_root(pointer: str) -> None:
+    tokens = _parse_pointer(pointer)
+    if tokens[0] not in PATCHABLE_FIELDS:
+        raise PatchError(f"Field '{tokens[0]}' cannot be patched")
+    if len(tokens) == 1 and tokens[0] in GEOMETRY_FIELDS:
+        return  # Whole-array replace is allowed, removal is rejected below
+    if len(tokens) > 1 and tokens[0] not in GEOMETRY_FIELDS:
+        raise PatchError(f"Field '{tokens[0]}' has no sub-paths")
+
+
+def apply_patch(document: Dict, operations: List[Dict]) -> Dict:
+    """
+    Apply RFC 6902 operations (add, remove, replace, move, copy, test) to the
+    patchable scenario fields, e.g. {"op": "replace", "path": "/hazards/3/x", "value": 120}.
+    All-or-nothing: returns a patched copy and leaves `document` untouched.
+    Returns only the top-level fields that changed.
+    """
+    patched = copy.deepcopy({field: document.get(field) for field in PATCHABLE_FIELDS})
+    touched = set()
+
+    for operation in operations:
+        op, path = operation["op"], operation["path"]
+        _check_root(path)
+        if len(_parse_pointer(path)) == 1 and op in ("add", "remove", "move"):
+            raise PatchError(f"'{op}' cannot target the top-level field '{path}'")
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise PatchError(f"'{op}' requires 'value'")
+
+        if op == "test":
+            if _get(patched, path) != operation["value"]:
+                raise PatchError(f"Test failed at '{path}'")
+            continue
+
+        if op == "add":
+            _add(patched, path, operation["value"])
+        elif op == "remove":
+            _remove(patched, path)
+        elif op == "replace":
+            _replace(patched, path, operation["value"])
+        elif op in ("move", "copy"):
+            source = operation.get("from")
+            if not source:
+                raise PatchError(f"'{op}' requires 'from'")
+            _check_root(source)
+            if op == "move" and len(_parse_pointer(source)) == 1:
+                raise PatchError(f"'move' cannot take the top-level field '{source}'")
+            if op == "move" and path != source and (path + "/").startswith(source + "/"):
+                raise PatchError("Cannot move a value into itself")
+            value = _remove(patched, source) if op == "move" else copy.deepcopy(_get(patched, source))
+            _add(patched, path, value)
+            touched.add(_parse_pointer(source)[0])
+        else:
+            raise PatchError(f"Unsupported operation '{op}'")
+        touched.add(_parse_pointer(path)[0])
+
+    return {field: patched[field] for field in touched}
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+from uuid import UUID
+import copy
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.scenario import Scenario
+from app.models.scenario_snapshot import ScenarioSnapshot
+from app.services.scenario_summary import content_hash, scenario_data
+
+SNAPSHOT_CACHE_SIZE = 32  # Snapshots kept in memory per worker process
+
+
+class SnapshotRef(NamedTuple):
+    content_hash: str
+    scenario_version: int
+    weather: str
+
+
+def snapshot_data(scenario: Scenario) -> Dict:
+    """Plain-JSON geometry and weather of a scenario"""
+    data = scenario_data(scenario)
+    data["weather"] = getattr(data["weather"], "value", data["weather"])
+    return data
+
+
+async def ensure_snapshot(db: AsyncSession, scenario_id: UUID) -> Optional[SnapshotRef]:
+    """
+    Snapshot of the scenario's current content, created if no identical map
+    was snapshotted before. Returns None if the scenario doesn't exist.
+    Geometry is only read when a new snapshot must be written. Caller commits.
+    """
+    row = (await db.execute(
+        select(Scenario.content_hash, Scenario.version, Scenario.weather).where(Scenario.id == scenario_id)
+    )).first()
+    if not row:
+        return None
+
+    if row.content_hash:
+        exists = await db.scalar(
+            select(ScenarioSnapshot.content_hash).where(ScenarioSnapshot.content_hash == row.content_hash)
+        )
+        if exists:
+            return SnapshotRef(row.content_hash, row.version, row.weather)
+
+    scenario = await db.get(Scenario, scenario_id)
+    data = snapshot_data(scenario)
+    # Hash what is actually stored, even if the scenario changed since the first read
+    digest = content_hash(data)
+    await db.execute(
+        insert(ScenarioSnapshot)
+        .values(content_hash=digest, data=data)
+        .on_conflict_do_nothing(index_elements=["content_hash"])
+    )
+    return SnapshotRef(digest, scenario.version, scenario.weather)
+
+
+# ============ WORKER-SIDE LOADING ============
+
+_cache: "OrderedDict[str, Dict]" = OrderedDict()
+
+
+def load_snapshot(db: Session, digest: str) -> Optional[Dict]:
+    """
+    Snapshot data by content hash, cached per process (snapshots never change).
+    Returns a fresh copy, since simulations mutate scenario data.
+    """
+    data = _cache.get(digest)
+    if data is None:
+        data = db.query(ScenarioSnapshot.data).filter(ScenarioSnapshot.content_hash == digest).scalar()
+        if data is None:
+            return None
+        _cache[digest] = data
+        if len(_cache) > SNAPSHOT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(digest)
+    return copy.deepcopy(data)
@@ -0,0 +1,70 @@
+from typing import Dict, List, Optional
+import hashlib
+import json
+
+from app.models.scenario import Scenario
+from app.services.heatmap_pyramid import Extent, scenario_extent
+
+GEOMETRY_FIELDS = ("roads", "traffic_lights", "stop_signs", "crosswalks", "hazards")
+HASHED_FIELDS = GEOMETRY_FIELDS + ("weather", "weather_intensity")
+
+THUMBNAIL_SIZE = 100  # viewBox is THUMBNAIL_SIZE x THUMBNAIL_SIZE
+THUMBNAIL_MAX_POINTS = 32  # per road; longer roads are decimated
+
+
+def scenario_data(scenario: Scenario) -> Dict:
+    """Geometry and weather of an ORM scenario as plain data"""
+    return {field: getattr(scenario, field) for field in HASHED_FIELDS}
+
+
+def content_hash(data: Dict) -> str:
+    """
+    Stable sha256 of a scenario's geometry and weather
+    Identical maps hash equally regardless of name or id
+    """
+    canonical = {field: data.get(field) for field in HASHED_FIELDS}
+    if canonical["weather"] is not None:
+        canonical["weather"] = str(getattr(canonical["weather"], "value", canonical["weather"]))
+    raw = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def thumbnail_path(roads: List[Dict], extent: Optional[Extent]) -> str:
+    """SVG path data drawing each road as a polyline scaled into the thumbnail viewBox"""
+    if not roads or not extent:
+        return ""
+    min_x, min_y, max_x, max_y = extent
+    span = max(max_x - min_x, max_y - min_y) or 1.0
+    scale = THUMBNAIL_SIZE / span
+
+    commands = []
+    for road in roads:
+        points = road.get("points") or []
+        if len(points) < 2:
+            continue
+        step = max(1, -(-len(points) // THUMBNAIL_MAX_POINTS))
+        sampled = points[::step]
+        if sampled[-1] is not points[-1]:
+            sampled.append(points[-1])
+        coords = [
+            f"{(p['x'] - min_x) * scale:.1f} {(p['y'] - min_y) * scale:.1f}" for p in sampled
+        ]
+        commands.append("M" + " L".join(coords))
+    return " ".join(commands)
+
+
+def apply_summary(scenario: Scenario) -> None:
+    """Recompute the listing summary columns from the scenario's geometry"""
+    data = scenario_data(scenario)
+    extent = scenario_extent(data)
+
+    scenario.road_count = len(data["roads"] or [])
+    scenario.traffic_light_count = len(data["traffic_lights"] or [])
+    scenario.stop_sign_count = len(data["stop_signs"] or [])
+    scenario.crosswalk_count = len(data["crosswalks"] or [])
+    scenario.hazard_count = len(data["hazards"] or [])
+    scenario.bbox_min_x, scenario.bbox_min_y, scenario.bbox_max_x, scenario.bbox_max_y = (
+        extent if extent else (None, None, None, None)
+    )
+    scenario.content_hash = content_hash(data)
+    scenario.thumbnail = thumbnail_path(data["roads"] or [], extent)
@@ -0,0 +1,242 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import math
+
+from app.services.safety_analyzer import SafetyAnalyzer
+from app.services.heatmap_pyramid import Extent, base_cell, build_heatmap_pyramid
+
+
+class StreamingSafetyAnalyzer(SafetyAnalyzer):
+    """
+    Single-pass SafetyAnalyzer fed one sample at a time.
+
+    Every metric is kept as a running accumulator, so add_sample() is O(1)
+    in the number of samples seen and result() is ready as soon as the last
+    sample arrives. Samples are compared with the previously fed sample,
+    matching SafetyAnalyzer over rows in insertion order.
+
+    With geometric_events=True the heatmap, near-miss count and collision
+    penalty come from CollisionDetector events fed via add_event() instead of
+    brake-intensity thresholds.
+    """
+
+    def __init__(
+        self,
+        hazards: Optional[List[Dict]] = None,
+        extent: Optional[Extent] = None,
+        geometric_events: bool = False
+    ):
+        self.extent = tuple(extent) if extent else None
+        self.geometric_events = geometric_events
+        self.hazards = [{"x": h["x"], "y": h["y"]} for h in (hazards or [])]
+
+        # Accumulators
+        self.sample_count = 0
+        self.heatmap_counts: Dict[Tuple[int, int], int] = {}  # finest pyramid cell -> count
+        self.near_miss_count = 0
+        self.collision_count = 0
+        self.exposure_count = 0
+        self.brake_sum = 0.0
+        self.speed_sum = 0.0
+        self.max_speed = 0.0
+        self.steering_change_sum = 0.0
+        self.prev_speed: Optional[float] = None
+        self.prev_steering: Optional[float] = None
+
+        self._hazard_cells = self._build_hazard_cells()
+
+    def _build_hazard_cells(self) -> Dict[Tuple[int, int], List[Tuple[float, float]]]:
+        """Spatial hash of hazards with cell size equal to the danger radius"""
+        cells: Dict[Tuple[int, int], List[Tuple[float, float]]] = {}
+        for hazard in self.hazards:
+            key = (
+                math.floor(hazard["x"] / self.DANGER_RADIUS),
+                math.floor(hazard["y"] / self.DANGER_RADIUS)
+            )
+            cells.setdefault(key, []).append((hazard["x"], hazard["y"]))
+        return cells
+
+    def _near_hazard(self, x: float, y: float) -> bool:
+        """Check the 3x3 neighbourhood of hash cells around (x, y)"""
+        if not self._hazard_cells:
+            return False
+        cx = math.floor(x / self.DANGER_RADIUS)
+        cy = math.floor(y / self.DANGER_RADIUS)
+        radius_sq = self.DANGER_RADIUS * self.DANGER_RADIUS
+        for i in (cx - 1, cx, cx + 1):
+            for j in (cy - 1, cy, cy + 1):
+                for hx, hy in self._hazard_cells.get((i, j), ()):
+                    dx = x - hx
+                    dy = y - hy
+                    if dx * dx + dy * dy < radius_sq:
+                        return True
+        return False
+
+    def add_sample(
+        self,
+        position_x: float,
+        position_y: float,
+        speed: float,
+        brake_intensity: float,
+        steering_angle: float
+    ) -> None:
+        """Feed one telemetry sample into every accumulator"""
+        self.sample_count += 1
+        self.brake_sum += brake_intensity
+        self.speed_sum += speed
+        self.max_speed = max(self.max_speed, speed)
+
+        if not self.geometric_events:
+            # Heatmap (hard braking positions)
+            if brake_intensity > self.HARD_BRAKE_THRESHOLD:
+                self._count_heatmap_cell(position_x, position_y)
+
+            # Near miss: hard brake after the previous sample was fast
+            if (self.prev_speed is not None
+                    and brake_intensity > self.NEAR_MISS_BRAKE_THRESHOLD
+                    and self.prev_speed > self.NEAR_MISS_SPEED_THRESHOLD):
+                self.near_miss_count += 1
+
+        if self._near_hazard(position_x, position_y):
+            self.exposure_count += 1
+
+        if self.prev_steering is not None:
+            self.steering_change_sum += abs(steering_angle - self.prev_steering)
+
+        self.prev_speed = speed
+        self.prev_steering = steering_angle
+
+    def add_event(self, position_x: float, position_y: float, event_type: str) -> None:
+        """Feed one CollisionDetector event (geometric_events mode)"""
+        self._count_heatmap_cell(position_x, position_y)
+        if event_type == "collision":
+            self.collision_count += 1
+        else:
+            self.near_miss_count += 1
+
+    def _count_heatmap_cell(self, position_x: float, position_y: float) -> None:
+        key = base_cell(position_x, position_y)
+        self.heatmap_counts[key] = self.heatmap_counts.get(key, 0) + 1
+
+    @property
+    def avg_speed(self) -> float:
+        return self.speed_sum / self.sample_count if self.sample_count else 0.0
+
+    def result(self) -> Dict:
+        """
+        Current safety analytics
+        Returns kwargs suitable for constructing a SafetyRisk row
+        """
+        n = self.sample_count
+        hazard_exposure = 0.0
+        if self.hazards and n:
+            hazard_exposure = min(100.0, (self.exposure_count / n) * 200)
+
+        score = 100.0
+        if n:
+            score -= self.near_miss_count * 5.0
+            score -= self.collision_count * self.COLLISION_PENALTY
+            score -= hazard_exposure * 0.2
+            score -= (self.brake_sum / n) * 2.0
+            if n > 1:
+                score -= self.steering_change_sum / n
+            score = max(0.0, min(100.0, score))
+
+        return {
+            "collision_heatmap": build_heatmap_pyramid(self.heatmap_counts, self.extent),
+            "near_miss_count": self.near_miss_count,
+            "collision_count": self.collision_count,
+            "hazard_exposure_score": hazard_exposure,
+            "overall_safety_score": score,
+            "analyzer_version": self.VERSION
+        }
+
+    def to_state(self) -> str:
+        """Serialize accumulators so a stream can resume in another process"""
+        return json.dumps({
+            "extent": self.extent,
+            "geometric_events": self.geometric_events,
+            "hazards": self.hazards,
+            "sample_count": self.sample_count,
+            "heatmap_counts": [[x, y, c] for (x, y), c in self.heatmap_counts.items()],
+            "near_miss_count": self.near_miss_count,
+            "collision_count": self.collision_count,
+            "exposure_count": self.exposure_count,
+            "brake_sum": self.brake_sum,
+            "speed_sum": self.speed_sum,
+            "max_speed": self.max_speed,
+            "steering_change_sum": self.steering_change_sum,
+            "prev_speed": self.prev_speed,
+            "prev_steering": self.prev_steering
+        })
+
+    @classmethod
+    def from_state(cls, raw: str) -> "StreamingSafetyAnalyzer":
+        state = json.loads(raw)
+        analyzer = cls(
+            hazards=state["hazards"],
+            extent=state.get("extent"),
+            geometric_events=state.get("geometric_events", False)
+        )
+        analyzer.sample_count = state["sample_count"]
+        analyzer.heatmap_counts = {(x, y): c for x, y, c in state["heatmap_counts"]}
+        analyzer.near_miss_count = state["near_miss_count"]
+        analyzer.collision_count = state.get("collision_count", 0)
+        analyzer.exposure_count = state["exposure_count"]
+        analyzer.brake_sum = state["brake_sum"]
+        analyzer.speed_sum = state["speed_sum"]
+        analyzer.max_speed = state["max_speed"]
+        analyzer.steering_change_sum = state["steering_change_sum"]
+        analyzer.prev_speed = state["prev_speed"]
+        analyzer.prev_steering = state["prev_steering"]
+        return analyzer
+
+
+# ============ PER-JOB STREAM STATE (Redis) ============
+
+STREAM_KEY_PREFIX = "safety_stream:"
+STREAM_TTL_SECONDS = 24 * 3600  # Abandoned streams expire after a day
+
+
+def feed_job_stream(
+    redis_client,
+    job_id: str,
+    sample: Dict,
+    new_analyzer: Callable[[], StreamingSafetyAnalyzer]
+) -> None:
+    """
+    Add one sample to the job's stream stored in Redis.
+    new_analyzer() creates the stream on the first sample.
+    Uses WATCH/MULTI so concurrent ingestion requests don't lose updates.
+    """
+    key = f"{STREAM_KEY_PREFIX}{job_id}"
+
+    def _update(pipe):
+        raw = pipe.get(key)
+        analyzer = StreamingSafetyAnalyzer.from_state(raw) if raw else new_analyzer()
+        analyzer.add_sample(
+            sample["position_x"],
+            sample["position_y"],
+            sample["speed"],
+            sample["brake_intensity"],
+            sample["steering_angle"]
+        )
+        pipe.multi()
+        pipe.set(key, analyzer.to_state(), ex=STREAM_TTL_SECONDS)
+
+    redis_client.transaction(_update, key)
+
+
+def pop_job_stream(redis_client, job_id: str) -> Optional[StreamingSafetyAnalyzer]:
+    """Remove and return the job's stream, or None if nothing was ingested"""
+    key = f"{STREAM_KEY_PREFIX}{job_id}"
+    pipe = redis_client.pipeline()
+    pipe.get(key)
+    pipe.delete(key)
+    raw, _ = pipe.execute()
+    return StreamingSafetyAnalyzer.from_state(raw) if raw else None
+
+
+def job_stream_exists(redis_client, job_id: str) -> bool:
+    """Whether the job already has a stream (lets async callers load scenario data only once)"""
+    return bool(redis_client.exists(f"{STREAM_KEY_PREFIX}{job_id}"))
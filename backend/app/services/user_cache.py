@@ -0,0 +1,102 @@
+from typing import Dict, Optional
+from uuid import UUID
+import json
+import logging
+import time
+
+import redis
+
+from app.core.security import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.models.user import User
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_PREFIX = "user_cache:"
+USER_CACHE_TTL_SECONDS = 60  # Bounds how long a change made outside invalidate_user() can go unseen
+
+
+def _token_key(jti: str) -> str:
+    return f"{USER_CACHE_PREFIX}token:{jti}"
+
+
+def _user_tokens_key(user_id) -> str:
+    """Set of the token keys cached for one user, so they can all be dropped"""
+    return f"{USER_CACHE_PREFIX}user:{user_id}"
+
+
+def _generation_key(email: str) -> str:
+    """Counter bumped on every invalidation (keyed by email: tokens are looked up by it)"""
+    return f"{USER_CACHE_PREFIX}generation:{email}"
+
+
+def cached_user(jti: str) -> Optional[User]:
+    """
+    User resolved earlier for this token id, or None on a miss.
+    The returned User is detached and carries no password hash.
+    """
+    try:
+        raw = get_redis().get(_token_key(jti))
+    except redis.RedisError as e:
+        logger.warning(f"User cache read failed: {e}")
+        return None
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    return User(id=UUID(data["id"]), email=data["email"], is_active=data["is_active"])
+
+
+def user_generation(email: str) -> Optional[int]:
+    """
+    The user's cache generation, bumped by invalidate_user(). Read it before
+    loading the user and pass it to cache_user(). None if Redis is unreachable.
+    """
+    try:
+        return int(get_redis().get(_generation_key(email)) or 0)
+    except redis.RedisError as e:
+        logger.warning(f"User cache read failed: {e}")
+        return None
+
+
+def cache_user(jti: str, user: User, generation: Optional[int], expires_at: Optional[int] = None) -> None:
+    """
+    Remember an active user for its token, never past the token's expiry.
+    Skipped if the user was invalidated after `generation` was read, so a
+    request that loaded the user just before a deactivation can't cache it.
+    """
+    ttl = USER_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        ttl = min(ttl, int(expires_at - time.time()))
+    if ttl <= 0 or not user.is_active or generation is None:
+        return
+
+    data: Dict = {"id": str(user.id), "email": user.email, "is_active": user.is_active}
+    generation_key = _generation_key(user.email)
+
+    def _write(pipe):
+        if int(pipe.get(generation_key) or 0) != generation:
+            return
+        pipe.multi()
+        pipe.set(_token_key(jti), json.dumps(data), ex=ttl)
+        pipe.sadd(_user_tokens_key(user.id), _token_key(jti))
+        pipe.expire(_user_tokens_key(user.id), ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+    try:
+        get_redis().transaction(_write, generation_key)
+    except redis.RedisError as e:
+        logger.warning(f"User cache write failed: {e}")
+
+
+def invalidate_user(user: User) -> None:
+    """Drop every cached token of a user (call after deactivating or changing it)"""
+    redis_client = get_redis()
+    try:
+        # Bump the generation first so in-flight cache_user() calls are refused
+        pipe = redis_client.pipeline()
+        pipe.incr(_generation_key(user.email))
+        pipe.expire(_generation_key(user.email), ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        pipe.execute()
+        keys = redis_client.smembers(_user_tokens_key(user.id))
+        redis_client.delete(_user_tokens_key(user.id), *keys)
+    except redis.RedisError as e:
+        logger.warning(f"User cache invalidation failed for {user.id}: {e}")
@@ -0,0 +1,178 @@
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from app.services.safety_analyzer import SafetyAnalyzer
+from app.services.heatmap_pyramid import BASE_CELL_SIZE, Extent, build_heatmap_pyramid, count_base_cells
+
+
+# Column order expected by VectorizedSafetyAnalyzer.columns_from_rows
+TELEMETRY_COLUMNS = ("position_x", "position_y", "speed", "brake_intensity", "steering_angle")
+
+
+class VectorizedSafetyAnalyzer(SafetyAnalyzer):
+    """
+    Column-oriented variant of SafetyAnalyzer.
+
+    Takes telemetry as NumPy arrays (one per column) instead of ORM objects,
+    so every metric is a handful of array operations rather than a Python loop.
+    Results are identical to SafetyAnalyzer for the same sample order.
+    The column metrics (column_*) take arrays, so they are named apart from
+    the row-based SafetyAnalyzer methods, which keep working on this class.
+    """
+
+    # Samples processed per block in the hazard distance query (bounds memory)
+    HAZARD_CHUNK_SIZE = 65536
+
+    # Rows converted to an array at a time in columns_from_rows
+    ROW_CHUNK_SIZE = 50000
+
+    @classmethod
+    def columns_from_rows(cls, rows: Iterable[Sequence[float]]) -> Dict[str, np.ndarray]:
+        """
+        Build column arrays from (x, y, speed, brake, steering) tuples,
+        e.g. the result of db.query(*[getattr(Telemetry, c) for c in TELEMETRY_COLUMNS]).
+        Rows are consumed in chunks, so a streamed query (yield_per) never
+        holds more than one chunk as Python tuples.
+        """
+        rows = iter(rows)
+        chunks = []
+        while True:
+            chunk = list(islice(rows, cls.ROW_CHUNK_SIZE))
+            if not chunk:
+                break
+            chunks.append(np.asarray(chunk, dtype=np.float64).reshape(-1, len(TELEMETRY_COLUMNS)))
+        data = np.concatenate(chunks) if chunks else np.empty((0, len(TELEMETRY_COLUMNS)))
+        return {name: data[:, i] for i, name in enumerate(TELEMETRY_COLUMNS)}
+
+    def column_collision_heatmap(
+        self,
+        position_x: np.ndarray,
+        position_y: np.ndarray,
+        brake_intensity: np.ndarray,
+        extent: Optional[Extent] = None
+    ) -> Dict:
+        """
+        Generate collision heatmap as a 2D histogram of hard-braking positions
+        over the finest pyramid cells
+        """
+        hard = brake_intensity > self.HARD_BRAKE_THRESHOLD
+        cells = np.stack([
+            np.floor(position_x[hard] / BASE_CELL_SIZE),
+            np.floor(position_y[hard] / BASE_CELL_SIZE)
+        ], axis=1).astype(np.int64)
+
+        base_counts = {}
+        if len(cells):
+            unique_cells, counts = np.unique(cells, axis=0, return_counts=True)
+            base_counts = {
+                (int(cx), int(cy)): int(c) for (cx, cy), c in zip(unique_cells, counts)
+            }
+        return build_heatmap_pyramid(base_counts, extent)
+
+    def column_near_misses(self, speed: np.ndarray, brake_intensity: np.ndarray) -> int:
+        """
+        Detect near misses with shifted-array masks: hard brake at sample i
+        while the previous sample was above the speed threshold
+        """
+        if len(speed) < 2:
+            return 0
+        mask = (
+            (brake_intensity[1:] > self.NEAR_MISS_BRAKE_THRESHOLD) &
+            (speed[:-1] > self.NEAR_MISS_SPEED_THRESHOLD)
+        )
+        return int(np.count_nonzero(mask))
+
+    def column_hazard_exposure(
+        self,
+        position_x: np.ndarray,
+        position_y: np.ndarray,
+        hazards: List[Dict]
+    ) -> float:
+        """
+        Calculate time spent near hazards (0-100) with a blocked
+        samples x hazards squared-distance query
+        """
+        n = len(position_x)
+        if not hazards or n == 0:
+            return 0.0
+
+        hazard_x = np.array([h["x"] for h in hazards], dtype=np.float64)
+        hazard_y = np.array([h["y"] for h in hazards], dtype=np.float64)
+        radius_sq = self.DANGER_RADIUS * self.DANGER_RADIUS
+
+        exposure_count = 0
+        for start in range(0, n, self.HAZARD_CHUNK_SIZE):
+            xs = position_x[start:start + self.HAZARD_CHUNK_SIZE, None]
+            ys = position_y[start:start + self.HAZARD_CHUNK_SIZE, None]
+            dist_sq = (xs - hazard_x) ** 2 + (ys - hazard_y) ** 2
+            exposure_count += int(np.count_nonzero((dist_sq < radius_sq).any(axis=1)))
+
+        exposure_ratio = exposure_count / n
+        return min(100.0, exposure_ratio * 200)
+
+    def column_safety_score(
+        self,
+        brake_intensity: np.ndarray,
+        steering_angle: np.ndarray,
+        near_miss_count: int,
+        hazard_exposure: float,
+        collision_count: int = 0
+    ) -> float:
+        """
+        Compute overall safety score (0-100, higher is safer)
+        """
+        n = len(brake_intensity)
+        if n == 0:
+            return 100.0
+
+        score = 100.0
+        score -= near_miss_count * 5.0
+        score -= collision_count * self.COLLISION_PENALTY
+        score -= hazard_exposure * 0.2
+        score -= float(brake_intensity.mean()) * 2.0
+
+        if n > 1:
+            score -= float(np.abs(np.diff(steering_angle)).sum()) / n
+
+        return max(0.0, min(100.0, score))
+
+    def analyze(
+        self,
+        columns: Dict[str, np.ndarray],
+        hazards: Optional[List[Dict]] = None,
+        extent: Optional[Extent] = None,
+        events: Optional[Sequence[Tuple[float, float, str]]] = None
+    ) -> Dict:
+        """
+        Run every metric over a set of telemetry columns
+        events: (x, y, event_type) CollisionDetector events; when given, the
+        heatmap, near misses and collisions come from them (AI simulations)
+        Returns kwargs suitable for constructing a SafetyRisk row
+        """
+        collisions = 0
+        if events is None:
+            collision_heatmap = self.column_collision_heatmap(
+                columns["position_x"], columns["position_y"], columns["brake_intensity"], extent
+            )
+            near_misses = self.column_near_misses(columns["speed"], columns["brake_intensity"])
+        else:
+            collision_heatmap = build_heatmap_pyramid(
+                count_base_cells((x, y) for x, y, _ in events), extent
+            )
+            collisions = sum(1 for _, _, event_type in events if event_type == "collision")
+            near_misses = len(events) - collisions
+        hazard_exposure = self.column_hazard_exposure(
+            columns["position_x"], columns["position_y"], hazards or []
+        )
+        safety_score = self.column_safety_score(
+            columns["brake_intensity"], columns["steering_angle"], near_misses, hazard_exposure, collisions
+        )
+        return {
+            "collision_heatmap": collision_heatmap,
+            "near_miss_count": near_misses,
+            "collision_count": collisions,
+            "hazard_exposure_score": hazard_exposure,
+            "overall_safety_score": safety_score,
+            "analyzer_version": self.VERSION
+        }
@@ -0,0 +1,43 @@
+from app.celery_app import PRIORITY_LOW, celery_app
+from app.database import SessionLocal
+from app.services.reanalysis import select_stale_jobs, compute_safety_risk, store_safety_risks
+
+REANALYSIS_BATCH_SIZE = 50  # jobs per batch task / per bulk upsert
+
+
+@celery_app.task
+def reanalyze_safety_risks(job_ids: list = None, scenario_id: str = None, force: bool = False):
+    """
+    Celery task that recomputes stale SafetyRisk rows.
+    Fans out one batch task per REANALYSIS_BATCH_SIZE jobs so the batches run
+    in parallel across worker processes.
+    """
+    db = SessionLocal()
+    try:
+        stale = select_stale_jobs(db, job_ids=job_ids, scenario_id=scenario_id, force=force)
+    finally:
+        db.close()
+    
+    batches = [
+        [str(job_id) for job_id in stale[i:i + REANALYSIS_BATCH_SIZE]]
+        for i in range(0, len(stale), REANALYSIS_BATCH_SIZE)
+    ]
+    for batch in batches:
+        reanalyze_safety_batch.delay(batch)
+    
+    return {"status": "dispatched", "jobs": len(stale), "batches": len(batches)}
+
+
+# Background bulk work; the upsert is idempotent, so a redelivered batch is harmless
+@celery_app.task(acks_late=True, priority=PRIORITY_LOW)
+def reanalyze_safety_batch(job_ids: list):
+    """Recompute and bulk-upsert SafetyRisk rows for one batch of jobs"""
+    results = [compute_safety_risk(job_id) for job_id in job_ids]
+    
+    db = SessionLocal()
+    try:
+        stored = store_safety_risks(db, results)
+    finally:
+        db.close()
+    
+    return {"status": "completed", "jobs": stored}
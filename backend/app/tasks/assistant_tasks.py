@@ -0,0 +1,49 @@
+from app.celery_app import celery_app
+from app.database import SessionLocal
+from app.models.assistant import Conversation
+from app.services.conversations import messages_to_summarize, recent_messages, summary_prompt
+from app.services.llm_gateway import LLMUnavailable, complete
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
+def summarize_conversation(self, conversation_id: str):
+    """
+    Celery task: fold the messages that left a conversation's prompt window
+    into its rolling summary. Dispatched by the chat endpoints once a full
+    batch has accumulated; duplicate dispatches find nothing left to do.
+    A backlog is folded in oldest first, one batch per run.
+    """
+    db = SessionLocal()
+    try:
+        # The row lock serializes concurrent runs for the same conversation
+        conversation = db.query(Conversation).filter(
+            Conversation.id == conversation_id
+        ).with_for_update().first()
+        if not conversation:
+            return {"status": "skipped", "conversation_id": conversation_id}
+
+        messages = messages_to_summarize(db, conversation)
+        if not messages:
+            db.rollback()
+            return {"status": "skipped", "conversation_id": conversation_id}
+
+        try:
+            summary = complete(summary_prompt(conversation.summary, messages), max_tokens=300, temperature=0.3)
+        except LLMUnavailable:
+            db.rollback()
+            return {"status": "skipped", "conversation_id": conversation_id}
+        except Exception as e:
+            db.rollback()
+            raise self.retry(exc=e)
+
+        conversation.summary = summary
+        conversation.summarized_until = messages[-1].created_at
+        conversation.summarized_count = (conversation.summarized_count or 0) + len(messages)
+        db.commit()
+
+        # Still a full batch behind (e.g. after an outage): keep draining
+        if recent_messages(db, conversation)[1]:
+            summarize_conversation.delay(conversation_id)
+        return {"status": "completed", "conversation_id": conversation_id, "summarized": len(messages)}
+    finally:
+        db.close()
@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+import logging
+import time
+
+from app.celery_app import PRIORITY_LOW, celery_app
+from app.database import SessionLocal
+from app.models.driving_stats import DrivingStats
+from app.models.scenario import Scenario
+from app.services.driving_feedback import (
+    FEEDBACK_BATCH_CONCURRENCY, FEEDBACK_BATCH_TIME_LIMIT_SECONDS, FEEDBACK_MAX_ATTEMPTS, FEEDBACK_MAX_TOKENS,
+    FEEDBACK_TEMPERATURE, FEEDBACK_WRITE_BATCH, RateLimitGate, feedback_messages, rate_limit_delay
+)
+from app.services.llm_gateway import LLMBusy, LLMUnavailable, complete
+
+logger = logging.getLogger(__name__)
+
+
+def _select_sessions(db, scenario_id: str = None, job_ids: list = None, regenerate: bool = False):
+    """Sessions needing feedback, with only the columns the prompt uses"""
+    query = db.query(
+        DrivingStats.id,
+        DrivingStats.job_id,
+        DrivingStats.session_number,
+        DrivingStats.off_road_count,
+        DrivingStats.red_light_violations,
+        DrivingStats.yellow_light_violations,
+        DrivingStats.duration_seconds,
+        DrivingStats.max_speed,
+        DrivingStats.avg_speed,
+        DrivingStats.distance_traveled,
+        DrivingStats.turn_smoothness_score,
+        Scenario.name.label("scenario_name"),
+    ).outerjoin(Scenario, Scenario.id == DrivingStats.scenario_id)
+    if scenario_id:
+        query = query.filter(DrivingStats.scenario_id == scenario_id)
+    if job_ids:
+        query = query.filter(DrivingStats.job_id.in_(job_ids))
+    if not regenerate:
+        query = query.filter(DrivingStats.ai_feedback.is_(None))
+    return query.order_by(DrivingStats.session_number).all()
+
+
+def _generate(session, gate: RateLimitGate, regenerate: bool) -> str:
+    messages = feedback_messages(session, session.scenario_name or "Unknown Scenario")
+    for attempt in range(FEEDBACK_MAX_ATTEMPTS):
+        gate.wait()
+        try:
+            return complete(
+                messages, max_tokens=FEEDBACK_MAX_TOKENS, temperature=FEEDBACK_TEMPERATURE, cache=not regenerate
+            )
+        except LLMUnavailable:
+            raise
+        except LLMBusy:
+            # Other tasks on this worker hold every slot; the wait was the backoff
+            if attempt == FEEDBACK_MAX_ATTEMPTS - 1:
+                raise
+            continue
+        except Exception as e:
+            delay = rate_limit_delay(e, attempt)
+            if not delay or attempt == FEEDBACK_MAX_ATTEMPTS - 1:
+                raise
+            logger.warning(f"Feedback rate limited, pausing the batch for {delay:.1f}s")
+            gate.pause(delay)
+
+
+# Long and resumable (finished sessions are skipped), so acknowledged only when done.
+# Celery time limits are not enforced on the threads pool the llm queue runs
+# on, so the task keeps its own deadline (FEEDBACK_BATCH_TIME_LIMIT_SECONDS).
+@celery_app.task(bind=True, acks_late=True, priority=PRIORITY_LOW)
+def generate_feedback_batch(self, scenario_id: str = None, job_ids: list = None, regenerate: bool = False):
+    """
+    Celery task: AI feedback for many driving sessions (a scenario's, a list
+    of jobs', or both combined). Sessions that already have feedback are
+    skipped unless regenerate. Up to FEEDBACK_BATCH_CONCURRENCY prompts are in
+    flight; results are written back FEEDBACK_WRITE_BATCH rows at a time, and
+    progress is reported as task state PROGRESS with meta
+    {total, completed, failed}. A batch still running after
+    FEEDBACK_BATCH_TIME_LIMIT_SECONDS keeps what it has and returns
+    status "timed_out"; running it again resumes with the rest.
+    """
+    deadline = time.monotonic() + FEEDBACK_BATCH_TIME_LIMIT_SECONDS
+    db = SessionLocal()
+    try:
+        sessions = _select_sessions(db, scenario_id, job_ids, regenerate)
+        total = len(sessions)
+        completed = failed = 0
+        pending = []
+
+        def flush():
+            nonlocal completed
+            if pending:
+                db.bulk_update_mappings(DrivingStats, pending)
+                db.commit()
+                completed += len(pending)
+                pending.clear()
+            self.update_state(state="PROGRESS", meta={"total": total, "completed": completed, "failed": failed})
+
+        flush()
+        gate = RateLimitGate()
+        pool = ThreadPoolExecutor(max_workers=FEEDBACK_BATCH_CONCURRENCY)
+        futures = {pool.submit(_generate, session, gate, regenerate): session for session in sessions}
+        try:
+            for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+                session = futures[future]
+                try:
+                    pending.append({"id": session.id, "ai_feedback": future.result()})
+                except LLMUnavailable:
+                    raise
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Feedback generation failed for job {session.job_id}: {e}")
+                if len(pending) >= FEEDBACK_WRITE_BATCH:
+                    flush()
+        except LLMUnavailable:
+            flush()
+            return {"status": "skipped", "total": total, "completed": completed, "failed": failed}
+        except FuturesTimeout:
+            logger.warning(f"Feedback batch hit its {FEEDBACK_BATCH_TIME_LIMIT_SECONDS}s limit, stopping")
+            flush()
+            return {"status": "timed_out", "total": total, "completed": completed, "failed": failed}
+        finally:
+            # Drop queued sessions and don't wait for stuck requests; their results are discarded
+            pool.shutdown(wait=False, cancel_futures=True)
+        flush()
+
+        return {"status": "completed", "total": total, "completed": completed, "failed": failed}
+    finally:
+        db.close()
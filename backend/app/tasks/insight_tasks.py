@@ -0,0 +1,59 @@
+from app.celery_app import PRIORITY_HIGH, celery_app
+from app.database import SessionLocal
+from app.models.assistant import AssistantMessage, MessageRole, ContextType
+from app.services.job_context import format_context, job_context
+from app.services.llm_gateway import LLMUnavailable, complete
+from app.services.response_cache import insights_key, invalidate
+
+
+# Ahead of bulk feedback: results pages show insights right after completion
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=30, priority=PRIORITY_HIGH)
+def generate_job_insights(self, job_id: str, metrics: dict = None):
+    """
+    Celery task: AI insights for a completed simulation job.
+    Dispatched after the job is marked COMPLETED, so the simulation worker
+    never waits on the OpenAI round trip. The prompt is the job's cached
+    context summary (metrics, sent by older versions, is ignored).
+    """
+    db = SessionLocal()
+    try:
+        summary = job_context(db, job_id)
+    finally:
+        db.close()
+    if summary is None:
+        return {"status": "skipped", "job_id": job_id}
+    
+    prompt = f"""Analyze this autonomous driving simulation:
+
+{format_context(summary)}
+
+Provide a concise analysis of the simulation performance and safety."""
+
+    try:
+        insight_content = complete(
+            [
+                {"role": "system", "content": "You are an autonomous driving safety analyst."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=300,
+            temperature=1.0
+        )
+    except LLMUnavailable:
+        return {"status": "skipped", "job_id": job_id}
+    except Exception as e:
+        raise self.retry(exc=e)
+    
+    db = SessionLocal()
+    try:
+        db.add(AssistantMessage(
+            job_id=job_id,
+            role=MessageRole.ASSISTANT,
+            content=insight_content,
+            context_type=ContextType.TELEMETRY_ANALYSIS
+        ))
+        db.commit()
+    finally:
+        db.close()
+    invalidate([insights_key(job_id)])
+    
+    return {"status": "completed", "job_id": job_id}
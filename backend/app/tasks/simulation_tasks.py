@@ -3,33 +3,67 @@ from app.database import SessionLocal
 from app.models.job import Job, JobStatus
 from app.models.telemetry import Telemetry
 from app.models.safety_risk import SafetyRisk
-from app.models.assistant import AssistantMessage, MessageRole, ContextType
+from app.models.safety_event import SafetyEvent
 from app.services.ai_driver import AIDriver
-from app.services.safety_analyzer import SafetyAnalyzer
+from app.services.streaming_safety_analyzer import StreamingSafetyAnalyzer
+from app.services.collision_detector import CollisionDetector
+from app.services.heatmap_pyramid import scenario_extent
+from app.services.scenario_analytics import apply_safety_risk
+from app.services.job_counters import record_status_change
+from app.services.job_events import PROGRESS_STEP, job_event, publish_job_event
+from app.services.job_context import cached_job_context, store_job_context, summarize_job
+from app.services.scenario_snapshots import load_snapshot
+from app.tasks.insight_tasks import generate_job_insights
 from datetime import datetime
 import time
 import random
 
-@celery_app.task(bind=True)
-def run_ai_simulation(self, job_id: str, scenario_data: dict):
+def _discard_partial_run(db, job: Job) -> None:
+    """Remove what an interrupted run of this job stored, so a redelivered run starts clean"""
+    db.query(Telemetry).filter(Telemetry.job_id == job.id).delete()
+    db.query(SafetyEvent).filter(SafetyEvent.job_id == job.id).delete()
+    safety_risk = db.query(SafetyRisk).filter(SafetyRisk.job_id == job.id).first()
+    if safety_risk:
+        apply_safety_risk(db, job.scenario_id, safety_risk, job.duration_seconds, weight=-1)
+        db.delete(safety_risk)
+
+# Acknowledged only once finished: if the worker dies mid-run the job is redelivered
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def run_ai_simulation(self, job_id: str, snapshot_hash: str):
     """
     Celery task to run AI simulation
+    snapshot_hash: ScenarioSnapshot to run on (messages queued by older
+    versions carry the scenario dict itself, which is still accepted)
     """
     db = SessionLocal()
     
     try:
+        if isinstance(snapshot_hash, dict):
+            scenario_data = snapshot_hash
+        else:
+            scenario_data = load_snapshot(db, snapshot_hash)
+            if scenario_data is None:
+                raise ValueError(f"Scenario snapshot {snapshot_hash} not found")
+        
         # Update job status to running
         job = db.query(Job).filter(Job.id == job_id).first()
         if not job:
             return {"status": "error", "message": "Job not found"}
+        if job.status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            return {"status": "skipped", "job_id": job_id}
+        if job.status == JobStatus.RUNNING:
+            _discard_partial_run(db, job)
         
+        previous_status = job.status
+        record_status_change(db, previous_status, JobStatus.RUNNING)
         job.status = JobStatus.RUNNING
         job.celery_task_id = self.request.id
         db.commit()
+        publish_job_event(job_event(job, previous_status, progress=0))
         
         # Initialize AI vehicles
         vehicle_count = job.vehicle_count
-        ai_vehicles = [AIDriver(i, scenario_data) for i in range(vehicle_count)]
+        ai_vehicles = [AIDriver(i, scenario_data, vehicle_count) for i in range(vehicle_count)]
         
         # Initialize pedestrians (simplified)
         crosswalks = scenario_data.get("crosswalks", [])
@@ -50,18 +84,37 @@ def run_ai_simulation(self, job_id: str, scenario_data: dict):
         duration_seconds = job.duration_seconds
         dt = 0.1  # 100ms time step
         simulation_time = 0
-        telemetry_data = []
         
+        # Safety analytics accumulate as samples are produced (no read-back);
+        # near misses and the heatmap come from geometric detection events
+        hazards = scenario_data.get("hazards", [])
+        analyzer = StreamingSafetyAnalyzer(
+            hazards, extent=scenario_extent(scenario_data), geometric_events=True
+        )
+        detector = CollisionDetector()
+        safety_events = []
+        
+        def record_events(events):
+            for event in events:
+                analyzer.add_event(event["position_x"], event["position_y"], event["event_type"])
+                safety_events.append(dict(event, job_id=job_id))
+        
+        published_progress = 0
+        vehicle_states = []
         while simulation_time < duration_seconds:
-            # Update all AI vehicles
+            # Update all AI vehicles (each sees the others' states from the previous tick)
+            previous_states = vehicle_states
+            vehicle_states = []
             for vehicle in ai_vehicles:
-                state = vehicle.update(dt, traffic_lights, pedestrians)
+                state = vehicle.update(dt, traffic_lights, pedestrians, previous_states)
+                vehicle_states.append(state)
                 
                 # Store telemetry  (sample every 500ms)
                 if int(simulation_time * 10) % 5 == 0:
                     telemetry_entry = Telemetry(
                         job_id=job_id,
                         timestamp=int(simulation_time * 1000),
+                        vehicle_id=state["vehicle_id"],
                         speed=state["speed"],
                         acceleration=random.uniform(-1, 1),
                         brake_intensity=random.uniform(0, 3),
@@ -70,7 +123,18 @@ def run_ai_simulation(self, job_id: str, scenario_data: dict):
                         position_y=state["y"]
                     )
                     db.add(telemetry_entry)
-                    telemetry_data.append(telemetry_entry)
+                    analyzer.add_sample(
+                        telemetry_entry.position_x,
+                        telemetry_entry.position_y,
+                        telemetry_entry.speed,
+                        telemetry_entry.brake_intensity,
+                        telemetry_entry.steering_angle
+                    )
+            
+            # Pairwise TTC / minimum-distance detection for this tick
+            record_events(detector.step(
+                int(simulation_time * 1000), vehicle_states, pedestrians, hazards
+            ))
             
             # Update traffic lights (red → green → yellow → red)
             cycle_pos = simulation_time % 6.5  # 3 + 3 + 0.5
@@ -86,106 +150,68 @@ def run_ai_simulation(self, job_id: str, scenario_data: dict):
             time.sleep(dt)  # Real-time simulation
             
             # Commit telemetry periodically
-            if len(telemetry_data) % 50 == 0:
+            if analyzer.sample_count % 50 == 0:
                 db.commit()
+            
+            progress = min(99, int(simulation_time / duration_seconds * 100))
+            if progress >= published_progress + PROGRESS_STEP:
+                published_progress = progress
+                publish_job_event(job_event(job, JobStatus.RUNNING, progress=progress))
+        
+        # Close encounters still open at the end and store all events
+        record_events(detector.flush())
+        db.bulk_insert_mappings(SafetyEvent, safety_events)
         
         # Final commit
         db.commit()
         
-        # Compute safety analytics
-        analyzer = SafetyAnalyzer()
-        telemetry_list = db.query(Telemetry).filter(Telemetry.job_id == job_id).all()
-        
-        collision_heatmap = analyzer.compute_collision_heatmap(telemetry_list)
-        near_misses = analyzer.detect_near_misses(telemetry_list)
-        hazard_exposure = analyzer.calculate_hazard_exposure(
-            telemetry_list, 
-            scenario_data.get("hazards", [])
-        )
-        safety_score = analyzer.compute_overall_safety_score(
-            telemetry_list,
-            near_misses,
-            hazard_exposure
-        )
+        # Safety analytics are already complete
+        analytics = analyzer.result()
+        safety_score = analytics["overall_safety_score"]
         
         # Store safety risk
-        safety_risk = SafetyRisk(
-            job_id=job_id,
-            collision_heatmap=collision_heatmap,
-            near_miss_count=near_misses,
-            hazard_exposure_score=hazard_exposure,
-            overall_safety_score=safety_score
-        )
+        safety_risk = SafetyRisk(job_id=job_id, **analytics)
         db.add(safety_risk)
-        db.commit()
         
-        # Generate AI insights (if OpenAI available)
-        try:
-            import os
-            from openai import OpenAI
-            
-            api_key = os.getenv("OPENAI_API_KEY")
-            if api_key:
-                client = OpenAI(api_key=api_key)
-                
-                avg_speed = sum(t.speed for t in telemetry_list) / len(telemetry_list)
-                max_speed = max(t.speed for t in telemetry_list)
-                
-                prompt = f"""Analyze this autonomous driving simulation:
-                
-Simulation Parameters:
-- Duration: {duration_seconds} seconds
-- Vehicle Count: {vehicle_count}
-- Weather: {scenario_data.get('weather', 'clear')}
-
-Performance Metrics:
-- Average Speed: {avg_speed:.1f} m/s
-- Max Speed: {max_speed:.1f} m/s
-- Near Misses: {near_misses}
-- Safety Score: {safety_score:.1f}/100
-
-Provide a concise analysis of the simulation performance and safety."""
-
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "You are an autonomous driving safety analyst."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=300
-                )
-                
-                insight_content = response.choices[0].message.content
-                
-                insight = AssistantMessage(
-                    job_id=job_id,
-                    role=MessageRole.ASSISTANT,
-                    content=insight_content,
-                    context_type=ContextType.TELEMETRY_ANALYSIS
-                )
-                db.add(insight)
-                db.commit()
-        except Exception as e:
-            print(f"Failed to generate AI insights: {e}")
+        # Merge into the scenario-level aggregates
+        apply_safety_risk(db, job.scenario_id, safety_risk, duration_seconds)
+        db.commit()
         
         # Mark job as completed
+        previous_status = job.status
+        record_status_change(db, previous_status, JobStatus.COMPLETED)
         job.status = JobStatus.COMPLETED
         job.completed_at = datetime.utcnow()
         db.commit()
+        publish_job_event(job_event(job, previous_status, progress=100))
+        
+        # Summarize once for the insight prompt and every assistant chat turn
+        _, generation = cached_job_context(job_id)
+        store_job_context(job_id, summarize_job(db, job), generation)
+        
+        # AI insights arrive independently, from the I/O queue
+        try:
+            generate_job_insights.delay(job_id)
+        except Exception as e:
+            print(f"Failed to dispatch AI insights: {e}")
         
         return {
             "status": "completed",
             "job_id": job_id,
-            "telemetry_points": len(telemetry_list),
+            "telemetry_points": analyzer.sample_count,
             "safety_score": safety_score
         }
         
     except Exception as e:
         # Mark job as failed
+        db.rollback()
         job = db.query(Job).filter(Job.id == job_id).first()
         if job:
+            previous_status = job.status
+            record_status_change(db, previous_status, JobStatus.FAILED)
             job.status = JobStatus.FAILED
             db.commit()
+            publish_job_event(job_event(job, previous_status))
         
         return {"status": "failed", "error": str(e)}
     
@@ -0,0 +1,133 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+The schema create_all produced at API start-up before migrations were
+introduced. Such databases are already at this revision: run
+`alembic stamp 0001` on them, then `alembic upgrade head`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENUM_TYPES = ('jobstatus', 'weathertype', 'simulationtype', 'messagerole', 'contexttype')
+
+
+def upgrade() -> None:
+    op.create_table('scenarios',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('roads', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('traffic_lights', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('stop_signs', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('crosswalks', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('hazards', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('weather', sa.Enum('CLEAR', 'RAIN', 'FOG', 'SNOW', name='weathertype'), nullable=True),
+    sa.Column('weather_intensity', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_table('jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('scenario_id', sa.UUID(), nullable=False),
+    sa.Column('simulation_type', sa.Enum('AI_SIMULATION', 'MANUAL_DRIVING', name='simulationtype'), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='jobstatus'), nullable=True),
+    sa.Column('celery_task_id', sa.String(), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.Column('vehicle_count', sa.Integer(), nullable=True),
+    sa.Column('weather', sa.String(), nullable=True),
+    sa.Column('compute_cost_estimate', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['scenario_id'], ['scenarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('assistant_messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('job_id', sa.UUID(), nullable=True),
+    sa.Column('role', sa.Enum('USER', 'ASSISTANT', name='messagerole'), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('context_type', sa.Enum('GENERAL', 'TELEMETRY_ANALYSIS', 'SAFETY_COACHING', name='contexttype'), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('driving_stats',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('job_id', sa.UUID(), nullable=False),
+    sa.Column('scenario_id', sa.UUID(), nullable=False),
+    sa.Column('session_number', sa.Integer(), nullable=False),
+    sa.Column('off_road_count', sa.Integer(), nullable=True),
+    sa.Column('red_light_violations', sa.Integer(), nullable=True),
+    sa.Column('yellow_light_violations', sa.Integer(), nullable=True),
+    sa.Column('turn_smoothness_score', sa.Float(), nullable=True),
+    sa.Column('duration_seconds', sa.Float(), nullable=True),
+    sa.Column('max_speed', sa.Float(), nullable=True),
+    sa.Column('avg_speed', sa.Float(), nullable=True),
+    sa.Column('distance_traveled', sa.Float(), nullable=True),
+    sa.Column('ai_feedback', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.ForeignKeyConstraint(['scenario_id'], ['scenarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id')
+    )
+    op.create_table('safety_risks',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('job_id', sa.UUID(), nullable=False),
+    sa.Column('collision_heatmap', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('near_miss_count', sa.Integer(), nullable=True),
+    sa.Column('hazard_exposure_score', sa.Float(), nullable=True),
+    sa.Column('overall_safety_score', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id')
+    )
+    op.create_table('telemetry',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('job_id', sa.UUID(), nullable=False),
+    sa.Column('timestamp', sa.Integer(), nullable=False),
+    sa.Column('speed', sa.Float(), nullable=False),
+    sa.Column('acceleration', sa.Float(), nullable=True),
+    sa.Column('brake_intensity', sa.Float(), nullable=True),
+    sa.Column('steering_angle', sa.Float(), nullable=True),
+    sa.Column('position_x', sa.Float(), nullable=False),
+    sa.Column('position_y', sa.Float(), nullable=False),
+    sa.Column('lap_number', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('telemetry')
+    op.drop_table('safety_risks')
+    op.drop_table('driving_stats')
+    op.drop_table('assistant_messages')
+    op.drop_table('jobs')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_table('scenarios')
+    for enum_name in ENUM_TYPES:
+        op.execute(f"DROP TYPE IF EXISTS {enum_name}")
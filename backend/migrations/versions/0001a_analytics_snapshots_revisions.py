@@ -0,0 +1,144 @@
+"""Scenario snapshots, revisions and summaries; job counters and indexes; safety events and analytics
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-19 09:30:00
+
+Everything added to the models between the create_all baseline (0001) and
+Alembic, so a stamped pre-migration database is brought up to date by
+`alembic upgrade head`. Existing rows keep working: scenarios start at
+version 1 and get their summary columns when first listed, status counters
+are seeded from the jobs table on first read, and jobs without a snapshot
+are analyzed against the live scenario. Earlier jobs have no analyzer_version, so
+`python -m app.commands.reanalyze` recomputes them and merges them into
+the scenario analytics.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001a'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENUM_TYPES = ('safetyeventtype', 'actortype')
+
+
+def upgrade() -> None:
+    op.create_table('job_status_counts',
+    sa.Column('status', postgresql.ENUM('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='jobstatus', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('status')
+    )
+    op.create_table('scenario_snapshots',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+
+    op.add_column('scenarios', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('scenarios', sa.Column('road_count', sa.Integer(), nullable=True))
+    op.add_column('scenarios', sa.Column('traffic_light_count', sa.Integer(), nullable=True))
+    op.add_column('scenarios', sa.Column('stop_sign_count', sa.Integer(), nullable=True))
+    op.add_column('scenarios', sa.Column('crosswalk_count', sa.Integer(), nullable=True))
+    op.add_column('scenarios', sa.Column('hazard_count', sa.Integer(), nullable=True))
+    op.add_column('scenarios', sa.Column('bbox_min_x', sa.Float(), nullable=True))
+    op.add_column('scenarios', sa.Column('bbox_min_y', sa.Float(), nullable=True))
+    op.add_column('scenarios', sa.Column('bbox_max_x', sa.Float(), nullable=True))
+    op.add_column('scenarios', sa.Column('bbox_max_y', sa.Float(), nullable=True))
+    op.add_column('scenarios', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('scenarios', sa.Column('thumbnail', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_scenarios_content_hash'), 'scenarios', ['content_hash'], unique=False)
+
+    op.add_column('jobs', sa.Column('snapshot_hash', sa.String(length=64), nullable=True))
+    op.add_column('jobs', sa.Column('scenario_version', sa.Integer(), nullable=True))
+    op.create_foreign_key('jobs_snapshot_hash_fkey', 'jobs', 'scenario_snapshots', ['snapshot_hash'], ['content_hash'])
+    op.create_index('ix_jobs_created_at', 'jobs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_jobs_scenario_id_created_at', 'jobs', ['scenario_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_jobs_status_created_at', 'jobs', ['status', 'created_at', 'id'], unique=False)
+
+    op.add_column('safety_risks', sa.Column('collision_count', sa.Integer(), nullable=True))
+    op.add_column('safety_risks', sa.Column('analyzer_version', sa.Integer(), nullable=True))
+    op.add_column('safety_risks', sa.Column('aggregated', sa.Boolean(), nullable=True))
+
+    op.create_table('scenario_analytics',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('scenario_id', sa.UUID(), nullable=False),
+    sa.Column('job_count', sa.Integer(), nullable=True),
+    sa.Column('total_duration_seconds', sa.Float(), nullable=True),
+    sa.Column('near_miss_total', sa.Integer(), nullable=True),
+    sa.Column('collision_total', sa.Integer(), nullable=True),
+    sa.Column('score_sum', sa.Float(), nullable=True),
+    sa.Column('score_sq_sum', sa.Float(), nullable=True),
+    sa.Column('hazard_exposure_sum', sa.Float(), nullable=True),
+    sa.Column('score_histogram', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('sketches', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('heatmap_base_counts', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('collision_heatmap', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['scenario_id'], ['scenarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scenario_id')
+    )
+    op.create_table('scenario_revisions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('scenario_id', sa.UUID(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('operations', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['scenario_id'], ['scenarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scenario_id', 'version', name='uq_scenario_revisions_scenario_version')
+    )
+    op.create_table('safety_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('job_id', sa.UUID(), nullable=False),
+    sa.Column('timestamp', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.Enum('NEAR_MISS', 'COLLISION', name='safetyeventtype'), nullable=False),
+    sa.Column('vehicle_id', sa.Integer(), nullable=False),
+    sa.Column('other_type', sa.Enum('VEHICLE', 'PEDESTRIAN', 'HAZARD', name='actortype'), nullable=False),
+    sa.Column('other_id', sa.Integer(), nullable=False),
+    sa.Column('position_x', sa.Float(), nullable=False),
+    sa.Column('position_y', sa.Float(), nullable=False),
+    sa.Column('min_distance', sa.Float(), nullable=False),
+    sa.Column('time_to_collision', sa.Float(), nullable=True),
+    sa.Column('relative_speed', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_safety_events_job_id'), 'safety_events', ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_safety_events_job_id'), table_name='safety_events')
+    op.drop_table('safety_events')
+    op.drop_table('scenario_revisions')
+    op.drop_table('scenario_analytics')
+
+    op.drop_column('safety_risks', 'aggregated')
+    op.drop_column('safety_risks', 'analyzer_version')
+    op.drop_column('safety_risks', 'collision_count')
+
+    op.drop_index('ix_jobs_status_created_at', table_name='jobs')
+    op.drop_index('ix_jobs_scenario_id_created_at', table_name='jobs')
+    op.drop_index('ix_jobs_created_at', table_name='jobs')
+    op.drop_constraint('jobs_snapshot_hash_fkey', 'jobs', type_='foreignkey')
+    op.drop_column('jobs', 'scenario_version')
+    op.drop_column('jobs', 'snapshot_hash')
+
+    op.drop_index(op.f('ix_scenarios_content_hash'), table_name='scenarios')
+    for column in (
+        'thumbnail', 'content_hash', 'bbox_max_y', 'bbox_max_x', 'bbox_min_y', 'bbox_min_x',
+        'hazard_count', 'crosswalk_count', 'stop_sign_count', 'traffic_light_count', 'road_count', 'version'
+    ):
+        op.drop_column('scenarios', column)
+
+    op.drop_table('scenario_snapshots')
+    op.drop_table('job_status_counts')
+    for enum_name in ENUM_TYPES:
+        op.execute(f"DROP TYPE IF EXISTS {enum_name}")
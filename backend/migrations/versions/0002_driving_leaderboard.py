@@ -0,0 +1,36 @@
+"""Driving leaderboard: per-scenario session counter and session scores
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-19 11:00:00
+
+Existing sessions are scored when their scenario's leaderboard is first read.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('driving_leaderboards',
+    sa.Column('scenario_id', sa.UUID(), nullable=False),
+    sa.Column('session_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['scenario_id'], ['scenarios.id'], ),
+    sa.PrimaryKeyConstraint('scenario_id')
+    )
+    op.add_column('driving_stats', sa.Column('score', sa.Float(), nullable=True))
+    op.create_index('ix_driving_stats_scenario_id_score', 'driving_stats', ['scenario_id', 'score'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_driving_stats_scenario_id_score', table_name='driving_stats')
+    op.drop_column('driving_stats', 'score')
+    op.drop_table('driving_leaderboards')
@@ -0,0 +1,58 @@
+"""Assistant conversations: conversation ids, prompt-window index and rolling summaries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 14:00:00
+
+Existing messages become one conversation per job (and one for all general
+chats), which is how they were threaded before.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('conversations',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('job_id', sa.UUID(), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('summarized_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('summarized_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_conversations_job_id'), 'conversations', ['job_id'], unique=False)
+    op.add_column('assistant_messages', sa.Column('conversation_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('assistant_messages_conversation_id_fkey', 'assistant_messages', 'conversations', ['conversation_id'], ['id'])
+
+    op.execute("""
+        INSERT INTO conversations (id, job_id, summarized_count, created_at, updated_at)
+        SELECT gen_random_uuid(), job_id, 0, min(created_at), max(created_at)
+        FROM assistant_messages
+        GROUP BY job_id
+    """)
+    op.execute("""
+        UPDATE assistant_messages m
+        SET conversation_id = c.id
+        FROM conversations c
+        WHERE c.job_id IS NOT DISTINCT FROM m.job_id
+    """)
+    op.create_index('ix_assistant_messages_conversation_id_created_at', 'assistant_messages', ['conversation_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_assistant_messages_conversation_id_created_at', table_name='assistant_messages')
+    op.drop_constraint('assistant_messages_conversation_id_fkey', 'assistant_messages', type_='foreignkey')
+    op.drop_column('assistant_messages', 'conversation_id')
+    op.drop_index(op.f('ix_conversations_job_id'), table_name='conversations')
+    op.drop_table('conversations')
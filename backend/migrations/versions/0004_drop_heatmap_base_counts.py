@@ -0,0 +1,42 @@
+"""Scenario analytics: drop heatmap_base_counts
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 16:00:00
+
+The merged pyramid is now updated in place, and its finest level already
+holds the per-cell counts, so the separate copy is no longer maintained.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_column('scenario_analytics', 'heatmap_base_counts')
+
+
+def downgrade() -> None:
+    op.add_column('scenario_analytics', sa.Column('heatmap_base_counts', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    # Recover absolute cell counts from the pyramid's finest level (2 m cells)
+    op.execute("""
+        UPDATE scenario_analytics SET heatmap_base_counts = COALESCE((
+            SELECT jsonb_agg(jsonb_build_array(
+                round((collision_heatmap->>'origin_x')::numeric / 2)::int + (cell->>0)::int,
+                round((collision_heatmap->>'origin_y')::numeric / 2)::int + (cell->>1)::int,
+                (cell->>2)::int
+            ))
+            FROM jsonb_each(collision_heatmap->'levels'->(collision_heatmap->>'max_level')) AS tiles(key, cells),
+                 jsonb_array_elements(tiles.cells) AS cell
+        ), '[]'::jsonb)
+        WHERE collision_heatmap->>'format' = 'quadtree'
+    """)
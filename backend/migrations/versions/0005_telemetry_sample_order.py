@@ -0,0 +1,29 @@
+"""Telemetry: vehicle id and a per-job sample-order index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 17:00:00
+
+AI simulations store one sample per vehicle per tick, so samples sharing a
+timestamp are ordered by vehicle. Existing rows keep a NULL vehicle_id.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('telemetry', sa.Column('vehicle_id', sa.Integer(), nullable=True))
+    op.create_index('ix_telemetry_job_id_timestamp', 'telemetry', ['job_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_telemetry_job_id_timestamp', table_name='telemetry')
+    op.drop_column('telemetry', 'vehicle_id')
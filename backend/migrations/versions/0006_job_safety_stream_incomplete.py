@@ -0,0 +1,27 @@
+"""Jobs: flag jobs whose streamed safety analytics missed telemetry
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 18:00:00
+
+Set when feeding a sample to the Redis safety stream fails, so reanalysis
+picks the job up even though its SafetyRisk has the current analyzer version.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('safety_stream_incomplete', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'safety_stream_incomplete')
@@ -0,0 +1,57 @@
+import math
+
+from app.services.ai_driver import AIDriver
+from app.services.collision_detector import CollisionDetector
+
+
+def run_simulation(scenario_data, vehicle_count, duration_seconds=30.0, dt=0.1, traffic_lights=None):
+    """Drive the AI vehicles the way run_ai_simulation does and collect detector events"""
+    vehicles = [AIDriver(i, scenario_data, vehicle_count) for i in range(vehicle_count)]
+    detector = CollisionDetector()
+    events = []
+    states = []
+    simulation_time = 0.0
+    while simulation_time < duration_seconds:
+        previous_states = states
+        states = [vehicle.update(dt, traffic_lights or [], [], previous_states) for vehicle in vehicles]
+        events.extend(detector.step(int(simulation_time * 1000), states))
+        simulation_time += dt
+    events.extend(detector.flush())
+    return events
+
+
+def collisions(events):
+    return [e for e in events if e["event_type"] == "collision"]
+
+
+def test_vehicles_on_default_path_do_not_collide():
+    assert collisions(run_simulation({}, vehicle_count=4)) == []
+
+
+def test_vehicles_on_shared_road_do_not_collide():
+    road = {"points": [{"x": x, "y": y} for x, y in [(0, 0), (400, 0), (400, 400), (0, 400)]]}
+    assert collisions(run_simulation({"roads": [road]}, vehicle_count=4)) == []
+
+
+def test_vehicles_queue_behind_a_red_light():
+    road = {"points": [{"x": x, "y": y} for x, y in [(0, 0), (400, 0), (400, 400), (0, 400)]]}
+    lights = [{"x": 200, "y": 0, "state": "red"}]
+    assert collisions(run_simulation({"roads": [road]}, vehicle_count=8, traffic_lights=lights)) == []
+
+
+def test_spawns_are_spread_along_the_path():
+    vehicles = [AIDriver(i, {}, 4) for i in range(4)]
+    for a in vehicles:
+        for b in vehicles:
+            if a is not b:
+                assert math.hypot(a.position_x - b.position_x, a.position_y - b.position_y) > 100
+
+
+def test_head_on_vehicles_are_still_a_collision():
+    detector = CollisionDetector()
+    states = [
+        {"vehicle_id": 0, "x": 0.0, "y": 0.0, "heading": 0.0, "speed": 10.0},
+        {"vehicle_id": 1, "x": 3.0, "y": 0.0, "heading": math.pi, "speed": 10.0},
+    ]
+    detector.step(0, states)
+    assert [e["event_type"] for e in detector.flush()] == ["collision"]
@@ -0,0 +1,43 @@
+import uuid
+
+import pytest
+
+from app.services.driving_leaderboard import _ranked, record_session, score_rank, top_sessions
+
+
+def test_ties_share_a_rank_and_the_next_rank_skips():
+    entries = [("a", 90.0), ("b", 80.0), ("c", 80.0), ("d", 70.0)]
+    assert [rank for _, _, rank in _ranked(entries, 0, 1)] == [1, 2, 2, 4]
+
+
+def test_tie_across_a_page_boundary_keeps_the_earlier_rank():
+    # Second page of size 2 over 90, 80, 80, 80, 70: its first entry ties with the last of page one
+    entries = [("c", 80.0), ("d", 80.0)]
+    assert [rank for _, _, rank in _ranked(entries, 2, 2)] == [2, 2]
+    entries = [("d", 80.0), ("e", 70.0)]
+    assert [rank for _, _, rank in _ranked(entries, 3, 2)] == [2, 5]
+
+
+@pytest.fixture
+def leaderboard():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    scenario_id = uuid.uuid4()
+    for job_id, score in (("a", 90.0), ("b", 80.0), ("c", 80.0), ("d", 80.0), ("e", 70.0)):
+        record_session(redis_client, scenario_id, job_id, score)
+    return redis_client, scenario_id
+
+
+def test_pages_rank_ties_like_one_list(leaderboard):
+    redis_client, scenario_id = leaderboard
+    whole = top_sessions(redis_client, scenario_id, 0, 5)
+    pages = [entry for offset in (0, 2, 4) for entry in top_sessions(redis_client, scenario_id, offset, 2)]
+    assert [rank for _, _, rank in whole] == [1, 2, 2, 2, 5]
+    assert pages == whole
+
+
+def test_score_rank_of_a_tied_score(leaderboard):
+    redis_client, scenario_id = leaderboard
+    assert score_rank(redis_client, scenario_id, 80.0) == (2, 1, 5)
+    assert score_rank(redis_client, scenario_id, 85.0) == (2, 4, 5)
+    assert score_rank(redis_client, scenario_id, 95.0) == (1, 5, 5)
@@ -0,0 +1,58 @@
+import copy
+import random
+
+from app.services.heatmap_pyramid import (
+    build_heatmap_pyramid, count_base_cells, pyramid_base_counts, update_heatmap_pyramid
+)
+
+
+def normalized(heatmap):
+    """Pyramid with each tile's cells as a set (their order within a tile doesn't matter)"""
+    heatmap = copy.deepcopy(heatmap)
+    heatmap["levels"] = {
+        level: {key: {tuple(cell) for cell in cells} for key, cells in tiles.items()}
+        for level, tiles in heatmap["levels"].items()
+    }
+    return heatmap
+
+
+def random_points(rng, n, extent=(0, 0, 500, 300)):
+    return [(rng.uniform(extent[0], extent[2]), rng.uniform(extent[1], extent[3])) for _ in range(n)]
+
+
+def merged(*counts):
+    total = {}
+    for cells in counts:
+        for cell, n in cells.items():
+            total[cell] = total.get(cell, 0) + n
+    return {cell: n for cell, n in total.items() if n}
+
+
+def test_adding_a_job_matches_a_rebuild():
+    rng = random.Random(5)
+    extent = (0, 0, 500, 300)
+    first = count_base_cells(random_points(rng, 300))
+    second = count_base_cells(random_points(rng, 200))
+
+    heatmap = build_heatmap_pyramid(first, extent)
+    assert update_heatmap_pyramid(heatmap, second)
+    assert normalized(heatmap) == normalized(build_heatmap_pyramid(merged(first, second), extent))
+
+
+def test_removing_a_job_drops_emptied_cells_and_tiles():
+    rng = random.Random(8)
+    extent = (0, 0, 500, 300)
+    first = count_base_cells(random_points(rng, 300))
+    second = count_base_cells(random_points(rng, 50, extent=(400, 200, 500, 300)))
+
+    heatmap = build_heatmap_pyramid(merged(first, second), extent)
+    assert update_heatmap_pyramid(heatmap, {cell: -n for cell, n in second.items()})
+    assert normalized(heatmap) == normalized(build_heatmap_pyramid(first, extent))
+    assert pyramid_base_counts(heatmap) == first
+
+
+def test_cell_outside_the_square_leaves_the_pyramid_untouched():
+    heatmap = build_heatmap_pyramid({(0, 0): 1, (10, 10): 2}, (0, 0, 20, 20))
+    before = copy.deepcopy(heatmap)
+    assert not update_heatmap_pyramid(heatmap, {(1, 1): 1, (1000, 0): 1})
+    assert heatmap == before
@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers.jobs import _decode_cursor, _encode_cursor
+
+
+def job(created_at):
+    return SimpleNamespace(id=uuid.uuid4(), created_at=created_at)
+
+
+def test_round_trip_keeps_timezone_and_microseconds():
+    created_at = datetime(2026, 10, 19, 12, 30, 1, 123456, tzinfo=timezone.utc)
+    j = job(created_at)
+    assert _decode_cursor(_encode_cursor(j)) == (created_at, j.id)
+
+
+def test_pages_over_created_at_ties_skip_and_repeat_nothing():
+    base = datetime(2026, 10, 19, tzinfo=timezone.utc)
+    # Batches created in the same transaction share created_at
+    jobs = [job(base) for _ in range(7)] + [job(base + timedelta(seconds=1)) for _ in range(5)]
+    newest_first = sorted(jobs, key=lambda j: (j.created_at, j.id), reverse=True)
+
+    seen, cursor = [], None
+    while True:
+        # WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC LIMIT 3
+        remaining = [j for j in newest_first if cursor is None or (j.created_at, j.id) < _decode_cursor(cursor)]
+        page = remaining[:3]
+        seen.extend(page)
+        if len(remaining) <= 3:
+            break
+        cursor = _encode_cursor(page[-1])
+    assert [j.id for j in seen] == [j.id for j in newest_first]
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "bm8tc2VwYXJhdG9y", "MjAyNi0xMC0xOXxub3QtYS11dWlk"])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor(cursor)
+    assert exc.value.status_code == 400
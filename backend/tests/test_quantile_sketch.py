@@ -0,0 +1,54 @@
+import random
+
+from app.services.quantile_sketch import QuantileSketch
+
+
+def sketch_of(values, relative_accuracy=0.01):
+    sketch = QuantileSketch(relative_accuracy)
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def test_quantiles_are_within_the_relative_accuracy():
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(3, 1.5) for _ in range(5000))
+    sketch = sketch_of(values)
+    for q in (0.0, 0.1, 0.5, 0.9, 0.99, 1.0):
+        expected = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - expected) <= sketch.relative_accuracy * expected
+
+
+def test_zero_and_empty():
+    assert QuantileSketch().quantile(0.5) is None
+    sketch = sketch_of([0, 0, 0, 5])
+    assert sketch.quantile(0.5) == 0.0
+    assert abs(sketch.quantile(1.0) - 5) <= 0.05
+
+
+def test_merge_equals_sketch_of_all_values():
+    rng = random.Random(11)
+    a = [rng.uniform(0, 100) for _ in range(1000)]
+    b = [rng.expovariate(0.1) for _ in range(700)] + [0.0] * 10
+    merged = sketch_of(a)
+    merged.merge(sketch_of(b))
+    combined = sketch_of(a + b)
+    assert merged.to_dict() == combined.to_dict()
+
+
+def test_merge_with_negative_weight_removes_a_sketch():
+    rng = random.Random(3)
+    a = [rng.uniform(1, 50) for _ in range(200)]
+    b = [rng.uniform(40, 90) for _ in range(200)]
+    sketch = sketch_of(a)
+    sketch.merge(sketch_of(b))
+    sketch.merge(sketch_of(b), weight=-1)
+    # Emptied bins are dropped, so the result is identical, not just equivalent
+    assert sketch.to_dict() == sketch_of(a).to_dict()
+
+
+def test_round_trips_through_dict():
+    sketch = sketch_of([0.0, 1.5, 20, 300])
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+    assert restored.to_dict() == sketch.to_dict()
+    assert restored.quantile(0.75) == sketch.quantile(0.75)
@@ -0,0 +1,81 @@
+import copy
+
+import pytest
+
+from app.services.scenario_patch import PatchError, apply_patch
+
+
+def hazard(x):
+    return {"type": "debris", "x": x, "y": 0}
+
+
+@pytest.fixture
+def scenario():
+    return {
+        "name": "Crossing",
+        "roads": [{"points": [{"x": 0, "y": 0}, {"x": 100, "y": 0}]}],
+        "traffic_lights": [],
+        "stop_signs": [],
+        "crosswalks": [],
+        "hazards": [hazard(10), hazard(20)],
+    }
+
+
+def test_dash_appends_to_an_array(scenario):
+    patched = apply_patch(scenario, [
+        {"op": "add", "path": "/hazards/-", "value": hazard(30)},
+        {"op": "add", "path": "/roads/0/points/-", "value": {"x": 100, "y": 100}},
+    ])
+    assert [h["x"] for h in patched["hazards"]] == [10, 20, 30]
+    assert patched["roads"][0]["points"][-1] == {"x": 100, "y": 100}
+
+
+def test_dash_only_refers_to_the_end_for_add(scenario):
+    for operation in (
+        {"op": "replace", "path": "/hazards/-", "value": hazard(30)},
+        {"op": "remove", "path": "/hazards/-"},
+        {"op": "test", "path": "/hazards/-", "value": hazard(20)},
+    ):
+        with pytest.raises(PatchError):
+            apply_patch(scenario, [operation])
+
+
+def test_add_at_the_array_length_appends_but_past_it_fails(scenario):
+    patched = apply_patch(scenario, [{"op": "add", "path": "/hazards/2", "value": hazard(30)}])
+    assert len(patched["hazards"]) == 3
+    with pytest.raises(PatchError):
+        apply_patch(scenario, [{"op": "add", "path": "/hazards/3", "value": hazard(30)}])
+
+
+def test_move_into_its_own_child_is_rejected(scenario):
+    with pytest.raises(PatchError):
+        apply_patch(scenario, [{"op": "move", "from": "/roads/0", "path": "/roads/0/points/0"}])
+
+
+def test_move_to_the_same_location_is_a_no_op(scenario):
+    patched = apply_patch(scenario, [{"op": "move", "from": "/hazards/1", "path": "/hazards/1"}])
+    assert patched["hazards"] == scenario["hazards"]
+
+
+def test_move_between_siblings(scenario):
+    patched = apply_patch(scenario, [{"op": "move", "from": "/hazards/0", "path": "/hazards/-"}])
+    assert [h["x"] for h in patched["hazards"]] == [20, 10]
+
+
+def test_failed_test_leaves_the_document_untouched(scenario):
+    before = copy.deepcopy(scenario)
+    with pytest.raises(PatchError):
+        apply_patch(scenario, [
+            {"op": "replace", "path": "/hazards/0/x", "value": 99},
+            {"op": "add", "path": "/hazards/-", "value": hazard(30)},
+            {"op": "test", "path": "/hazards/1/x", "value": 21},
+        ])
+    assert scenario == before
+
+
+def test_only_changed_fields_are_returned(scenario):
+    patched = apply_patch(scenario, [
+        {"op": "test", "path": "/name", "value": "Crossing"},
+        {"op": "replace", "path": "/hazards/0/x", "value": 15},
+    ])
+    assert set(patched) == {"hazards"}
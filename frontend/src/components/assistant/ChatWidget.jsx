@@ -6,6 +6,8 @@ const ChatWidget = () => {
     const [messages, setMessages] = useState([]);
     const [input, setInput] = useState('');
     const [loading, setLoading] = useState(false);
+    // Sent with every message so the backend keeps one history (and summary) per chat
+    const [conversationId, setConversationId] = useState(null);
 
     const sendMessage = async () => {
         if (!input.trim()) return;
@@ -16,16 +18,26 @@ const ChatWidget = () => {
         setLoading(true);
 
         try {
-            const response = await assistantAPI.chat({
+            // Append tokens to the assistant message as they arrive
+            setMessages(prev => [...prev, { role: 'assistant', content: '' }]);
+            const appendToken = (token) => {
+                setLoading(false);
+                setMessages(prev => {
+                    const last = prev[prev.length - 1];
+                    return [...prev.slice(0, -1), { ...last, content: last.content + token }];
+                });
+            };
+
+            const { error, conversationId: streamConversationId } = await assistantAPI.chatStream({
                 message: input,
+                conversation_id: conversationId,
                 context_type: 'general'
-            });
-
-            const assistantMessage = { role: 'assistant', content: response.data.reply };
-            setMessages(prev => [...prev, assistantMessage]);
+            }, appendToken);
+            if (error) appendToken(error);
+            if (streamConversationId) setConversationId(streamConversationId);
         } catch (error) {
             console.error('Failed to send message:', error);
-            setMessages(prev => [...prev, {
+            setMessages(prev => [...prev.slice(0, -1), {
                 role: 'assistant',
                 content: 'Sorry, I encountered an error. Please try again.'
             }]);
@@ -76,7 +88,7 @@ const ChatWidget = () => {
                                 <p className="text-sm mt-2">Ask me anything about vehicle mechanics, driving techniques, or simulation results!</p>
                             </div>
                         ) : (
-                            messages.map((msg, idx) => (
+                            messages.filter(msg => msg.content).map((msg, idx) => (
                                 <div key={idx} className={`flex ${msg.role === 'user' ? 'justify-end' : 'justify-start'}`}>
                                     <div className={`max-w-xs px-4 py-2 rounded-lg ${msg.role === 'user'
                                         ? 'bg-blue-600 text-white'
@@ -1,10 +1,14 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { jobsAPI } from '@/services/api';
 import { Trash2, Download } from 'lucide-react';
 
 const JobsDashboard = () => {
     const [jobs, setJobs] = useState([]);
+    const [counts, setCounts] = useState({});
+    const [progress, setProgress] = useState({});
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(false);
+    const loadedMore = useRef(false);
     const [deletingId, setDeletingId] = useState(null);
     const [selectedIds, setSelectedIds] = useState(new Set());
 
@@ -83,17 +87,61 @@ const JobsDashboard = () => {
         setSelectedIds(new Set());
     };
 
+    // Status changes are pushed by the server; the list is only (re)loaded on connect and resync
     useEffect(() => {
-        loadJobs();
-        const interval = setInterval(loadJobs, 3000); // Auto-refresh every 3 seconds
-        return () => clearInterval(interval);
+        const source = jobsAPI.events();
+        source.onopen = () => loadJobs();
+        source.onmessage = (message) => applyJobEvent(JSON.parse(message.data));
+        return () => source.close();
     }, []);
 
+    const adjustCounts = (from, to) => {
+        if (from === to) return;
+        setCounts((prev) => {
+            const next = { ...prev };
+            if (from) next[from] = Math.max(0, (next[from] ?? 0) - 1);
+            if (to) next[to] = (next[to] ?? 0) + 1;
+            return next;
+        });
+    };
+
+    const applyJobEvent = (event) => {
+        if (event.type === 'resync') {
+            loadJobs();
+        } else if (event.type === 'deleted') {
+            setJobs((prev) => prev.filter((j) => jobIdStr(j) !== event.job_id));
+            adjustCounts(event.status, null);
+        } else if (event.type === 'job') {
+            const job = event.job;
+            setJobs((prev) => {
+                const exists = prev.some((j) => jobIdStr(j) === job.id);
+                return exists ? prev.map((j) => (jobIdStr(j) === job.id ? job : j)) : [job, ...prev];
+            });
+            if (event.progress !== null && event.progress !== undefined) {
+                setProgress((prev) => ({ ...prev, [job.id]: event.progress }));
+            }
+            adjustCounts(event.previous_status, job.status);
+        }
+    };
+
+    // Refresh the newest page; older pages loaded with "Load more" are kept
     const loadJobs = async () => {
         try {
             setLoading(true);
-            const response = await jobsAPI.list();
-            setJobs(response.data);
+            const [response, countsResponse] = await Promise.all([jobsAPI.list(), jobsAPI.counts()]);
+            const page = response.data;
+            if (loadedMore.current) {
+                const pageIds = new Set(page.map((j) => jobIdStr(j)));
+                const oldest = page.length ? new Date(page[page.length - 1].created_at) : null;
+                setJobs((prev) => [
+                    ...page,
+                    ...prev.filter((j) => !pageIds.has(jobIdStr(j)) && oldest && new Date(j.created_at) < oldest),
+                ]);
+            } else {
+                setJobs(page);
+                setNextCursor(response.headers['x-next-cursor'] ?? null);
+            }
+            setCounts(countsResponse.data);
         } catch (error) {
             console.error('Failed to load jobs:', error);
         } finally {
@@ -101,6 +149,18 @@ const JobsDashboard = () => {
         }
     };
 
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        try {
+            const response = await jobsAPI.list({ cursor: nextCursor });
+            loadedMore.current = true;
+            setJobs((prev) => [...prev, ...response.data]);
+            setNextCursor(response.headers['x-next-cursor'] ?? null);
+        } catch (error) {
+            console.error('Failed to load more jobs:', error);
+        }
+    };
+
     const getStatusColor = (status) => {
         const colors = {
             pending: 'bg-yellow-500',
@@ -114,7 +174,16 @@ const JobsDashboard = () => {
     return (
         <div>
             <div className="flex flex-wrap justify-between items-center gap-4 mb-6">
-                <h1 className="text-3xl font-bold text-theme-primary">Jobs Dashboard</h1>
+                <div className="flex flex-wrap items-center gap-4">
+                    <h1 className="text-3xl font-bold text-theme-primary">Jobs Dashboard</h1>
+                    <div className="flex gap-2">
+                        {Object.entries(counts).map(([status, count]) => (
+                            <span key={status} className={`inline-flex px-2 py-1 text-xs font-semibold rounded-full ${getStatusColor(status)} bg-opacity-20 text-white capitalize`}>
+                                {status}: {count}
+                            </span>
+                        ))}
+                    </div>
+                </div>
                 <div className="flex flex-wrap items-center gap-2">
                     <button
                         onClick={handleBulkDownload}
@@ -215,6 +284,7 @@ const JobsDashboard = () => {
                                         <td className="px-6 py-4 whitespace-nowrap">
                                             <span className={`inline-flex px-2 py-1 text-xs font-semibold rounded-full ${getStatusColor(job.status)} bg-opacity-20 text-white`}>
                                                 {job.status}
+                                                {job.status === 'running' && progress[id] !== undefined && ` ${progress[id]}%`}
                                             </span>
                                         </td>
                                         <td className="px-6 py-4 whitespace-nowrap text-sm">
@@ -250,6 +320,17 @@ const JobsDashboard = () => {
                 </table>
             </div>
 
+            {nextCursor && (
+                <div className="mt-4 text-center">
+                    <button
+                        onClick={loadMore}
+                        className="bg-theme-hover hover:bg-theme-card border border-theme text-theme-primary font-semibold py-2 px-4 rounded-md"
+                    >
+                        Load more
+                    </button>
+                </div>
+            )}
+
             {loading && (
                 <div className="mt-4 text-center text-theme-muted text-sm">
                     Refreshing...
@@ -17,11 +17,13 @@ const MetricsAnalytics = () => {
 
     // Driving stats (Manual Driving)
     const [drivingStats, setDrivingStats] = useState(null);
+    const [drivingRank, setDrivingRank] = useState(null);
     const [drivingFeedback, setDrivingFeedback] = useState('');
     const [isGeneratingFeedback, setIsGeneratingFeedback] = useState(false);
     const [scenarios, setScenarios] = useState([]);
     const [selectedScenarioId, setSelectedScenarioId] = useState('');
     const [scenarioSessions, setScenarioSessions] = useState([]);
+    const [feedbackBatch, setFeedbackBatch] = useState(null); // { state, total, completed, failed }
 
     // Aggregate stats for overview
     const [aggregateStats, setAggregateStats] = useState({
@@ -81,7 +83,7 @@ const MetricsAnalytics = () => {
 
     const loadScenarios = async () => {
         try {
-            const response = await scenariosAPI.list();
+            const response = await scenariosAPI.listSummary();
             setScenarios(response.data);
         } catch (error) {
             console.error('Failed to load scenarios:', error);
@@ -95,7 +97,7 @@ const MetricsAnalytics = () => {
             const statsSessions = statsResponse.data || [];
 
             // Also get all jobs for this scenario (in case some don't have driving stats yet)
-            const jobsResponse = await jobsAPI.list();
+            const jobsResponse = await jobsAPI.list({ scenario_id: scenarioId });
             const allJobs = jobsResponse.data || [];
 
             // Filter manual driving jobs for this specific scenario
@@ -129,17 +131,19 @@ const MetricsAnalytics = () => {
 
     const loadMetrics = async (jobId) => {
         try {
-            const [telemetryRes, safetyRes, insightsRes, drivingStatsRes] = await Promise.all([
+            const [telemetryRes, safetyRes, insightsRes, drivingStatsRes, drivingRankRes] = await Promise.all([
                 metricsAPI.getTelemetry(jobId).catch(() => null),
                 metricsAPI.getSafety(jobId).catch(() => null),
                 metricsAPI.getInsights(jobId).catch(() => null),
-                metricsAPI.getDrivingStats(jobId).catch(() => null)
+                metricsAPI.getDrivingStats(jobId).catch(() => null),
+                metricsAPI.getDrivingRank(jobId).catch(() => null)
             ]);
 
             setTelemetry(telemetryRes?.data || []);
             setSafetyData(safetyRes?.data);
             setInsights(insightsRes?.data?.content || 'No AI insights available');
             setDrivingStats(drivingStatsRes?.data);
+            setDrivingRank(drivingRankRes?.data || null);
             setDrivingFeedback(drivingStatsRes?.data?.ai_feedback || '');
         } catch (error) {
             console.error('Failed to load metrics:', error);
@@ -150,7 +154,8 @@ const MetricsAnalytics = () => {
         if (!selectedJobId) return;
         setIsGeneratingFeedback(true);
         try {
-            const response = await metricsAPI.generateFeedback(selectedJobId);
+            // Stored feedback is returned as is, so only ask for new text when some is shown
+            const response = await metricsAPI.generateFeedback(selectedJobId, Boolean(drivingFeedback));
             setDrivingFeedback(response.data.feedback);
         } catch (error) {
             console.error('Failed to generate feedback:', error);
@@ -159,6 +164,35 @@ const MetricsAnalytics = () => {
         setIsGeneratingFeedback(false);
     };
 
+    const FEEDBACK_BATCH_POLL_MS = 2000;
+
+    // Feedback for every session of the scenario that has none yet, generated server-side
+    const generateScenarioFeedback = async () => {
+        if (!selectedScenarioId) return;
+        try {
+            const { data } = await metricsAPI.generateFeedbackBatch({ scenario_id: selectedScenarioId });
+            setFeedbackBatch({ state: 'PENDING', completed: 0, failed: 0 });
+            const poll = setInterval(async () => {
+                try {
+                    const { data: status } = await metricsAPI.getFeedbackBatch(data.task_id);
+                    setFeedbackBatch(status);
+                    if (status.state === 'SUCCESS' || status.state === 'FAILURE') {
+                        clearInterval(poll);
+                        if (selectedJobId) loadMetrics(selectedJobId);
+                    }
+                } catch (error) {
+                    console.error('Failed to poll feedback batch:', error);
+                    clearInterval(poll);
+                }
+            }, FEEDBACK_BATCH_POLL_MS);
+        } catch (error) {
+            console.error('Failed to start feedback batch:', error);
+            setFeedbackBatch(null);
+        }
+    };
+
+    const feedbackBatchRunning = feedbackBatch && !['SUCCESS', 'FAILURE'].includes(feedbackBatch.state);
+
     const chartData = telemetry.map((t) => ({
         time: (t.timestamp / 1000).toFixed(1),
         speed: (t.speed * 3.6).toFixed(1),
@@ -331,6 +365,23 @@ const MetricsAnalytics = () => {
                             {selectedScenarioId && scenarioSessions.length === 0 && (
                                 <p className="text-gray-500 text-xs mt-2">No driving sessions found for this scenario.</p>
                             )}
+                            {selectedScenarioId && scenarioSessions.length > 0 && (
+                                <div className="flex items-center gap-3 mt-3">
+                                    <button
+                                        onClick={generateScenarioFeedback}
+                                        disabled={feedbackBatchRunning}
+                                        className="px-3 py-1 text-sm bg-purple-600 hover:bg-purple-700 disabled:bg-gray-600 rounded-md font-medium transition-colors"
+                                    >
+                                        {feedbackBatchRunning ? 'Generating...' : 'AI Feedback for All Sessions'}
+                                    </button>
+                                    {feedbackBatch && feedbackBatch.total != null && (
+                                        <span className="text-xs text-theme-muted">
+                                            {feedbackBatch.completed} of {feedbackBatch.total} done
+                                            {feedbackBatch.failed ? ` • ${feedbackBatch.failed} failed` : ''}
+                                        </span>
+                                    )}
+                                </div>
+                            )}
                         </div>
                     </div>
 
@@ -383,7 +434,7 @@ const MetricsAnalytics = () => {
                             </div>
 
                             {/* Secondary Stats */}
-                            <div className="grid grid-cols-3 gap-4">
+                            <div className={`grid ${drivingRank ? 'grid-cols-4' : 'grid-cols-3'} gap-4`}>
                                 <div className="bg-theme-card p-4 rounded-lg">
                                     <div className="flex items-center gap-2 mb-1">
                                         <Clock size={16} className="text-theme-muted" />
@@ -405,6 +456,17 @@ const MetricsAnalytics = () => {
                                         {drivingStats.distance_traveled.toFixed(1)} m
                                     </div>
                                 </div>
+                                {drivingRank && (
+                                    <div className="bg-theme-card p-4 rounded-lg">
+                                        <span className="text-sm text-theme-muted">Leaderboard</span>
+                                        <div className="text-xl font-semibold">
+                                            #{drivingRank.rank} of {drivingRank.total_sessions}
+                                        </div>
+                                        <div className="text-xs text-gray-500 mt-1">
+                                            Score {drivingRank.score.toFixed(0)} • better than {drivingRank.percentile.toFixed(0)}%
+                                        </div>
+                                    </div>
+                                )}
                             </div>
 
                             {/* AI Feedback Section */}
@@ -419,7 +481,7 @@ const MetricsAnalytics = () => {
                                         disabled={isGeneratingFeedback}
                                         className="px-4 py-2 bg-purple-600 hover:bg-purple-700 disabled:bg-gray-600 rounded-lg font-medium transition-colors"
                                     >
-                                        {isGeneratingFeedback ? 'Generating...' : 'Get AI Feedback'}
+                                        {isGeneratingFeedback ? 'Generating...' : drivingFeedback ? 'Regenerate Feedback' : 'Get AI Feedback'}
                                     </button>
                                 </div>
                                 {drivingFeedback ? (
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { scenariosAPI } from '@/services/api';
+import { diff } from '@/services/jsonPatch';
 import { useTheme } from '@/contexts/ThemeContext';
 import {
     MousePointer, Brush, Eraser, TrafficCone, Lightbulb,
@@ -7,6 +8,8 @@ import {
 } from 'lucide-react';
 
 const DRAFT_STORAGE_KEY = 'aumovio_scenario_builder_draft';
+// Last version saved to the server ({ id, version, doc }), so later saves send only a JSON-Patch diff
+const SAVED_STORAGE_KEY = 'aumovio_scenario_builder_saved';
 
 const defaultScenario = () => ({
     name: 'New Scenario',
@@ -16,6 +19,31 @@ const defaultScenario = () => ({
     weatherIntensity: 0.5
 });
 
+// Request body / server document for the builder state
+const toScenarioDocument = (scenario) => ({
+    name: scenario.name,
+    roads: scenario.strokes,
+    traffic_lights: scenario.objects.filter(o => o.type === 'light'),
+    stop_signs: scenario.objects.filter(o => o.type === 'stop'),
+    crosswalks: scenario.objects.filter(o => o.type === 'ped'),
+    hazards: scenario.objects.filter(o => o.type === 'obs'),
+    weather: scenario.weather,
+    weather_intensity: scenario.weatherIntensity
+});
+
+const fromScenarioDocument = (doc) => ({
+    name: doc.name,
+    strokes: doc.roads || [],
+    objects: [
+        ...(doc.traffic_lights || []),
+        ...(doc.stop_signs || []),
+        ...(doc.crosswalks || []),
+        ...(doc.hazards || [])
+    ],
+    weather: doc.weather,
+    weatherIntensity: doc.weather_intensity
+});
+
 const ScenarioBuilder = () => {
     const { isDarkMode } = useTheme();
     const canvasRef = React.useRef(null);
@@ -40,6 +68,30 @@ const ScenarioBuilder = () => {
         return defaultScenario();
     });
 
+    // Server copy this draft is an edit of; null until saved, and again after Clear Map
+    const [saved, setSavedState] = React.useState(() => {
+        try {
+            return JSON.parse(localStorage.getItem(SAVED_STORAGE_KEY));
+        } catch (_) {
+            return null;
+        }
+    });
+
+    const setSaved = (id, version, doc) => {
+        setSavedState({ id, version, doc });
+        try {
+            localStorage.setItem(SAVED_STORAGE_KEY, JSON.stringify({ id, version, doc }));
+        } catch (_) { }
+    };
+
+    // Detach the draft so the next save creates a new scenario
+    const clearSaved = () => {
+        setSavedState(null);
+        try {
+            localStorage.removeItem(SAVED_STORAGE_KEY);
+        } catch (_) { }
+    };
+
     const [config, setConfig] = React.useState({
         gridSize: 50,
         snap: false,
@@ -511,11 +563,12 @@ const ScenarioBuilder = () => {
     };
 
     const clearMap = () => {
-        if (window.confirm('Clear the entire map? All roads and objects will be removed.')) {
+        if (window.confirm('Clear the entire map? All roads and objects will be removed and the next save creates a new scenario.')) {
             pushHistory(scenario);
             setScenario(prev => ({ ...prev, strokes: [], objects: [] }));
             setPointPath([]);
             currentPath.current = [];
+            clearSaved();
         }
     };
 
@@ -527,20 +580,48 @@ const ScenarioBuilder = () => {
         setTool(newTool);
     };
 
-    const handleSave = async () => {
+    // Someone else saved first: load their version so edits are redone on top of it
+    const reloadSaved = async (id) => {
+        const response = await scenariosAPI.get(id);
+        const { id: _id, version, created_at, updated_at, ...doc } = response.data;
+        historyRef.current = [];
+        redoRef.current = [];
+        setScenario(s => ({ ...s, ...fromScenarioDocument(doc) }));
+        setSaved(id, version, toScenarioDocument(fromScenarioDocument(doc)));
+        setUndoRedoVersion(v => v + 1);
+    };
+
+    // Saves over the scenario this draft came from (JSON-Patch), or creates one if there is none or asNew
+    const handleSave = async (asNew = false) => {
+        const doc = toScenarioDocument(scenario);
         try {
-            await scenariosAPI.create({
-                name: scenario.name,
-                roads: scenario.strokes,
-                traffic_lights: scenario.objects.filter(o => o.type === 'light'),
-                stop_signs: scenario.objects.filter(o => o.type === 'stop'),
-                crosswalks: scenario.objects.filter(o => o.type === 'ped'),
-                hazards: scenario.objects.filter(o => o.type === 'obs'),
-                weather: scenario.weather,
-                weather_intensity: scenario.weatherIntensity
-            });
+            if (saved && !asNew) {
+                const operations = diff(saved.doc, doc);
+                if (operations.length > 0) {
+                    const response = await scenariosAPI.patch(saved.id, saved.version, operations);
+                    setSaved(saved.id, response.data.version, doc);
+                }
+            } else {
+                const response = await scenariosAPI.create(doc);
+                setSaved(response.data.id, response.data.version, doc);
+            }
             alert('Scenario saved successfully!');
         } catch (error) {
+            const status = error.response?.status;
+            if (saved && !asNew && status === 409) {
+                try {
+                    await reloadSaved(saved.id);
+                    alert('This scenario was changed elsewhere. The latest version has been loaded; please redo your edits.');
+                } catch (reloadError) {
+                    console.error('Failed to reload:', reloadError);
+                    alert('Failed to save scenario');
+                }
+                return;
+            }
+            if (saved && !asNew && status === 404) {
+                // Deleted on the server: the next save creates it again
+                clearSaved();
+            }
             console.error('Failed to save:', error);
             alert('Failed to save scenario');
         }
@@ -810,13 +891,27 @@ const ScenarioBuilder = () => {
                             <Play size={18} fill="currentColor" />
                             {isPreviewing ? 'Stop Preview' : 'Run Preview'}
                         </button>
+                        {saved && (
+                            <p className="text-xs text-gray-400 mb-2">
+                                Editing a saved scenario (v{saved.version}); Save updates it.
+                            </p>
+                        )}
                         <button
-                            onClick={handleSave}
+                            onClick={() => handleSave()}
                             className="w-full py-3 bg-primary hover:bg-primary/90 rounded-lg font-bold flex items-center justify-center gap-2 text-white transition-all"
                         >
                             <Save size={18} />
-                            Save Scenario
+                            {saved ? 'Save Changes' : 'Save Scenario'}
                         </button>
+                        {saved && (
+                            <button
+                                onClick={() => handleSave(true)}
+                                className="w-full py-3 mt-2 rounded-lg font-bold flex items-center justify-center gap-2 transition-all border border-gray-600 text-gray-300 hover:bg-gray-800"
+                            >
+                                <Save size={18} />
+                                Save as New
+                            </button>
+                        )}
                     </div>
                 </div>
             </div>
@@ -171,6 +171,11 @@ const SceneSimulation = () => {
     // Restore full simulation state when scenarios have loaded (e.g. after navigating back)
     useEffect(() => {
         if (scenarios.length === 0 || hasRestoredState.current) return;
+        hasRestoredState.current = true;
+        restoreState();
+    }, [scenarios]);
+
+    const restoreState = async () => {
         try {
             const raw = localStorage.getItem(SCENE_SIM_STORAGE_KEY);
             if (!raw) return;
@@ -179,9 +184,10 @@ const SceneSimulation = () => {
             const mode = saved?.simulationType;
             const running = Boolean(saved?.isRunning);
 
+            // The list only holds summaries; fetch the saved scenario's geometry
             let scenario = null;
-            if (id) {
-                scenario = scenarios.find((s) => String(s.id) === id);
+            if (id && scenarios.some((s) => String(s.id) === id)) {
+                scenario = await loadScenario(id);
             }
 
             if (scenario) setSelectedScenario(scenario);
@@ -213,8 +219,7 @@ const SceneSimulation = () => {
         } catch (_) {
             /* ignore parse errors */
         }
-        hasRestoredState.current = true;
-    }, [scenarios]);
+    };
 
     // Center camera on road network when scenario is selected (matches Scenario Builder layout)
     useEffect(() => {
@@ -541,13 +546,19 @@ const SceneSimulation = () => {
 
     const loadScenarios = async () => {
         try {
-            const response = await scenariosAPI.list();
+            const response = await scenariosAPI.listSummary();
             setScenarios(response.data);
         } catch (error) {
             console.error('Failed to load scenarios:', error);
         }
     };
 
+    // Full geometry is fetched per scenario on demand (the list only has summaries)
+    const loadScenario = async (id) => {
+        const response = await scenariosAPI.get(id);
+        return response.data;
+    };
+
     const handleDeleteScenario = async () => {
         if (!selectedScenario) return;
         if (!window.confirm(`Delete scenario "${selectedScenario.name}"? This cannot be undone.`)) return;
@@ -837,10 +848,17 @@ const SceneSimulation = () => {
                             <div className="flex gap-2">
                                 <select
                                     value={selectedScenario ? String(selectedScenario.id) : ''}
-                                    onChange={(e) => {
+                                    onChange={async (e) => {
                                         const id = e.target.value;
-                                        const scenario = scenarios.find((s) => String(s.id) === id) ?? null;
-                                        setSelectedScenario(scenario);
+                                        if (!id) {
+                                            setSelectedScenario(null);
+                                            return;
+                                        }
+                                        try {
+                                            setSelectedScenario(await loadScenario(id));
+                                        } catch (error) {
+                                            console.error('Failed to load scenario:', error);
+                                        }
                                     }}
                                     className="flex-1 px-3 py-2 bg-theme-hover border border-theme rounded-md text-theme-primary focus:outline-none focus:border-blue-500 transition-colors"
                                     disabled={isRunning}
@@ -22,15 +22,23 @@ api.interceptors.request.use((config) => {
 export const scenariosAPI = {
     create: (data) => api.post('/api/scenarios/', data),
     list: () => api.get('/api/scenarios/'),
+    listSummary: (params) => api.get('/api/scenarios/summary', { params }),
     get: (id) => api.get(`/api/scenarios/${id}`),
     update: (id, data) => api.put(`/api/scenarios/${id}`, data),
+    // JSON-Patch edit; rejected with 409 if the scenario is no longer at `version`
+    patch: (id, version, operations) => api.patch(`/api/scenarios/${id}`, { version, operations }),
+    revisions: (id, sinceVersion = 0) => api.get(`/api/scenarios/${id}/revisions`, { params: { since_version: sinceVersion } }),
     delete: (id) => api.delete(`/api/scenarios/${id}`),
 };
 
 // Jobs
 export const jobsAPI = {
     create: (data) => api.post('/api/jobs/', data),
-    list: (statusFilter) => api.get('/api/jobs/', { params: { status_filter: statusFilter } }),
+    // params: { status_filter, scenario_id, cursor, limit }; next page cursor is in the X-Next-Cursor header
+    list: (params) => api.get('/api/jobs/', { params }),
+    counts: () => api.get('/api/jobs/counts'),
+    // Server-sent job events (created / status / progress / deleted)
+    events: () => new EventSource(`${API_BASE_URL}/api/jobs/events`),
     get: (id) => api.get(`/api/jobs/${id}`),
     updateStatus: (id, status) => api.patch(`/api/jobs/${id}/status`, null, { params: { new_status: status } }),
     delete: (id) => api.delete(`/api/jobs/${id}`),
@@ -41,19 +49,69 @@ export const metricsAPI = {
     createTelemetry: (data) => api.post('/api/metrics/telemetry', data),
     getTelemetry: (jobId) => api.get(`/api/metrics/telemetry/${jobId}`),
     getSafety: (jobId) => api.get(`/api/metrics/safety/${jobId}`),
+    getHeatmapTiles: (jobId, params) => api.get(`/api/metrics/safety/${jobId}/heatmap`, { params }),
+    getSafetyEvents: (jobId, eventType) => api.get(`/api/metrics/safety/${jobId}/events`, { params: { event_type: eventType } }),
     getInsights: (jobId) => api.get(`/api/metrics/insights/${jobId}`),
+    getScenarioAnalytics: (scenarioId) => api.get(`/api/metrics/scenarios/${scenarioId}/analytics`),
+    getScenarioHeatmapTiles: (scenarioId, params) => api.get(`/api/metrics/scenarios/${scenarioId}/analytics/heatmap`, { params }),
 
     // Driving stats (Manual Driving metrics)
     submitDrivingStats: (data) => api.post('/api/metrics/driving-stats', data),
     getDrivingStats: (jobId) => api.get(`/api/metrics/driving-stats/${jobId}`),
     getScenarioSessions: (scenarioId) => api.get(`/api/metrics/driving-stats/scenario/${scenarioId}`),
-    generateFeedback: (jobId) => api.post(`/api/metrics/driving-stats/${jobId}/generate-feedback`),
+    getDrivingRank: (jobId) => api.get(`/api/metrics/driving-stats/${jobId}/rank`),
+    getLeaderboard: (scenarioId, params = {}) => api.get(`/api/metrics/driving-stats/scenario/${scenarioId}/leaderboard`, { params }),
+    generateFeedback: (jobId, regenerate = false) => api.post(`/api/metrics/driving-stats/${jobId}/generate-feedback`, null, { params: { regenerate } }),
+    // data: { scenario_id?, job_ids?, regenerate? } -> { task_id }
+    generateFeedbackBatch: (data) => api.post('/api/metrics/driving-stats/feedback-batches', data),
+    getFeedbackBatch: (taskId) => api.get(`/api/metrics/driving-stats/feedback-batches/${taskId}`),
 };
 
 
 // Assistant
 export const assistantAPI = {
     chat: (data) => api.post('/api/assistant/chat', data),
+    // Server-sent events over POST (EventSource only does GET); calls onToken per chunk
+    // and resolves with the final event's message_id and conversation_id
+    chatStream: async (data, onToken) => {
+        const token = localStorage.getItem('token');
+        const response = await fetch(`${API_BASE_URL}/api/assistant/chat/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                ...(token ? { Authorization: `Bearer ${token}` } : {}),
+            },
+            body: JSON.stringify(data),
+        });
+        if (!response.ok || !response.body) {
+            throw new Error(`Chat stream failed: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let messageId = null;
+        let conversationId = null;
+        let errorDetail = null;
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+            for (const raw of events) {
+                if (!raw.startsWith('data: ')) continue;
+                const event = JSON.parse(raw.slice(6));
+                if (event.type === 'token') onToken(event.content);
+                else if (event.type === 'error') errorDetail = event.detail;
+                else if (event.type === 'done') {
+                    messageId = event.message_id;
+                    conversationId = event.conversation_id;
+                }
+            }
+        }
+        return { messageId, conversationId, error: errorDetail };
+    },
 };
 
 export default api;
@@ -0,0 +1,44 @@
+// Minimal RFC 6902 diff for plain JSON values (objects, arrays, primitives)
+
+const escapeToken = (token) => String(token).replace(/~/g, '~0').replace(/\//g, '~1');
+
+const isObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+// Operations that turn `before` into `after`, e.g. [{ op: 'replace', path: '/hazards/3/x', value: 120 }]
+export const diff = (before, after, path = '') => {
+    if (Array.isArray(before) && Array.isArray(after)) {
+        const operations = [];
+        const common = Math.min(before.length, after.length);
+        for (let i = 0; i < common; i++) {
+            operations.push(...diff(before[i], after[i], `${path}/${i}`));
+        }
+        // Remove from the end so earlier indices stay valid
+        for (let i = before.length - 1; i >= common; i--) {
+            operations.push({ op: 'remove', path: `${path}/${i}` });
+        }
+        for (let i = common; i < after.length; i++) {
+            operations.push({ op: 'add', path: `${path}/-`, value: after[i] });
+        }
+        return operations;
+    }
+
+    if (isObject(before) && isObject(after)) {
+        const operations = [];
+        for (const key of Object.keys(before)) {
+            if (!(key in after)) {
+                operations.push({ op: 'remove', path: `${path}/${escapeToken(key)}` });
+            }
+        }
+        for (const key of Object.keys(after)) {
+            const keyPath = `${path}/${escapeToken(key)}`;
+            if (!(key in before)) {
+                operations.push({ op: 'add', path: keyPath, value: after[key] });
+            } else {
+                operations.push(...diff(before[key], after[key], keyPath));
+            }
+        }
+        return operations;
+    }
+
+    return before === after ? [] : [{ op: 'replace', path, value: after }];
+};